@@ -1,19 +1,25 @@
-from datetime import datetime, timedelta
-from typing import Optional
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.config import get_settings
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.models.usuario import Usuario
 from app.schemas.usuario import TokenData
+from app.services.revocacion import lista_revocacion, registrar_jti
 
 settings = get_settings()
 
+# Claim "tipo" de los tickets de stream: no sirven como token de acceso
+TIPO_TICKET_STREAM = "stream"
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="api/auth/login", auto_error=False)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -64,23 +70,40 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    # jti identifica el token para poder revocarlo (logout)
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> Usuario:
+def create_stream_ticket(username: str, access_jti: Optional[str]) -> Tuple[str, datetime]:
+    """
+    Ticket corto y de un solo uso para abrir un stream SSE (EventSource no permite headers).
+    Va en la URL en lugar del token de acceso, que quedaría en los logs de acceso del proxy.
+    """
+    expira = datetime.now(timezone.utc) + timedelta(seconds=settings.eventos_ticket_segundos)
+    ticket = jwt.encode(
+        {"sub": username, "tipo": TIPO_TICKET_STREAM, "sid": access_jti, "exp": expira, "jti": uuid.uuid4().hex},
+        settings.secret_key,
+        algorithm=settings.algorithm
+    )
+    return ticket, expira
+
+def get_user_from_token(db: Session, token: Optional[str]) -> Usuario:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    if not token:
+        raise credentials_exception
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         username: str = payload.get("sub")
-        if username is None:
+        if username is None or payload.get("tipo") == TIPO_TICKET_STREAM:
+            raise credentials_exception
+        # Tokens emitidos antes de la revocación no tienen jti: valen hasta su exp
+        jti = payload.get("jti")
+        if jti and lista_revocacion.esta_revocado(jti):
             raise credentials_exception
         token_data = TokenData(username=username)
     except JWTError:
@@ -91,9 +114,76 @@ async def get_current_user(
         raise credentials_exception
     return user
 
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Usuario:
+    return get_user_from_token(db, token)
+
 async def get_current_active_user(
     current_user: Usuario = Depends(get_current_user)
 ) -> Usuario:
     if not current_user.activo:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+def get_user_from_stream_ticket(db: Session, ticket: Optional[str]) -> Usuario:
+    """
+    Valida un ticket de create_stream_ticket y lo consume: su jti queda en tokens_revocados
+    (hasta que vence), así otro worker tampoco lo acepta. Hace commit.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+    )
+    if not ticket:
+        raise credentials_exception
+    try:
+        payload = jwt.decode(ticket, settings.secret_key, algorithms=[settings.algorithm])
+    except JWTError:
+        raise credentials_exception
+    username = payload.get("sub")
+    jti = payload.get("jti")
+    if payload.get("tipo") != TIPO_TICKET_STREAM or not username or not jti:
+        raise credentials_exception
+    # El token de acceso que pidió el ticket no puede estar revocado (logout)
+    if payload.get("sid") and lista_revocacion.esta_revocado(payload["sid"]):
+        raise credentials_exception
+
+    user = db.query(Usuario).filter(Usuario.username == username).first()
+    if user is None:
+        raise credentials_exception
+    if not registrar_jti(db, jti, user.id, datetime.fromtimestamp(payload["exp"], tz=timezone.utc)):
+        db.rollback()
+        raise credentials_exception  # Ya usado
+    db.commit()
+    return user
+
+async def get_current_active_user_stream(
+    request: Request,
+    token_header: Optional[str] = Depends(oauth2_scheme_optional),
+    ticket: Optional[str] = Query(None, description="Ticket de POST /api/eventos/ticket (EventSource no permite headers)")
+) -> Usuario:
+    """
+    Autenticación para respuestas de larga duración (SSE).
+    Acepta el token en el header Authorization o un ticket de un solo uso en ?ticket=;
+    el token de acceso nunca va en la URL (quedaría en los logs de acceso).
+    Deja en request.state.sesion_jti el jti del token de acceso (el sid del ticket) para
+    que el stream se cierre si ese token se revoca (logout).
+    Usa una sesión propia que se cierra de inmediato para no retener
+    una conexión del pool mientras el stream está abierto.
+    """
+    db = SessionLocal()
+    try:
+        if token_header:
+            current_user = get_user_from_token(db, token_header)
+            request.state.sesion_jti = jwt.get_unverified_claims(token_header).get("jti")
+        else:
+            current_user = get_user_from_stream_ticket(db, ticket)
+            request.state.sesion_jti = jwt.get_unverified_claims(ticket).get("sid")
+        if not current_user.activo:
+            raise HTTPException(status_code=400, detail="Inactive user")
+        db.expunge(current_user)
+        return current_user
+    finally:
+        db.close()
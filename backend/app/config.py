@@ -9,6 +9,73 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 480  # 8 horas (aumentado de 30 min)
     upload_dir: str = "/app/uploads"  # Ruta absoluta dentro del contenedor
 
+    # Réplica de solo lectura (opcional) para reportes y dashboard
+    database_replica_url: str = ""
+    replica_max_lag_seconds: float = 10  # Con más lag las lecturas vuelven al primario
+    replica_lag_check_interval: float = 5  # Segundos entre mediciones de lag
+
+    # Pool de conexiones (por worker)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+
+    # Servidor de producción (serve.py / gunicorn.conf.py)
+    web_bind: str = "0.0.0.0:3035"
+    web_workers: int = 0  # 0 = automático según CPU y DB_MAX_CONNECTIONS
+    db_max_connections: int = 90  # Conexiones de la base reservadas para la API (todos los workers)
+    web_max_requests: int = 5000  # Reciclar cada worker tras N requests (0 = nunca)
+    web_max_requests_jitter: int = 500
+    web_timeout: int = 60
+    web_graceful_timeout: int = 30
+
+    # Arranque (app/startup.py)
+    startup_db_max_wait: float = 30  # Segundos esperando a que la base de datos responda
+    db_create_schema: bool = True  # Crear tablas faltantes al arrancar (false: solo reportarlas)
+    particiones_meses_adelante: int = 3  # Particiones mensuales futuras de entregas/fotos_evidencia
+
+    # Servido de /uploads
+    uploads_immutable_max_age: int = 31536000  # 1 año para nombres con hash de contenido
+    uploads_default_max_age: int = 3600  # Archivos legacy (sin hash en el nombre)
+    uploads_offload_header: str = ""  # "X-Accel-Redirect" (nginx), "X-Sendfile" (IIS/Apache) o vacío
+    uploads_offload_prefix: str = "/protected-uploads"  # location interna del proxy para X-Accel-Redirect
+
+    # Archivo de entregas antiguas (app/services/archivo.py)
+    archivo_dir: str = "/app/archive"  # Almacenamiento frío: zips mensuales de fotos
+    archivo_horizonte_dias: int = 730  # Se archivan entregas con fecha_operacion más antigua
+    archivo_lote: int = 500  # Entregas por transacción
+
+    # Idempotency-Key en POST/PATCH (app/middleware/idempotency.py)
+    idempotencia_rutas: str = "/api/entregas,/api/sync"  # Prefijos separados por coma
+    idempotencia_ttl_horas: int = 24  # Tiempo que se recuerda cada clave
+    idempotencia_bloqueo_segundos: int = 120  # Una clave en_proceso más antigua se considera abandonada
+
+    # Sincronización incremental de dispositivos (/api/sync)
+    sync_limite: int = 1000  # Filas máximas por tabla y respuesta (hay_mas=true si quedan)
+    sync_margen_segundos: int = 5  # El watermark se retrasa este margen (transacciones en curso)
+    sync_retencion_dias: int = 30  # Tombstones más antiguos se purgan; un watermark más viejo fuerza sync completo
+
+    # Caché de KPIs del dashboard (app/services/cache_kpis.py)
+    kpis_cache_ttl_segundos: float = 5  # 0 = sin caché
+
+    # Caché de datos maestros (app/services/cache.py)
+    cache_backend: str = "memoria"  # "memoria" (LRU por worker) o "redis" (compartido)
+    cache_redis_url: str = "redis://localhost:6379/0"
+    cache_redis_prefijo: str = "avery:cache"
+    cache_max_entradas: int = 2048  # Solo backend memoria
+    cache_ttl_segundos: str = "tipos_vehiculo=600,vehiculos=120,roles=600,pages=600"  # entidad=segundos, 0 = sin caché
+    cache_ttl_defecto_segundos: float = 300
+
+    # Revocación de tokens (app/services/revocacion.py)
+    revocacion_refresco_segundos: float = 5  # Cada cuánto un worker trae las revocaciones de los demás
+    revocacion_recarga_completa_segundos: float = 3600  # Reconstruye el filtro sin los tokens ya vencidos
+    revocacion_capacidad: int = 10000  # Tokens revocados vigentes previstos (tamaño del filtro de Bloom)
+    eventos_ticket_segundos: int = 30  # Vigencia del ticket de un solo uso para abrir el stream SSE
+
+    # Cola de trabajos en segundo plano (tabla jobs)
+    jobs_enabled: bool = True
+    jobs_workers: int = 1  # Hilos por proceso
+    jobs_poll_interval: float = 1.0  # Segundos entre consultas con la cola vacía
+    jobs_lock_timeout: int = 600  # Segundos para recuperar trabajos huérfanos
+
     class Config:
         env_file = ".env"
 
@@ -1,18 +1,119 @@
-from sqlalchemy import create_engine
+import logging
+import threading
+import time
+from typing import Optional
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
-engine = create_engine(settings.database_url)
+
+def _engine_options(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return {}
+    return {"pool_size": settings.db_pool_size, "max_overflow": settings.db_max_overflow}
+
+
+engine = create_engine(settings.database_url, **_engine_options(settings.database_url))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# ✅ Réplica de solo lectura opcional (DATABASE_REPLICA_URL) para reportes y dashboard
+replica_engine: Optional[Engine] = None
+ReplicaSessionLocal: Optional[sessionmaker] = None
+if settings.database_replica_url:
+    replica_engine = create_engine(
+        settings.database_replica_url, **_engine_options(settings.database_replica_url)
+    )
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
 Base = declarative_base()
 
+
+class ReplicaLagMonitor:
+    """
+    Mide el retraso de la réplica (cacheado REPLICA_LAG_CHECK_INTERVAL segundos)
+    y decide si las lecturas pueden ir a ella o deben volver al primario.
+    """
+
+    # 0 si la réplica está al día; si no, segundos desde la última transacción aplicada
+    LAG_QUERY = text(
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    )
+
+    def __init__(self, replica: Optional[Engine], max_lag: float, check_interval: float):
+        self.replica = replica
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag: Optional[float] = None  # None = réplica no disponible
+        self._checked_at = float("-inf")
+        self._usable = False
+        self._lock = threading.Lock()
+
+    def medir_lag(self) -> Optional[float]:
+        try:
+            with self.replica.connect() as conexion:
+                if self.replica.dialect.name != "postgresql":
+                    conexion.execute(text("SELECT 1"))
+                    return 0.0
+                return float(conexion.execute(self.LAG_QUERY).scalar() or 0)
+        except Exception as e:
+            logger.warning(f"⚠️  Réplica no disponible: {str(e)}")
+            return None
+
+    def replica_disponible(self) -> bool:
+        if self.replica is None:
+            return False
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return self._usable
+        with self._lock:
+            if time.monotonic() - self._checked_at < self.check_interval:
+                return self._usable
+            self.lag = self.medir_lag()
+            usable = self.lag is not None and self.lag <= self.max_lag
+            if usable != self._usable:
+                if usable:
+                    logger.info(f"✅ Lecturas enrutadas a la réplica (lag {self.lag:.1f}s)")
+                else:
+                    logger.warning(
+                        f"⚠️  Lecturas enrutadas al primario: lag de réplica "
+                        f"{'desconocido' if self.lag is None else f'{self.lag:.1f}s'} "
+                        f"(máximo {self.max_lag:.0f}s)"
+                    )
+            self._usable = usable
+            self._checked_at = time.monotonic()
+            return usable
+
+
+replica_monitor = ReplicaLagMonitor(
+    replica_engine, settings.replica_max_lag_seconds, settings.replica_lag_check_interval
+)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """
+    Sesión para rutas de solo lectura (reportes, dashboard, consultas).
+    Usa la réplica si está configurada y su lag es aceptable; si no, el primario.
+    """
+    if replica_monitor.replica_disponible():
+        db = ReplicaSessionLocal()
+        db.info["replica"] = True
+    else:
+        db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,17 @@
+"""
+Dependency de FastAPI para los cargadores por lotes (app/services/cargadores.py)
+"""
+from fastapi import Depends
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.services.cargadores import Cargadores
+
+
+def get_cargadores(db: Session = Depends(get_db)) -> Cargadores:
+    """
+    Cargadores del request actual, sobre la misma sesión que recibe la ruta
+    (FastAPI resuelve get_db una sola vez por request).
+
+    Las rutas que usan get_read_db crean los suyos con Cargadores(db).
+    """
+    return Cargadores(db)
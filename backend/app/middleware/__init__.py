@@ -1,3 +1,5 @@
 from .logging import LoggingMiddleware, log_startup_info
+from .worker_stats import WorkerStatsMiddleware
+from .idempotency import IdempotencyMiddleware
 
-__all__ = ['LoggingMiddleware', 'log_startup_info']
+__all__ = ['LoggingMiddleware', 'log_startup_info', 'WorkerStatsMiddleware', 'IdempotencyMiddleware']
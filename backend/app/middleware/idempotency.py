@@ -0,0 +1,191 @@
+"""
+Middleware de Idempotency-Key para POST/PATCH
+✅ Un reintento con la misma clave (por usuario) devuelve la respuesta original sin
+   volver a ejecutar la escritura ni guardar otra vez la foto (header Idempotent-Replayed: true)
+✅ Si la original sigue ejecutándose responde 409 con Retry-After
+✅ Solo se guardan respuestas 2xx: si la escritura falla, el reintento se ejecuta de nuevo
+✅ La misma clave con otro cuerpo (SHA-256) responde 422; en multipart no cuenta el boundary,
+   que el cliente puede cambiar en cada reintento
+✅ Aplica a los prefijos de IDEMPOTENCIA_RUTAS (por defecto /api/entregas y /api/sync)
+"""
+import hashlib
+import logging
+import re
+from typing import List, Optional, Sequence
+
+from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.services.idempotencia import Reserva, completar_clave, liberar_clave, reservar_clave
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+HEADER = "idempotency-key"
+MAX_LONGITUD_CLAVE = 100
+METODOS = ("POST", "PATCH")
+BOUNDARY_RE = re.compile(r'boundary="?([^";]+)"?', re.IGNORECASE)
+
+
+def _sujeto(authorization: Optional[str]) -> Optional[str]:
+    """Username del token (sin validar el usuario: de eso se encarga la ruta)"""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        payload = jwt.decode(authorization[7:], settings.secret_key, algorithms=[settings.algorithm])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
+async def _leer_cuerpo(receive) -> List[dict]:
+    """Mensajes http.request de la petición completa (para repetirlos a la ruta)"""
+    mensajes = []
+    while True:
+        mensaje = await receive()
+        mensajes.append(mensaje)
+        if mensaje["type"] != "http.request" or not mensaje.get("more_body", False):
+            return mensajes
+
+
+def _hash_cuerpo(mensajes: List[dict], content_type: Optional[str]) -> str:
+    cuerpo = b"".join(m.get("body", b"") for m in mensajes if m["type"] == "http.request")
+    boundary = BOUNDARY_RE.search(content_type or "")
+    if boundary and content_type.lower().startswith("multipart/"):
+        cuerpo = cuerpo.replace(boundary.group(1).encode("latin-1"), b"")
+    return hashlib.sha256(cuerpo).hexdigest()
+
+
+def _reservar(sujeto: str, clave: str, metodo: str, ruta: str, hash_cuerpo: str) -> Reserva:
+    db = SessionLocal()
+    try:
+        reserva = reservar_clave(db, sujeto, clave, metodo, ruta, hash_cuerpo)
+        if reserva.registro is not None:
+            db.expunge(reserva.registro)
+        return reserva
+    finally:
+        db.close()
+
+
+def _completar(registro_id: int, status_code: int, content_type: Optional[str], respuesta: bytes) -> None:
+    db = SessionLocal()
+    try:
+        completar_clave(db, registro_id, status_code, content_type, respuesta)
+    finally:
+        db.close()
+
+
+def _liberar(registro_id: int) -> None:
+    db = SessionLocal()
+    try:
+        liberar_clave(db, registro_id)
+    finally:
+        db.close()
+
+
+class IdempotencyMiddleware:
+    """Middleware ASGI: solo actúa si la petición trae Idempotency-Key"""
+
+    def __init__(self, app, prefijos: Optional[Sequence[str]] = None):
+        self.app = app
+        if prefijos is None:
+            prefijos = [p.strip() for p in settings.idempotencia_rutas.split(",") if p.strip()]
+        self.prefijos = tuple(prefijos)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in METODOS
+            or not self.prefijos
+            or not scope["path"].startswith(self.prefijos)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        clave = headers.get(HEADER)
+        if clave is None:
+            await self.app(scope, receive, send)
+            return
+        clave = clave.strip()
+        if not clave or len(clave) > MAX_LONGITUD_CLAVE:
+            respuesta = JSONResponse(
+                status_code=400,
+                content={"detail": f"Idempotency-Key inválida (1 a {MAX_LONGITUD_CLAVE} caracteres)"}
+            )
+            await respuesta(scope, receive, send)
+            return
+
+        sujeto = _sujeto(headers.get("authorization"))
+        if sujeto is None:
+            # Sin token válido la ruta responde 401
+            await self.app(scope, receive, send)
+            return
+
+        mensajes = await _leer_cuerpo(receive)
+        receive_original = receive
+
+        async def receive():
+            if mensajes:
+                return mensajes.pop(0)
+            return await receive_original()
+
+        metodo, ruta = scope["method"], scope["path"]
+        hash_cuerpo = _hash_cuerpo(mensajes, headers.get("content-type"))
+        reserva = await run_in_threadpool(_reservar, sujeto, clave, metodo, ruta, hash_cuerpo)
+
+        if reserva.estado == "repetida":
+            registro = reserva.registro
+            logger.info(f"🔁 Idempotency-Key repetida: {metodo} {ruta} (respuesta guardada)")
+            respuesta = Response(
+                content=registro.respuesta or b"",
+                status_code=registro.status_code,
+                media_type=registro.content_type,
+                headers={"Idempotent-Replayed": "true"}
+            )
+            await respuesta(scope, receive, send)
+            return
+        if reserva.estado == "conflicto":
+            respuesta = JSONResponse(
+                status_code=422,
+                content={"detail": "La Idempotency-Key ya se usó en otra operación o con otro cuerpo"}
+            )
+            await respuesta(scope, receive, send)
+            return
+        if reserva.estado == "en_proceso":
+            respuesta = JSONResponse(
+                status_code=409,
+                content={"detail": "La petición original con esta Idempotency-Key todavía se está procesando"},
+                headers={"Retry-After": "1"}
+            )
+            await respuesta(scope, receive, send)
+            return
+
+        registro_id = reserva.registro.id
+        status_code = 500
+        content_type = None
+        cuerpo = []
+
+        async def send_wrapper(message):
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = Headers(raw=message.get("headers", [])).get("content-type")
+            elif message["type"] == "http.response.body":
+                cuerpo.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            await run_in_threadpool(_liberar, registro_id)
+            raise
+
+        if 200 <= status_code < 300:
+            await run_in_threadpool(_completar, registro_id, status_code, content_type, b"".join(cuerpo))
+        else:
+            await run_in_threadpool(_liberar, registro_id)
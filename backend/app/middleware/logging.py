@@ -6,6 +6,7 @@ import time
 from fastapi import Request, status
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
+from app.utils.log_sanitizer import sanitize_dict
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +30,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         
         # Query params
         if request.query_params:
-            logger.info(f"   Query: {dict(request.query_params)}")
+            logger.info(f"   Query: {sanitize_dict(dict(request.query_params))}")
         
         # Tiempo de inicio
         start_time = time.time()
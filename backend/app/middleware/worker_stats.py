@@ -0,0 +1,156 @@
+"""
+Estadísticas por worker (proceso) del servidor
+✅ Cada worker cuenta requests, requests en curso, errores 5xx y tiempo acumulado
+✅ Con WORKER_STATS_DIR (lo define serve.py / gunicorn.conf.py) cada worker publica su
+   snapshot en <dir>/<pid>.json, así cualquier worker puede reportar los de todos
+"""
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Intervalo mínimo entre escrituras del snapshot a disco
+FLUSH_INTERVAL_SECONDS = 1.0
+
+
+class WorkerStats:
+    """Contadores del proceso actual (se reinician solos después de un fork)"""
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self) -> None:
+        self.pid = os.getpid()
+        self.started_at = datetime.now(timezone.utc)
+        self.requests = 0
+        self.in_flight = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.last_request_at: Optional[datetime] = None
+        self._last_flush = 0.0
+
+    def _check_fork(self) -> None:
+        # Con preload la instancia se crea en el master; cada worker empieza de cero
+        if os.getpid() != self.pid:
+            self._reset()
+
+    @property
+    def directory(self) -> Optional[Path]:
+        value = os.environ.get("WORKER_STATS_DIR")
+        return Path(value) if value else None
+
+    def request_started(self) -> None:
+        self._check_fork()
+        self.in_flight += 1
+
+    def request_finished(self, status_code: int, elapsed_ms: float) -> None:
+        self.in_flight -= 1
+        self.requests += 1
+        if status_code >= 500:
+            self.errors += 1
+        self.total_ms += elapsed_ms
+        self.last_request_at = datetime.now(timezone.utc)
+        self.flush()
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._check_fork()
+        return {
+            "pid": self.pid,
+            "started_at": self.started_at.isoformat(),
+            "uptime_s": round((datetime.now(timezone.utc) - self.started_at).total_seconds(), 1),
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "errors_5xx": self.errors,
+            "avg_ms": round(self.total_ms / self.requests, 2) if self.requests else 0.0,
+            "last_request_at": self.last_request_at.isoformat() if self.last_request_at else None,
+        }
+
+    def flush(self, force: bool = False) -> None:
+        """Escribe el snapshot en WORKER_STATS_DIR (como mucho una vez por segundo)"""
+        directory = self.directory
+        if directory is None:
+            return
+        self._check_fork()
+        now = time.monotonic()
+        if not force and now - self._last_flush < FLUSH_INTERVAL_SECONDS:
+            return
+        self._last_flush = now
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            temp_path = directory / f".{self.pid}.json.tmp"
+            temp_path.write_text(json.dumps(self.snapshot()))
+            os.replace(temp_path, directory / f"{self.pid}.json")
+        except OSError as e:
+            logger.warning(f"⚠️  No se pudieron guardar estadísticas del worker: {str(e)}")
+
+
+worker_stats = WorkerStats()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def read_all_worker_stats() -> List[Dict[str, Any]]:
+    """Snapshots de todos los workers vivos (o solo el actual sin WORKER_STATS_DIR)"""
+    worker_stats.flush(force=True)
+    directory = worker_stats.directory
+    if directory is None or not directory.is_dir():
+        return [worker_stats.snapshot()]
+
+    workers = []
+    for path in directory.glob("*.json"):
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        if data.get("pid") == os.getpid() or _pid_alive(data.get("pid", 0)):
+            workers.append(data)
+        else:
+            path.unlink(missing_ok=True)
+    return sorted(workers, key=lambda w: w["pid"])
+
+
+def remove_worker_stats(pid: int) -> None:
+    """Elimina el snapshot de un worker que terminó (hook child_exit de gunicorn)"""
+    directory = worker_stats.directory
+    if directory is not None:
+        (directory / f"{pid}.json").unlink(missing_ok=True)
+
+
+class WorkerStatsMiddleware:
+    """Middleware ASGI liviano (no envuelve el body, apto para SSE)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        worker_stats.request_started()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            worker_stats.request_finished(status_code, (time.perf_counter() - start) * 1000)
@@ -4,6 +4,11 @@ from app.models.page import Page
 from app.models.permisos import PermisosRol, PermisosUsuario
 from app.models.operacion import OperacionDiaria, VehiculoOperacion
 from app.models.entrega import Entrega, FotoEvidencia
+from app.models.job import Job
+from app.models.archivo import EntregaArchivada
+from app.models.idempotencia import ClaveIdempotencia
+from app.models.sync import EliminacionSync
+from app.models.revocacion import TokenRevocado
 
 __all__ = [
     "Usuario",
@@ -14,5 +19,10 @@ __all__ = [
     "OperacionDiaria",
     "VehiculoOperacion",
     "Entrega",
-    "FotoEvidencia"
+    "FotoEvidencia",
+    "Job",
+    "EntregaArchivada",
+    "ClaveIdempotencia",
+    "EliminacionSync",
+    "TokenRevocado"
 ]
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, LargeBinary
+from sqlalchemy.sql import func
+from app.database import Base
+
+class EntregaArchivada(Base):
+    """
+    Entrega movida al archivo (ver app/services/archivo.py).
+    La entrega completa y la metadata de sus fotos se guardan como JSON comprimido (zlib);
+    los archivos de las fotos quedan en un zip mensual del almacenamiento frío.
+    """
+    __tablename__ = "entregas_archivadas"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)  # Mismo id de la entrega original
+    vehiculo_operacion_id = Column(Integer, nullable=False, index=True)
+    numero_factura = Column(String(50), nullable=False, index=True)
+    # Detección de facturas duplicadas y GET /api/entregas/factura/{numero} (migración 018)
+    factura_normalizada = Column(String(50), index=True)
+    estado = Column(String(20))
+    fecha_operacion = Column(Date, nullable=False, index=True)
+    datos = Column(LargeBinary, nullable=False)
+    paquete_fotos = Column(String(200))  # Zip relativo a ARCHIVO_DIR (None si no tenía fotos)
+    total_fotos = Column(Integer, nullable=False, default=0)
+    archivado_en = Column(DateTime(timezone=True), server_default=func.now())
@@ -3,18 +3,27 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 from app.database import Base
+from app.utils.facturas import normalizar_factura
 
 class EstadoEntrega(str, enum.Enum):
     PENDIENTE = "pendiente"
     CUMPLIDO = "cumplido"
     NO_CUMPLIDO = "no_cumplido"
 
+def _factura_normalizada(context) -> str:
+    return normalizar_factura(context.get_current_parameters().get("numero_factura"))
+
 class Entrega(Base):
+    # En PostgreSQL la tabla está particionada por mes de fecha_operacion
+    # (migrations/008_partition_entregas.sql). La PK real es (id, fecha_operacion): la base
+    # no impide ids repetidos, la unicidad depende solo de la secuencia. El ORM usa id como clave.
     __tablename__ = "entregas"
 
     id = Column(Integer, primary_key=True, index=True)
     vehiculo_operacion_id = Column(Integer, ForeignKey("vehiculos_operacion.id", ondelete="CASCADE"), nullable=False)
     numero_factura = Column(String(50), nullable=False)
+    # Búsqueda exacta por factura (en PostgreSQL la mantiene también un trigger, ver migración 013)
+    factura_normalizada = Column(String(50), index=True, default=_factura_normalizada)
     cliente = Column(String(200))
     observacion = Column(Text)
     estado = Column(String(20), default="pendiente", index=True)
@@ -30,6 +39,8 @@ class Entrega(Base):
     usuario_cumplido = relationship("Usuario", foreign_keys=[usuario_cumplido_id])
 
 class FotoEvidencia(Base):
+    # Particionada por mes de uploaded_at. entrega_id no es FK en la base particionada
+    # (cascada por trigger); el ForeignKey se mantiene para el ORM y esquemas sin particionar.
     __tablename__ = "fotos_evidencia"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -38,7 +49,7 @@ class FotoEvidencia(Base):
     nombre_archivo = Column(String(200))
     tipo_mime = Column(String(100))
     tamano_bytes = Column(Integer)
-    uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
+    uploaded_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     entrega = relationship("Entrega", back_populates="fotos")
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, UniqueConstraint
+from app.database import Base
+
+class ClaveIdempotencia(Base):
+    """
+    Idempotency-Key recibida en un POST/PATCH (ver app/middleware/idempotency.py).
+    Mientras la escritura se ejecuta queda en_proceso; al terminar con 2xx guarda la
+    respuesta para devolverla tal cual en los reintentos hasta expira_en.
+    """
+    __tablename__ = "claves_idempotencia"
+
+    id = Column(Integer, primary_key=True)
+    clave = Column(String(100), nullable=False)
+    sujeto = Column(String(100), nullable=False)  # username del token: las claves son por usuario
+    metodo = Column(String(10), nullable=False)
+    ruta = Column(String(300), nullable=False)
+    hash_cuerpo = Column(String(64))  # SHA-256 del cuerpo (NULL en claves anteriores a 020)
+    estado = Column(String(20), nullable=False, default="en_proceso")  # en_proceso | completado
+    status_code = Column(Integer)
+    content_type = Column(String(100))
+    respuesta = Column(LargeBinary)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    expira_en = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    __table_args__ = (
+        UniqueConstraint("sujeto", "clave", name="uq_claves_idempotencia_sujeto_clave"),
+    )
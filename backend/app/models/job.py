@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from sqlalchemy.sql import func
+import enum
+from app.database import Base
+
+class EstadoJob(str, enum.Enum):
+    PENDIENTE = "pendiente"
+    EN_PROCESO = "en_proceso"
+    COMPLETADO = "completado"
+    FALLIDO = "fallido"
+
+class Job(Base):
+    """Trabajo en segundo plano (cola persistente, ver app/services/jobs.py)"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tipo = Column(String(100), nullable=False, index=True)
+    payload = Column(JSON, nullable=False, default=dict)
+    estado = Column(String(20), nullable=False, default="pendiente")
+    prioridad = Column(Integer, nullable=False, default=0)  # Mayor número = se ejecuta antes
+    intentos = Column(Integer, nullable=False, default=0)
+    max_intentos = Column(Integer, nullable=False, default=5)
+    ejecutar_despues = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    bloqueado_por = Column(String(100))
+    bloqueado_en = Column(DateTime(timezone=True))
+    ultimo_error = Column(Text)
+    resultado = Column(JSON)
+    usuario_id = Column(Integer)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finalizado_en = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # Índice para el claim: pendientes ordenados por prioridad y fecha
+        Index("ix_jobs_claim", "estado", "prioridad", "ejecutar_despues"),
+    )
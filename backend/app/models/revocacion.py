@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+class TokenRevocado(Base):
+    """
+    Token JWT revocado antes de vencer (logout), identificado por su claim jti.
+    Cada worker mantiene la lista en memoria (app/services/revocacion.py); las filas
+    sirven hasta expira_en (el exp del token) y luego se purgan.
+    """
+    __tablename__ = "tokens_revocados"
+
+    id = Column(Integer, primary_key=True)
+    jti = Column(String(64), unique=True, nullable=False)
+    usuario_id = Column(Integer, ForeignKey("usuarios.id", ondelete="CASCADE"))
+    revocado_en = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    expira_en = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,91 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index, DDL, event
+from sqlalchemy.sql import func
+from app.database import Base
+
+class EliminacionSync(Base):
+    """
+    Tombstone de una fila borrada de entregas, fotos_evidencia o vehiculos_operacion
+    (la registran triggers en la base, ver migrations/011_create_sync_eliminaciones.sql).
+    GET /api/sync la devuelve para que los dispositivos borren su copia local.
+    """
+    __tablename__ = "sync_eliminaciones"
+
+    id = Column(Integer, primary_key=True)
+    tabla = Column(String(50), nullable=False)
+    registro_id = Column(Integer, nullable=False)
+    vehiculo_operacion_id = Column(Integer)  # NULL solo en tombstones anteriores a la migración 016
+    eliminado_en = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_sync_eliminaciones_vehiculo_eliminado", "vehiculo_operacion_id", "eliminado_en"),
+        Index("ix_sync_eliminaciones_eliminado_en", "eliminado_en"),
+    )
+
+
+# Triggers para esquemas creados con create_all (DB_CREATE_SCHEMA / SQLite en pruebas).
+# Con migraciones los crean 011_create_sync_eliminaciones.sql y 016_sync_eliminaciones_fotos.sql
+# (mismo SQL para PostgreSQL).
+VEHICULO_DE_FILA_BORRADA = {
+    "entregas": "OLD.vehiculo_operacion_id",
+    "vehiculos_operacion": "OLD.id",
+    "fotos_evidencia": "(SELECT vehiculo_operacion_id FROM entregas WHERE id = OLD.entrega_id)",
+}
+
+FUNCION_POSTGRESQL = """
+CREATE OR REPLACE FUNCTION registrar_eliminacion_sync() RETURNS TRIGGER AS $$
+DECLARE
+    vehiculo INTEGER;
+BEGIN
+    IF TG_ARGV[0] = 'entregas' THEN
+        vehiculo := OLD.vehiculo_operacion_id;
+    ELSIF TG_ARGV[0] = 'vehiculos_operacion' THEN
+        vehiculo := OLD.id;
+    ELSE
+        SELECT vehiculo_operacion_id INTO vehiculo FROM entregas WHERE id = OLD.entrega_id;
+        IF vehiculo IS NULL THEN
+            RETURN OLD;  -- Borrada en cascada: la registró registrar_eliminacion_fotos_sync
+        END IF;
+    END IF;
+    INSERT INTO sync_eliminaciones (tabla, registro_id, vehiculo_operacion_id)
+    VALUES (TG_ARGV[0], OLD.id, vehiculo);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# En la cascada la entrega ya no existe cuando se borran sus fotos: se registran antes (BEFORE DELETE)
+FUNCION_FOTOS_POSTGRESQL = """
+CREATE OR REPLACE FUNCTION registrar_eliminacion_fotos_sync() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO sync_eliminaciones (tabla, registro_id, vehiculo_operacion_id)
+    SELECT 'fotos_evidencia', id, OLD.vehiculo_operacion_id FROM fotos_evidencia WHERE entrega_id = OLD.id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+event.listen(Base.metadata, "after_create", DDL(FUNCION_POSTGRESQL).execute_if(dialect="postgresql"))
+event.listen(Base.metadata, "after_create", DDL(FUNCION_FOTOS_POSTGRESQL).execute_if(dialect="postgresql"))
+event.listen(Base.metadata, "after_create", DDL(
+    "DROP TRIGGER IF EXISTS trg_entregas_sync_eliminacion_fotos ON entregas; "
+    "CREATE TRIGGER trg_entregas_sync_eliminacion_fotos BEFORE DELETE ON entregas "
+    "FOR EACH ROW EXECUTE FUNCTION registrar_eliminacion_fotos_sync()"
+).execute_if(dialect="postgresql"))
+event.listen(Base.metadata, "after_create", DDL(
+    "CREATE TRIGGER IF NOT EXISTS trg_entregas_sync_eliminacion_fotos BEFORE DELETE ON entregas "
+    "BEGIN INSERT INTO sync_eliminaciones (tabla, registro_id, vehiculo_operacion_id) "
+    "SELECT 'fotos_evidencia', id, OLD.vehiculo_operacion_id FROM fotos_evidencia WHERE entrega_id = OLD.id; END"
+).execute_if(dialect="sqlite"))
+
+for _tabla, _vehiculo in VEHICULO_DE_FILA_BORRADA.items():
+    event.listen(Base.metadata, "after_create", DDL(
+        f"DROP TRIGGER IF EXISTS trg_{_tabla}_sync_eliminacion ON {_tabla}; "
+        f"CREATE TRIGGER trg_{_tabla}_sync_eliminacion AFTER DELETE ON {_tabla} "
+        f"FOR EACH ROW EXECUTE FUNCTION registrar_eliminacion_sync('{_tabla}')"
+    ).execute_if(dialect="postgresql"))
+    event.listen(Base.metadata, "after_create", DDL(
+        f"CREATE TRIGGER IF NOT EXISTS trg_{_tabla}_sync_eliminacion AFTER DELETE ON {_tabla} "
+        f"{'WHEN ' + _vehiculo + ' IS NOT NULL ' if _tabla == 'fotos_evidencia' else ''}"
+        f"BEGIN INSERT INTO sync_eliminaciones (tabla, registro_id, vehiculo_operacion_id) "
+        f"VALUES ('{_tabla}', OLD.id, {_vehiculo}); END"
+    ).execute_if(dialect="sqlite"))
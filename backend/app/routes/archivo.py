@@ -0,0 +1,58 @@
+"""
+Endpoints del archivo de entregas antiguas (ver app/services/archivo.py)
+"""
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models.usuario import Usuario
+from app.models.archivo import EntregaArchivada
+from app.schemas.job import JobEncolado
+from app.dependencies.authorization import require_admin
+from app.services.jobs import encolar_job
+import app.services.archivo  # noqa: F401 - registra el handler archivo.archivar_entregas
+
+router = APIRouter(prefix="/api/archivo", tags=["archivo"])
+
+
+@router.post("/entregas", response_model=JobEncolado, status_code=status.HTTP_202_ACCEPTED)
+def archivar_entregas(
+    antes_de: Optional[date] = Query(None, description="Por defecto: hoy - ARCHIVO_HORIZONTE_DIAS"),
+    lote: Optional[int] = Query(None, ge=1, le=10000),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_admin)
+):
+    """
+    ✅ Encola el archivado de entregas con fecha_operacion anterior a `antes_de`
+    ✅ Consultar el avance en /api/jobs/{job_id}. Requiere rol Administrador
+    """
+    if antes_de and antes_de > date.today():
+        raise HTTPException(status_code=400, detail="No se pueden archivar entregas futuras")
+
+    job = encolar_job(
+        db,
+        "archivo.archivar_entregas",
+        {"antes_de": antes_de.isoformat() if antes_de else None, "lote": lote},
+        prioridad=0,
+        max_intentos=3,
+        usuario_id=current_user.id
+    )
+    db.commit()
+    return {"message": "Archivado de entregas encolado", "job_id": job.id, "estado": job.estado}
+
+
+@router.get("/entregas/resumen")
+def resumen_archivo(
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_admin)
+):
+    """Entregas y fotos en el archivo, y su rango de fechas. Requiere rol Administrador"""
+    total, fotos, desde, hasta = db.query(
+        func.count(EntregaArchivada.id),
+        func.coalesce(func.sum(EntregaArchivada.total_fotos), 0),
+        func.min(EntregaArchivada.fecha_operacion),
+        func.max(EntregaArchivada.fecha_operacion)
+    ).one()
+    return {"entregas": total, "fotos": fotos, "fecha_desde": desde, "fecha_hasta": hasta}
@@ -1,6 +1,7 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from jose import jwt
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.usuario import Usuario
@@ -9,9 +10,13 @@ from app.auth import (
     authenticate_user,
     create_access_token,
     get_password_hash,
-    get_current_active_user
+    get_current_active_user,
+    oauth2_scheme
 )
 from app.config import get_settings
+from app.dependencies.cargadores import get_cargadores
+from app.services.cargadores import Cargadores
+from app.services.revocacion import lista_revocacion
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 settings = get_settings()
@@ -69,7 +74,8 @@ async def read_users_me(
 @router.get("/my-permissions")
 async def get_my_permissions(
     current_user: Usuario = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    cargadores: Cargadores = Depends(get_cargadores)
 ):
     """
     ✅ Obtiene los permisos del usuario actual.
@@ -77,23 +83,29 @@ async def get_my_permissions(
     ✅ Si es admin por rol, retorna TODAS las páginas con todos los permisos.
     ✅ Si no es admin, consulta permisos del rol + permisos especiales del usuario.
     ✅ Retorna permisos detallados (puede_ver, puede_crear, puede_editar, puede_borrar).
+    ✅ Las páginas de ambos se cargan con una sola consulta.
     """
     from app.models.permisos import PermisosUsuario, PermisosRol
     from app.models.page import Page
     from app.services.authorization import AuthorizationService
 
 
-    # ✅ Obtener permisos del ROL del usuario (incluido admin)
+    # ✅ Permisos del ROL del usuario (incluido admin) y especiales del usuario
+    permisos_rol = db.query(PermisosRol).filter(
+        PermisosRol.rol_id == current_user.rol_id
+    ).all() if current_user.rol_id else []
+    permisos_usuario = db.query(PermisosUsuario).filter(
+        PermisosUsuario.usuario_id == current_user.id
+    ).all()
+    pages = cargadores.por(Page.id)
+    pages.pedir(p.page_id for p in permisos_rol + permisos_usuario)
+
     permisos_detallados = {}
 
     if current_user.rol_id:
-        permisos_rol = db.query(PermisosRol).filter(
-            PermisosRol.rol_id == current_user.rol_id
-        ).all()
-
         for p in permisos_rol:
-            page = db.query(Page).filter(Page.id == p.page_id, Page.activo == True).first()
-            if page:
+            page = pages.obtener(p.page_id)
+            if page and page.activo:
                 permisos_detallados[page.ruta] = {
                     "puede_ver": p.puede_ver or False,
                     "puede_crear": p.puede_crear or False,
@@ -102,14 +114,10 @@ async def get_my_permissions(
                 }
 
 
-    # ✅ Obtener permisos especiales del usuario (sobrescriben permisos del rol)
-    permisos_usuario = db.query(PermisosUsuario).filter(
-        PermisosUsuario.usuario_id == current_user.id
-    ).all()
-
+    # ✅ Permisos especiales del usuario (sobrescriben permisos del rol)
     for p in permisos_usuario:
-        page = db.query(Page).filter(Page.id == p.page_id, Page.activo == True).first()
-        if page:
+        page = pages.obtener(p.page_id)
+        if page and page.activo:
             # Los permisos especiales del usuario sobrescriben los del rol
             permisos_detallados[page.ruta] = {
                 "puede_ver": p.puede_ver if p.puede_ver is not None else permisos_detallados.get(page.ruta, {}).get("puede_ver", False),
@@ -135,15 +143,25 @@ async def get_my_permissions(
 
 @router.post("/logout")
 async def logout(
-    current_user: Usuario = Depends(get_current_active_user)
+    token: str = Depends(oauth2_scheme),
+    current_user: Usuario = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
 ):
     """
-    Endpoint de logout. Aunque JWT es stateless y no podemos invalidar el token
-    en el servidor, este endpoint existe para:
-    1. Mantener consistencia en la API
-    2. Permitir logging de eventos de logout
-    3. Posible implementación futura de blacklist de tokens
+    ✅ Revoca el token actual: su jti queda en tokens_revocados hasta que vence.
+    ✅ Los demás workers lo rechazan en máximo REVOCACION_REFRESCO_SEGUNDOS.
+    ✅ Tokens sin jti (emitidos antes de la revocación) solo expiran por exp.
+    ✅ Los streams SSE abiertos con este token se cierran en su siguiente evento o ping.
     """
+    payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    jti = payload.get("jti")
+    if jti:
+        lista_revocacion.revocar(
+            db,
+            jti,
+            current_user.id,
+            datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+        )
     return {
         "message": "Logout successful",
         "username": current_user.username
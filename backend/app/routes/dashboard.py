@@ -1,16 +1,22 @@
 from typing import List
-from fastapi import APIRouter, Depends, Query
+from contextlib import contextmanager
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 import pytz
-from app.database import get_db
+from app.database import get_read_db
 from app.models.usuario import Usuario
 from app.models.operacion import OperacionDiaria, VehiculoOperacion
 from app.models.entrega import Entrega
-from app.schemas.dashboard import DashboardKPIs
-from app.schemas.entrega import EntregaResponse
+from app.schemas.dashboard import DashboardKPIs, TendenciasResponse, ProductividadResponse
+from app.schemas.entrega import EntregaResponse, EntregaBusquedaResponse
 from app.auth import get_current_active_user
+from app.services.busqueda import buscar_entregas_texto
+from app.services.cache_kpis import cache_kpis
+from app.services.tendencias import GRANULARIDADES, ZONA_HORARIA, calcular_tendencias
+from app.services.productividad import calcular_productividad
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
@@ -18,9 +24,29 @@ router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 async def obtener_kpis(
     fecha_inicio: date = None,
     fecha_fin: date = None,
-    db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
+    """
+    ✅ Cacheado unos segundos por (fecha_inicio, fecha_fin, hoy) con cálculo único
+       entre peticiones simultáneas; las escrituras lo invalidan (app/services/cache_kpis.py)
+    """
+    # ✅ Today's date - usando zona horaria de Colombia (compatible Windows/pytz)
+    hoy = datetime.now(pytz.timezone("America/Bogota")).date()
+    if not (fecha_inicio and fecha_fin):
+        fecha_inicio = fecha_fin = None  # Sin rango completo no se filtra
+
+    def calcular_con_sesion():
+        # Sesión propia: el cálculo se comparte entre peticiones y puede terminar después
+        # de que la petición que lo inició se haya cancelado
+        with contextmanager(get_read_db)() as db:
+            return _calcular_kpis(db, fecha_inicio, fecha_fin, hoy)
+
+    async def calcular():
+        return await run_in_threadpool(calcular_con_sesion)
+
+    return await cache_kpis.obtener((fecha_inicio, fecha_fin, hoy), calcular)
+
+def _calcular_kpis(db: Session, fecha_inicio: date, fecha_fin: date, hoy: date) -> DashboardKPIs:
     # Base queries with optional date filters
     operaciones_query = db.query(func.count(OperacionDiaria.id))
     vehiculos_query = db.query(func.count(VehiculoOperacion.id))
@@ -41,9 +67,6 @@ async def obtener_kpis(
     total_vehiculos = vehiculos_query.scalar() or 0
     total_entregas = entregas_query.scalar() or 0
 
-    # ✅ Today's date - usando zona horaria de Colombia (compatible Windows/pytz)
-    hoy = datetime.now(pytz.timezone("America/Bogota")).date()
-
     # ✅ Entregas by status - SOLO DEL DÍA DE HOY (no histórico)
     entregas_pendientes_query = db.query(func.count(Entrega.id)).filter(
         and_(
@@ -94,6 +117,65 @@ async def obtener_kpis(
         entregas_hoy=entregas_hoy
     )
 
+def _rango_fechas(fecha_inicio: date, fecha_fin: date, dias_defecto: int, max_dias: int):
+    """Rango de fechas (hora de Colombia): por defecto los últimos `dias_defecto` días hasta hoy"""
+    fecha_fin = fecha_fin or datetime.now(pytz.timezone(ZONA_HORARIA)).date()
+    fecha_inicio = fecha_inicio or fecha_fin - timedelta(days=dias_defecto - 1)
+    if fecha_inicio > fecha_fin:
+        raise HTTPException(status_code=400, detail="fecha_inicio debe ser anterior a fecha_fin")
+    if (fecha_fin - fecha_inicio).days + 1 > max_dias:
+        raise HTTPException(status_code=400, detail=f"El rango máximo es de {max_dias} días")
+    return fecha_inicio, fecha_fin
+
+@router.get("/tendencias", response_model=TendenciasResponse)
+async def obtener_tendencias(
+    fecha_inicio: date = None,
+    fecha_fin: date = None,
+    granularidad: str = Query("dia", pattern="^(hora|dia|semana)$"),
+    db: Session = Depends(get_read_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    ✅ Entregas por estado y % de cumplimiento por hora, día o semana (hora de Colombia)
+    ✅ dia/semana agrupan por fecha_operacion; hora agrupa las entregas cerradas por hora de cierre
+    ✅ Por defecto: últimos 30 días (hoy si la granularidad es hora)
+    """
+    fecha_inicio, fecha_fin = _rango_fechas(
+        fecha_inicio, fecha_fin,
+        dias_defecto=1 if granularidad == "hora" else 30,
+        max_dias=GRANULARIDADES[granularidad][2]
+    )
+
+    return TendenciasResponse(
+        granularidad=granularidad,
+        fecha_inicio=fecha_inicio,
+        fecha_fin=fecha_fin,
+        zona_horaria=ZONA_HORARIA,
+        puntos=calcular_tendencias(db, fecha_inicio, fecha_fin, granularidad)
+    )
+
+@router.get("/productividad", response_model=ProductividadResponse)
+async def obtener_productividad(
+    fecha_inicio: date = None,
+    fecha_fin: date = None,
+    agrupar: str = Query("vehiculo", pattern="^(vehiculo|operacion)$"),
+    db: Session = Depends(get_read_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    ✅ Productividad por placa u operación: cumplidas por hora, tasa de cumplimiento
+       y mediana de minutos entre cumplidos, con ranking
+    ✅ Calculado en la base con funciones de ventana (lag, percentile_cont, rank)
+    ✅ Por defecto: últimos 30 días; rango máximo 366 días
+    """
+    fecha_inicio, fecha_fin = _rango_fechas(fecha_inicio, fecha_fin, dias_defecto=30, max_dias=366)
+    return ProductividadResponse(
+        agrupar=agrupar,
+        fecha_inicio=fecha_inicio,
+        fecha_fin=fecha_fin,
+        resultados=calcular_productividad(db, fecha_inicio, fecha_fin, agrupar)
+    )
+
 @router.get("/entregas", response_model=List[EntregaResponse])
 async def buscar_entregas(
     fecha_operacion_inicio: date = Query(None),
@@ -104,7 +186,7 @@ async def buscar_entregas(
     estado: str = Query(None),
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     query = db.query(Entrega).join(VehiculoOperacion)
@@ -125,3 +207,30 @@ async def buscar_entregas(
 
     entregas = query.order_by(Entrega.fecha_operacion.desc()).offset(skip).limit(limit).all()
     return entregas
+
+@router.get("/entregas/busqueda", response_model=List[EntregaBusquedaResponse])
+async def buscar_entregas_por_texto(
+    q: str = Query(..., min_length=1, max_length=200, description="Cliente, número de factura u observación"),
+    fecha_operacion_inicio: date = Query(None),
+    fecha_operacion_fin: date = Query(None),
+    estado: str = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_read_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    ✅ Búsqueda de texto en cliente, numero_factura y observacion (sin tildes, por prefijo)
+    ✅ Todos los términos deben aparecer; ordena por relevancia y luego por fecha
+    """
+    resultados = buscar_entregas_texto(
+        db, q, fecha_operacion_inicio, fecha_operacion_fin, estado, skip, limit
+    )
+    respuesta = []
+    for entrega, relevancia in resultados:
+        entrega_dict = EntregaResponse.model_validate(entrega).model_dump()
+        if entrega.usuario_cumplido:
+            entrega_dict['usuario_cumplido_nombre'] = entrega.usuario_cumplido.nombre_completo
+        entrega_dict['relevancia'] = round(relevancia, 4)
+        respuesta.append(entrega_dict)
+    return respuesta
@@ -1,39 +1,51 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session, joinedload
 import os
-import shutil
+import uuid
+import hashlib
 from pathlib import Path
 import logging
 from app.database import get_db
 from app.models.usuario import Usuario
 from app.models.operacion import VehiculoOperacion
 from app.models.entrega import Entrega, FotoEvidencia
+from app.models.archivo import EntregaArchivada
 from app.schemas.entrega import (
     EntregaCreate,
     EntregaResponse,
     EntregaUpdate,
+    EntregaEstadoBatch,
+    EntregaEstadoBatchResponse,
+    EntregaFacturaResponse,
     FotoEvidenciaResponse
 )
 from app.auth import get_current_active_user
+from app.dependencies.cargadores import get_cargadores
 from app.config import get_settings
+from app.utils.static_files import CONTENT_HASH_LENGTH
+from app.services.eventos_entregas import publicar_evento_entrega, publicar_eventos_entregas
+from app.services.archivo import descomprimir, facturas_archivadas, leer_entrega_archivada
+from app.services.entregas import aplicar_reglas_estado
+from app.services.cache_kpis import invalidar_kpis
+from app.services.cargadores import Cargadores
+from app.utils.facturas import normalizar_factura
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/entregas", tags=["entregas"])
 settings = get_settings()
 
-# Ensure upload directory exists with absolute path
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# El directorio se crea y verifica al arrancar (app/startup.py)
 upload_dir = Path(settings.upload_dir).resolve()
-upload_dir.mkdir(parents=True, exist_ok=True)
-logger.info(f"📁 Upload directory configured: {upload_dir}")
 
 @router.post("/", response_model=EntregaResponse, status_code=status.HTTP_201_CREATED)
 async def crear_entrega(
     entrega: EntregaCreate,
+    permitir_duplicado: bool = Query(False, description="Registrar aunque la factura ya exista"),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
@@ -44,9 +56,33 @@ async def crear_entrega(
     if not vehiculo:
         raise HTTPException(status_code=404, detail="Vehículo no encontrado")
 
+    # ✅ Factura duplicada (índice factura_normalizada, también en el archivo). Se puede volver
+    # a despachar una factura no cumplida; cualquier otro caso requiere ?permitir_duplicado=true.
+    # Sin letras ASCII ni dígitos (p. ej. "-" o "Ñ") la factura normalizada queda vacía y no se
+    # puede comparar: no se verifica (todas esas facturas coincidirían entre sí)
+    normalizada = normalizar_factura(entrega.numero_factura)
+    if not permitir_duplicado and normalizada:
+        existente = db.query(Entrega.id, Entrega.fecha_operacion).filter(
+            Entrega.factura_normalizada == normalizada,
+            or_(Entrega.estado.is_(None), Entrega.estado != "no_cumplido")
+        ).first() or db.query(EntregaArchivada.id, EntregaArchivada.fecha_operacion).filter(
+            EntregaArchivada.factura_normalizada == normalizada,
+            or_(EntregaArchivada.estado.is_(None), EntregaArchivada.estado != "no_cumplido")
+        ).first()
+        if existente:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=(
+                    f"La factura {entrega.numero_factura} ya está registrada "
+                    f"(entrega #{existente.id} del {existente.fecha_operacion.isoformat()})"
+                )
+            )
+
     db_entrega = Entrega(**entrega.model_dump())
     db.add(db_entrega)
+    publicar_evento_entrega(db, "entrega_creada", db_entrega, vehiculo.operacion_id)
     db.commit()
+    invalidar_kpis()
     db.refresh(db_entrega)
     return db_entrega
 
@@ -57,6 +93,7 @@ async def listar_entregas(
     vehiculo_operacion_id: int = None,
     estado: str = None,
     db: Session = Depends(get_db),
+    cargadores: Cargadores = Depends(get_cargadores),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     from sqlalchemy.orm import joinedload
@@ -69,6 +106,8 @@ async def listar_entregas(
         query = query.filter(Entrega.estado == estado)
 
     entregas = query.offset(skip).limit(limit).all()
+    # ✅ Fotos de todas las entregas en una consulta (EntregaResponse las incluye)
+    cargadores.relacionar(entregas, Entrega.fotos)
     
     # Add usuario_cumplido_nombre to each entrega
     result = []
@@ -80,6 +119,55 @@ async def listar_entregas(
     
     return result
 
+@router.get("/factura/{numero}", response_model=List[EntregaFacturaResponse])
+async def buscar_por_factura(
+    numero: str,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    ✅ Búsqueda exacta por número de factura (sin distinguir mayúsculas, espacios ni guiones)
+    ✅ Una sola consulta: vehículo, operación, fotos y usuario que cerró la entrega
+    ✅ Más reciente primero (una factura puede tener varias entregas si se volvió a despachar)
+    ✅ Incluye al final las entregas archivadas de la factura (`archivada: true`)
+    """
+    normalizada = normalizar_factura(numero)
+    if not normalizada:
+        raise HTTPException(status_code=400, detail="Número de factura inválido")
+
+    entregas = db.query(Entrega).options(
+        joinedload(Entrega.vehiculo).joinedload(VehiculoOperacion.operacion),
+        joinedload(Entrega.fotos),
+        joinedload(Entrega.usuario_cumplido)
+    ).filter(
+        Entrega.factura_normalizada == normalizada
+    ).order_by(Entrega.fecha_operacion.desc(), Entrega.id.desc()).all()
+    archivadas = facturas_archivadas(db, normalizada)
+
+    if not entregas and not archivadas:
+        raise HTTPException(status_code=404, detail="Factura no encontrada")
+
+    result = []
+    for entrega in entregas:
+        entrega_dict = EntregaFacturaResponse.model_validate(entrega).model_dump()
+        if entrega.usuario_cumplido:
+            entrega_dict['usuario_cumplido_nombre'] = entrega.usuario_cumplido.nombre_completo
+        result.append(entrega_dict)
+
+    # Los vehículos no se archivan: una consulta para los de todas las archivadas
+    vehiculos = {
+        vehiculo.id: vehiculo
+        for vehiculo in db.query(VehiculoOperacion).options(joinedload(VehiculoOperacion.operacion)).filter(
+            VehiculoOperacion.id.in_({archivada.vehiculo_operacion_id for archivada in archivadas})
+        )
+    } if archivadas else {}
+    for archivada in archivadas:
+        entrega_dict = descomprimir(archivada.datos)
+        entrega_dict['vehiculo'] = vehiculos.get(archivada.vehiculo_operacion_id)
+        entrega_dict['archivada'] = True
+        result.append(entrega_dict)
+    return result
+
 @router.get("/{entrega_id}", response_model=EntregaResponse)
 async def obtener_entrega(
     entrega_id: int,
@@ -90,6 +178,10 @@ async def obtener_entrega(
     
     entrega = db.query(Entrega).options(joinedload(Entrega.usuario_cumplido)).filter(Entrega.id == entrega_id).first()
     if not entrega:
+        # ✅ Entregas antiguas: se leen del archivo (sus fotos se sirven desde el zip)
+        archivada = leer_entrega_archivada(db, entrega_id)
+        if archivada:
+            return archivada
         raise HTTPException(status_code=404, detail="Entrega no encontrada")
     
     entrega_dict = EntregaResponse.model_validate(entrega).model_dump()
@@ -111,27 +203,90 @@ async def actualizar_entrega(
 
     update_data = entrega_update.model_dump(exclude_unset=True)
 
-    # If marking as completed, set completion date and user in Colombia timezone
-    if update_data.get("estado") == "cumplido" and db_entrega.estado != "cumplido":
-        from zoneinfo import ZoneInfo
-        colombia_tz = ZoneInfo("America/Bogota")
-        update_data["fecha_cumplido"] = datetime.now(colombia_tz)
-        update_data["usuario_cumplido_id"] = current_user.id
-    
-    # Same for no_cumplido state
-    if update_data.get("estado") == "no_cumplido" and db_entrega.estado != "no_cumplido":
-        from zoneinfo import ZoneInfo
-        colombia_tz = ZoneInfo("America/Bogota")
-        update_data["fecha_cumplido"] = datetime.now(colombia_tz)
-        update_data["usuario_cumplido_id"] = current_user.id
+    # Al marcar cumplido/no_cumplido se registra fecha (hora Colombia) y usuario
+    aplicar_reglas_estado(update_data, db_entrega.estado, current_user.id)
 
     for field, value in update_data.items():
         setattr(db_entrega, field, value)
 
+    publicar_evento_entrega(db, "entrega_actualizada", db_entrega, db_entrega.vehiculo.operacion_id)
     db.commit()
+    invalidar_kpis()
     db.refresh(db_entrega)
     return db_entrega
 
+@router.post("/estado/batch", response_model=EntregaEstadoBatchResponse)
+async def actualizar_estado_entregas(
+    cambio: EntregaEstadoBatch,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    ✅ Cambia el estado de muchas entregas con un solo UPDATE ... RETURNING
+    ✅ Mismas reglas que PATCH /{id}: al pasar a cumplido/no_cumplido se registra
+       fecha_cumplido (hora Colombia) y usuario_cumplido_id
+    ✅ Las entregas que ya están en ese estado no se modifican (conservan su fecha)
+    """
+    if (cambio.entrega_ids is None) == (cambio.vehiculo_operacion_id is None):
+        raise HTTPException(status_code=400, detail="Indique entrega_ids o vehiculo_operacion_id (solo uno)")
+
+    condiciones = [or_(Entrega.estado.is_(None), Entrega.estado != cambio.estado)]
+    if cambio.entrega_ids is not None:
+        ids = list(dict.fromkeys(cambio.entrega_ids))
+        condiciones.append(Entrega.id.in_(ids))
+    else:
+        vehiculo = db.query(VehiculoOperacion.id).filter(
+            VehiculoOperacion.id == cambio.vehiculo_operacion_id
+        ).first()
+        if not vehiculo:
+            raise HTTPException(status_code=404, detail="Vehículo no encontrado")
+        condiciones.append(Entrega.vehiculo_operacion_id == cambio.vehiculo_operacion_id)
+    if cambio.estado_actual:
+        condiciones.append(Entrega.estado == cambio.estado_actual)
+
+    # Las filas ya en ese estado quedan excluidas, así que aplican las reglas de transición
+    valores = aplicar_reglas_estado({"estado": cambio.estado}, None, current_user.id)
+
+    actualizadas = db.execute(
+        update(Entrega).where(*condiciones).values(**valores).returning(
+            Entrega.id,
+            Entrega.vehiculo_operacion_id,
+            Entrega.fecha_operacion,
+            Entrega.estado,
+            Entrega.fecha_cumplido,
+            Entrega.usuario_cumplido_id
+        ).execution_options(synchronize_session=False)
+    ).all()
+
+    if actualizadas:
+        operaciones = dict(db.query(VehiculoOperacion.id, VehiculoOperacion.operacion_id).filter(
+            VehiculoOperacion.id.in_({fila.vehiculo_operacion_id for fila in actualizadas})
+        ).all())
+        publicar_eventos_entregas(
+            db,
+            "entrega_actualizada",
+            [(fila, operaciones.get(fila.vehiculo_operacion_id)) for fila in actualizadas]
+        )
+    db.commit()
+    if actualizadas:
+        invalidar_kpis()
+
+    sin_cambios, no_encontradas = [], []
+    if cambio.entrega_ids is not None:
+        restantes = set(ids) - {fila.id for fila in actualizadas}
+        if restantes:
+            existentes = {fila.id for fila in db.query(Entrega.id).filter(Entrega.id.in_(restantes))}
+            sin_cambios = [i for i in ids if i in existentes]
+            no_encontradas = [i for i in ids if i in restantes and i not in existentes]
+
+    return {
+        "estado": cambio.estado,
+        "actualizadas": len(actualizadas),
+        "entregas": [fila._asdict() for fila in actualizadas],
+        "sin_cambios": sin_cambios,
+        "no_encontradas": no_encontradas,
+    }
+
 @router.post("/{entrega_id}/fotos", response_model=FotoEvidenciaResponse, status_code=status.HTTP_201_CREATED)
 async def subir_foto_evidencia(
     entrega_id: int,
@@ -158,19 +313,24 @@ async def subir_foto_evidencia(
             detail="Solo se permiten imágenes (JPEG, PNG)"
         )
 
-    # Create filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    file_extension = os.path.splitext(file.filename)[1]
-    filename = f"entrega_{entrega_id}_{timestamp}{file_extension}"
-    file_path = upload_dir / filename
-    
-    logger.info(f"💾 Guardando archivo en: {file_path}")
+    # ✅ Nombre direccionado por contenido: entrega_<id>_<sha256>.<ext>
+    # Permite servirlo con Cache-Control inmutable (ver app/utils/static_files.py)
+    file_extension = os.path.splitext(file.filename)[1].lower()
+    temp_path = upload_dir / f".entrega_{entrega_id}_{uuid.uuid4().hex}.part"
 
     try:
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
+        # Save file (hash calculado mientras se escribe)
+        digest = hashlib.sha256()
+        with open(temp_path, "wb") as buffer:
+            while chunk := file.file.read(UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                buffer.write(chunk)
+
+        filename = f"entrega_{entrega_id}_{digest.hexdigest()[:CONTENT_HASH_LENGTH]}{file_extension}"
+        file_path = upload_dir / filename
+        os.replace(temp_path, file_path)
+        logger.info(f"💾 Archivo guardado en: {file_path}")
+
         # Verify file was saved
         if not file_path.exists():
             logger.error(f"❌ El archivo no se guardó correctamente: {file_path}")
@@ -203,6 +363,7 @@ async def subir_foto_evidencia(
     except Exception as e:
         logger.error(f"❌ Error al subir foto: {str(e)}")
         db.rollback()
+        temp_path.unlink(missing_ok=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al procesar la foto: {str(e)}"
@@ -215,4 +376,8 @@ async def listar_fotos_entrega(
     current_user: Usuario = Depends(get_current_active_user)
 ):
     fotos = db.query(FotoEvidencia).filter(FotoEvidencia.entrega_id == entrega_id).all()
+    if not fotos and not db.query(Entrega.id).filter(Entrega.id == entrega_id).first():
+        archivada = leer_entrega_archivada(db, entrega_id)
+        if archivada:
+            return archivada["fotos"]
     return fotos
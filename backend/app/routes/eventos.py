@@ -0,0 +1,85 @@
+"""
+Endpoints de eventos en tiempo real (Server-Sent Events)
+✅ Reemplaza el polling de KPIs y listas de entregas en dashboard y operaciones
+✅ EventSource no permite headers: el cliente pide un ticket de un solo uso
+   (POST /api/eventos/ticket) y lo envía en ?ticket=, nunca el token de acceso
+✅ El stream se cierra si el token de acceso con que se abrió se revoca (logout)
+"""
+import asyncio
+import json
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from jose import jwt
+from app.config import get_settings
+from app.models.usuario import Usuario
+from app.schemas.usuario import TicketStream
+from app.auth import create_stream_ticket, get_current_active_user, get_current_active_user_stream, oauth2_scheme
+from app.services.eventos_entregas import broker_entregas
+from app.services.revocacion import lista_revocacion
+
+router = APIRouter(prefix="/api/eventos", tags=["eventos"])
+settings = get_settings()
+
+# Intervalo de comentarios keep-alive para que proxies no cierren la conexión
+HEARTBEAT_SEGUNDOS = 15
+
+
+@router.post("/ticket", response_model=TicketStream)
+async def crear_ticket(
+    token: str = Depends(oauth2_scheme),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    ✅ Ticket para abrir un stream: vence en EVENTOS_TICKET_SEGUNDOS y sirve una sola vez
+    ✅ Pedir uno nuevo en cada reconexión del EventSource
+    """
+    payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    ticket, expira_en = create_stream_ticket(current_user.username, payload.get("jti"))
+    return {"ticket": ticket, "expira_en": expira_en}
+
+
+@router.get("/entregas")
+async def stream_eventos_entregas(
+    request: Request,
+    operacion_id: Optional[int] = Query(None, description="Solo eventos de esta operación"),
+    fecha: Optional[date] = Query(None, description="Solo eventos de entregas con esta fecha de operación"),
+    current_user: Usuario = Depends(get_current_active_user_stream)
+):
+    """
+    Stream SSE de cambios de entregas (creación y cambios de estado).
+
+    Cada evento se envía como `event: <tipo>` con un JSON en `data`:
+    entrega_id, vehiculo_operacion_id, operacion_id, fecha_operacion, estado.
+    Tras un logout el stream se cierra en el siguiente evento o ping (máximo HEARTBEAT_SEGUNDOS,
+    más REVOCACION_REFRESCO_SEGUNDOS si el logout se hizo en otro worker).
+    """
+    sesion_jti = request.state.sesion_jti
+    suscripcion = broker_entregas.suscribir(operacion_id=operacion_id, fecha=fecha)
+
+    async def generar():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                if await request.is_disconnected():
+                    break
+                if sesion_jti and lista_revocacion.esta_revocado(sesion_jti):
+                    break
+                try:
+                    evento = await asyncio.wait_for(suscripcion.queue.get(), timeout=HEARTBEAT_SEGUNDOS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {evento['tipo']}\ndata: {json.dumps(evento)}\n\n"
+        finally:
+            broker_entregas.desuscribir(suscripcion)
+
+    return StreamingResponse(
+        generar(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+    )
@@ -0,0 +1,48 @@
+"""
+Endpoints de estado de trabajos en segundo plano
+"""
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models.usuario import Usuario
+from app.models.job import Job
+from app.schemas.job import JobResponse
+from app.auth import get_current_active_user
+from app.dependencies.authorization import require_admin
+from app.services.authorization import AuthorizationService
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+@router.get("/", response_model=List[JobResponse])
+def listar_jobs(
+    estado: Optional[str] = None,
+    tipo: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_admin)
+):
+    """Lista trabajos (más recientes primero). Requiere rol Administrador"""
+    query = db.query(Job)
+    if estado:
+        query = query.filter(Job.estado == estado)
+    if tipo:
+        query = query.filter(Job.tipo == tipo)
+    return query.order_by(Job.id.desc()).offset(skip).limit(limit).all()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def obtener_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """Estado de un trabajo. Visible para quien lo encoló o un Administrador"""
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    if job.usuario_id != current_user.id and not AuthorizationService.es_admin(db, current_user.id):
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return job
@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from datetime import date
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.usuario import Usuario
 from app.models.operacion import OperacionDiaria, VehiculoOperacion
 from app.models.entrega import Entrega
@@ -15,6 +15,7 @@ from app.schemas.operacion import (
     VehiculoOperacionResponse
 )
 from app.auth import get_current_active_user
+from app.services.cache_kpis import invalidar_kpis
 
 router = APIRouter(prefix="/api/operaciones", tags=["operaciones"])
 
@@ -35,6 +36,7 @@ async def crear_operacion(
     )
     db.add(db_operacion)
     db.commit()
+    invalidar_kpis()
     db.refresh(db_operacion)
     return db_operacion
 
@@ -45,7 +47,7 @@ async def listar_operaciones(
     fecha_inicio: date = None,
     fecha_fin: date = None,
     placa: str = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     from zoneinfo import ZoneInfo
@@ -136,6 +138,7 @@ async def agregar_vehiculo_operacion(
     db_vehiculo = VehiculoOperacion(**vehiculo.model_dump())
     db.add(db_vehiculo)
     db.commit()
+    invalidar_kpis()
     db.refresh(db_vehiculo)
     return db_vehiculo
 
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database import get_db
@@ -6,6 +6,8 @@ from app.models.permisos import PermisosUsuario
 from app.schemas.permiso_usuario import PermisoUsuarioCreate, PermisoUsuarioUpdate, PermisoUsuarioResponse
 from app.auth import get_current_active_user
 from app.models.usuario import Usuario
+from app.services.jobs import encolar_job, job_handler
+from app.services.permisos import upsert_permisos_usuario, validar_usuarios_y_pages
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/permisos-usuario", tags=["permisos-usuario"])
@@ -64,49 +66,75 @@ def get_permisos_by_usuario(
         for p in permisos
     ]
 
+def reemplazar_permisos_usuario(db: Session, usuario_id: int, permisos: List[PermisoBulkCreate]) -> int:
+    """
+    ✅ Deja al usuario exactamente con estos permisos en una sola transacción:
+       ELIMINA FÍSICAMENTE los de páginas que no vienen y hace upsert del resto
+       (INSERT ... ON CONFLICT), así nunca queda un momento sin permisos
+    """
+    page_ids = [permiso_data.page_id for permiso_data in permisos]
+    obsoletos = db.query(PermisosUsuario).filter(PermisosUsuario.usuario_id == usuario_id)
+    if page_ids:
+        obsoletos = obsoletos.filter(PermisosUsuario.page_id.notin_(page_ids))
+    obsoletos.delete(synchronize_session=False)
+
+    upsert_permisos_usuario(db, [
+        {
+            "usuario_id": usuario_id,
+            "page_id": permiso_data.page_id,
+            "puede_ver": permiso_data.puede_ver,
+            "puede_crear": permiso_data.puede_crear,
+            "puede_editar": permiso_data.puede_editar,
+            "puede_eliminar": permiso_data.puede_borrar  # Mapear puede_borrar -> puede_eliminar
+        }
+        for permiso_data in permisos
+    ])
+
+    db.commit()
+    return len(permisos)
+
+@job_handler("permisos_usuario.reemplazar")
+def job_reemplazar_permisos_usuario(db: Session, payload: dict) -> dict:
+    """Versión en segundo plano de create_bulk_permisos_usuario"""
+    permisos = [PermisoBulkCreate(**p) for p in payload["permisos"]]
+    count = reemplazar_permisos_usuario(db, payload["usuario_id"], permisos)
+    return {"count": count}
+
 @router.post("/usuario/{usuario_id}/bulk", status_code=status.HTTP_201_CREATED)
 def create_bulk_permisos_usuario(
     usuario_id: int,
     permisos: List[PermisoBulkCreate],
+    response: Response,
+    en_segundo_plano: bool = Query(False, description="Encolar y responder 202 con el id del trabajo"),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
     ✅ Crear permisos en bulk para un usuario
-    ✅ ELIMINA FÍSICAMENTE todos los permisos existentes del usuario
-    ✅ Crea los nuevos permisos desde cero
+    ✅ Reemplaza los permisos del usuario (upsert + borrado de los que no vienen, una transacción)
+    ✅ Con ?en_segundo_plano=true se encola (consultar /api/jobs/{job_id})
     """
-    # Verificar que el usuario existe
-    usuario = db.query(Usuario).filter(Usuario.id == usuario_id).first()
-    if not usuario:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Usuario no encontrado"
-        )
-
-    # ✅ ELIMINAR FÍSICAMENTE todos los permisos existentes del usuario
-
-    db.query(PermisosUsuario).filter(
-        PermisosUsuario.usuario_id == usuario_id
-    ).delete(synchronize_session=False)
-    db.commit()  # Commit para asegurar que los registros viejos se eliminen antes de insertar los nuevos
-
-    # ✅ Crear nuevos permisos desde cero
-    nuevos_permisos = []
-    for permiso_data in permisos:
-        permiso = PermisosUsuario(
-            usuario_id=usuario_id,
-            page_id=permiso_data.page_id,
-            puede_ver=permiso_data.puede_ver,
-            puede_crear=permiso_data.puede_crear,
-            puede_editar=permiso_data.puede_editar,
-            puede_eliminar=permiso_data.puede_borrar  # Mapear puede_borrar -> puede_eliminar
+    # Verificar que el usuario y las páginas existen (una consulta cada uno)
+    validar_usuarios_y_pages(db, [usuario_id], [p.page_id for p in permisos])
+
+    if en_segundo_plano:
+        job = encolar_job(
+            db,
+            "permisos_usuario.reemplazar",
+            {"usuario_id": usuario_id, "permisos": [p.model_dump() for p in permisos]},
+            prioridad=5,
+            usuario_id=current_user.id
         )
-        db.add(permiso)
-        nuevos_permisos.append(permiso)
+        db.commit()
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {
+            "message": f"Se encolaron {len(permisos)} permisos para el usuario",
+            "count": len(permisos),
+            "job_id": job.id
+        }
 
-    db.commit()
-    return {"message": f"Se crearon {len(nuevos_permisos)} permisos para el usuario", "count": len(nuevos_permisos)}
+    count = reemplazar_permisos_usuario(db, usuario_id, permisos)
+    return {"message": f"Se crearon {count} permisos para el usuario", "count": count}
 
 @router.get("/{permiso_id}", response_model=PermisoUsuarioResponse)
 def get_permiso_usuario(
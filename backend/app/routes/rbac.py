@@ -2,8 +2,9 @@
 Endpoints para gestión de Roles, Pages y Permisos (RBAC)
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import and_, true
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.database import get_db
 from app.models import Rol, Page, PermisosRol, PermisosUsuario, Usuario
 from app.schemas.rbac import (
@@ -19,15 +20,187 @@ from app.schemas.rbac import (
     PermisosUsuarioCreate,
     PermisosUsuarioUpdate,
     PermisosUsuarioResponse,
-    MenuItemPermisos
+    MenuItemPermisos,
+    RolMatrizResponse,
+    RolMatrizUpdate,
+    MatrizRolesResponse
 )
 from app.dependencies.authorization import require_admin, require_page_permission_by_url
 from app.auth import get_current_active_user
 from app.services.authorization import AuthorizationService
+from app.services.cache import cacheado, invalidar
+from app.services.permisos import upsert_permisos_rol, upsert_permisos_usuario, validar_pages, validar_usuarios_y_pages
 
 router = APIRouter(tags=["rbac"])
 
 
+# ==================== LECTURAS CACHEADAS (app/services/cache.py) ====================
+
+@cacheado("roles")
+def _listar_roles(db: Session, skip: int, limit: int, activo: Optional[bool], estado: Optional[str]) -> List[dict]:
+    query = db.query(Rol)
+    if activo is not None:
+        query = query.filter(Rol.activo == activo)
+    if estado is not None:
+        query = query.filter(Rol.estado == estado)
+    return [RolResponse.model_validate(rol).model_dump(mode="json") for rol in query.offset(skip).limit(limit).all()]
+
+
+@cacheado("roles")
+def _obtener_rol(db: Session, rol_id: int) -> Optional[dict]:
+    rol = db.query(Rol).filter(Rol.id == rol_id).first()
+    return RolResponse.model_validate(rol).model_dump(mode="json") if rol else None
+
+
+@cacheado("pages")
+def _listar_pages(db: Session, skip: int, limit: int, activo: Optional[bool]) -> List[dict]:
+    query = db.query(Page)
+    if activo is not None:
+        query = query.filter(Page.activo == activo)
+    pages = query.order_by(Page.orden).offset(skip).limit(limit).all()
+    return [PageResponse.model_validate(page).model_dump(mode="json") for page in pages]
+
+
+@cacheado("pages")
+def _obtener_page(db: Session, page_id: int) -> Optional[dict]:
+    page = db.query(Page).filter(Page.id == page_id).first()
+    return PageResponse.model_validate(page).model_dump(mode="json") if page else None
+
+
+# ==================== MATRIZ ROL × PÁGINA ====================
+
+def _filas_matriz(db: Session, rol_id: Optional[int] = None, activo: Optional[bool] = None, incluir_inactivas: bool = False):
+    """
+    Roles × páginas con su fila de permisos_rol (LEFT JOIN) en una sola consulta.
+    Un rol sin páginas devuelve una fila con page_id NULL.
+    """
+    query = db.query(
+        Rol.id.label("rol_id"),
+        Rol.nombre.label("rol_nombre"),
+        Page.id.label("page_id"),
+        Page.nombre.label("page_nombre"),
+        Page.nombre_display.label("page_display"),
+        Page.ruta.label("page_ruta"),
+        PermisosRol.id.label("permiso_id"),
+        PermisosRol.puede_ver,
+        PermisosRol.puede_crear,
+        PermisosRol.puede_editar,
+        PermisosRol.puede_eliminar
+    ).select_from(Rol).outerjoin(
+        Page, true() if incluir_inactivas else Page.activo == True
+    ).outerjoin(
+        PermisosRol, and_(PermisosRol.rol_id == Rol.id, PermisosRol.page_id == Page.id)
+    )
+    if rol_id is not None:
+        query = query.filter(Rol.id == rol_id)
+    if activo is not None:
+        query = query.filter(Rol.activo == activo)
+    return query.order_by(Rol.id, Page.orden, Page.id).all()
+
+
+def _permiso_celda(fila) -> dict:
+    return {
+        "page_id": fila.page_id,
+        "puede_ver": bool(fila.puede_ver),
+        "puede_crear": bool(fila.puede_crear),
+        "puede_editar": bool(fila.puede_editar),
+        "puede_eliminar": bool(fila.puede_eliminar),
+    }
+
+
+def _matriz_rol(db: Session, rol_id: int, incluir_inactivas: bool = False) -> dict:
+    filas = _filas_matriz(db, rol_id=rol_id, incluir_inactivas=incluir_inactivas)
+    if not filas:
+        raise HTTPException(status_code=404, detail="Rol no encontrado")
+    return {
+        "rol_id": filas[0].rol_id,
+        "rol_nombre": filas[0].rol_nombre,
+        "permisos": [
+            {
+                **_permiso_celda(fila),
+                "page_nombre": fila.page_nombre,
+                "page_display": fila.page_display,
+                "page_ruta": fila.page_ruta,
+                "asignado": fila.permiso_id is not None,
+            }
+            for fila in filas if fila.page_id is not None
+        ],
+    }
+
+
+@router.get("/api/roles/matrix", response_model=MatrizRolesResponse)
+def obtener_matriz_roles(
+    activo: bool = None,
+    incluir_inactivas: bool = False,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_page_permission_by_url("/maestros/permisos-rol", "ver"))
+):
+    """
+    Matriz de permisos de todos los roles × páginas en una sola consulta (vista general).
+    Requiere permiso de VER en /maestros/permisos-rol
+    """
+    pages, roles = {}, {}
+    for fila in _filas_matriz(db, activo=activo, incluir_inactivas=incluir_inactivas):
+        rol = roles.setdefault(fila.rol_id, {"rol_id": fila.rol_id, "rol_nombre": fila.rol_nombre, "permisos": []})
+        if fila.page_id is None:
+            continue
+        pages.setdefault(fila.page_id, {
+            "id": fila.page_id,
+            "nombre": fila.page_nombre,
+            "nombre_display": fila.page_display,
+            "ruta": fila.page_ruta,
+        })
+        rol["permisos"].append(_permiso_celda(fila))
+    return {"pages": list(pages.values()), "roles": list(roles.values())}
+
+
+@router.get("/api/roles/{rol_id}/matrix", response_model=RolMatrizResponse)
+def obtener_matriz_rol(
+    rol_id: int,
+    incluir_inactivas: bool = False,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_page_permission_by_url("/maestros/permisos-rol", "ver"))
+):
+    """
+    Permisos del rol en todas las páginas (las no asignadas, en False) en una sola consulta.
+    Requiere permiso de VER en /maestros/permisos-rol
+    """
+    return _matriz_rol(db, rol_id, incluir_inactivas)
+
+
+@router.put("/api/roles/{rol_id}/matrix", response_model=RolMatrizResponse)
+def actualizar_matriz_rol(
+    rol_id: int,
+    matriz: RolMatrizUpdate,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_page_permission_by_url("/maestros/permisos-rol", "editar"))
+):
+    """
+    Guarda la matriz completa del rol en una transacción. Requiere permiso de EDITAR en /maestros/permisos-rol
+    ✅ Un solo INSERT ... ON CONFLICT (rol_id, page_id) DO UPDATE para las páginas enviadas
+    ✅ Las páginas activas que no vienen quedan sin permisos (se borra su fila)
+    ✅ Las páginas inactivas que no vienen no se tocan
+    """
+    # Sin caché: un rol recién eliminado en otro worker fallaría después por la foreign key
+    if not db.query(Rol.id).filter(Rol.id == rol_id).first():
+        raise HTTPException(status_code=404, detail="Rol no encontrado")
+
+    page_ids = [permiso.page_id for permiso in matriz.permisos]
+    validar_pages(db, page_ids)
+
+    obsoletos = db.query(PermisosRol).filter(
+        PermisosRol.rol_id == rol_id,
+        PermisosRol.page_id.in_(db.query(Page.id).filter(Page.activo == True))
+    )
+    if page_ids:
+        obsoletos = obsoletos.filter(PermisosRol.page_id.notin_(page_ids))
+    obsoletos.delete(synchronize_session=False)
+
+    upsert_permisos_rol(db, [{"rol_id": rol_id, **permiso.dict()} for permiso in matriz.permisos])
+    db.commit()
+    return _matriz_rol(db, rol_id)
+
+
 # ==================== ENDPOINTS DE ROLES ====================
 
 @router.get("/api/roles", response_model=List[RolResponse])
@@ -40,12 +213,7 @@ def listar_roles(
     current_user: Usuario = Depends(require_page_permission_by_url("/maestros/roles", "ver"))
 ):
     """Lista todos los roles. Requiere permiso de VER en /maestros/roles"""
-    query = db.query(Rol)
-    if activo is not None:
-        query = query.filter(Rol.activo == activo)
-    if estado is not None:
-        query = query.filter(Rol.estado == estado)
-    return query.offset(skip).limit(limit).all()
+    return _listar_roles(db, skip, limit, activo, estado)
 
 
 @router.get("/api/roles/{rol_id}", response_model=RolResponse)
@@ -55,7 +223,7 @@ def obtener_rol(
     current_user: Usuario = Depends(require_page_permission_by_url("/maestros/roles", "ver"))
 ):
     """Obtiene un rol específico. Requiere permiso de VER en /maestros/roles"""
-    rol = db.query(Rol).filter(Rol.id == rol_id).first()
+    rol = _obtener_rol(db, rol_id)
     if not rol:
         raise HTTPException(status_code=404, detail="Rol no encontrado")
     return rol
@@ -85,6 +253,7 @@ def crear_rol(
     )
     db.add(db_rol)
     db.commit()
+    invalidar("roles")
     db.refresh(db_rol)
     return db_rol
 
@@ -123,6 +292,7 @@ def actualizar_rol(
     db_rol.usuario_control = current_user.id
 
     db.commit()
+    invalidar("roles")
     db.refresh(db_rol)
     return db_rol
 
@@ -151,6 +321,7 @@ def eliminar_rol(
     db_rol.estado = 'inactivo'
     db_rol.usuario_control = current_user.id
     db.commit()
+    invalidar("roles")
     return None
 
 
@@ -165,10 +336,7 @@ def listar_pages(
     current_user: Usuario = Depends(require_page_permission_by_url("/maestros/pages", "ver"))
 ):
     """Lista todas las páginas. Requiere permiso de VER en /maestros/pages"""
-    query = db.query(Page)
-    if activo is not None:
-        query = query.filter(Page.activo == activo)
-    return query.order_by(Page.orden).offset(skip).limit(limit).all()
+    return _listar_pages(db, skip, limit, activo)
 
 
 @router.get("/api/pages/{page_id}", response_model=PageResponse)
@@ -178,7 +346,7 @@ def obtener_page(
     current_user: Usuario = Depends(require_page_permission_by_url("/maestros/pages", "ver"))
 ):
     """Obtiene una página específica. Requiere permiso de VER en /maestros/pages"""
-    page = db.query(Page).filter(Page.id == page_id).first()
+    page = _obtener_page(db, page_id)
     if not page:
         raise HTTPException(status_code=404, detail="Página no encontrada")
     return page
@@ -201,6 +369,7 @@ def crear_page(
     db_page = Page(**page.dict())
     db.add(db_page)
     db.commit()
+    invalidar("pages")
     db.refresh(db_page)
     return db_page
 
@@ -231,6 +400,7 @@ def actualizar_page(
         setattr(db_page, field, value)
 
     db.commit()
+    invalidar("pages")
     db.refresh(db_page)
     return db_page
 
@@ -249,6 +419,7 @@ def eliminar_page(
     # Desactivar en lugar de eliminar
     db_page.activo = False
     db.commit()
+    invalidar("pages")
     return None
 
 
@@ -389,42 +560,17 @@ def crear_permisos_usuario_bulk(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(require_page_permission_by_url("/maestros/permisos-usuario", "crear"))
 ):
-    """Crea/actualiza permisos en lote para un usuario. Requiere permiso de CREAR"""
-    resultados = []
-    
-    for permiso in permisos:
-        # Verificar que el usuario existe
-        usuario = db.query(Usuario).filter(Usuario.id == permiso.usuario_id).first()
-        if not usuario:
-            raise HTTPException(status_code=404, detail=f"Usuario {permiso.usuario_id} no encontrado")
-
-        # Verificar que la página existe
-        page = db.query(Page).filter(Page.id == permiso.page_id).first()
-        if not page:
-            raise HTTPException(status_code=404, detail=f"Página {permiso.page_id} no encontrada")
-
-        # Verificar si ya existe el permiso
-        db_permiso = db.query(PermisosUsuario).filter(
-            PermisosUsuario.usuario_id == permiso.usuario_id,
-            PermisosUsuario.page_id == permiso.page_id
-        ).first()
-
-        if db_permiso:
-            # Actualizar
-            for field, value in permiso.dict().items():
-                setattr(db_permiso, field, value)
-        else:
-            # Crear nuevo
-            db_permiso = PermisosUsuario(**permiso.dict())
-            db.add(db_permiso)
-        
-        resultados.append(db_permiso)
+    """
+    Crea/actualiza permisos en lote para un usuario. Requiere permiso de CREAR
+    ✅ Un solo INSERT ... ON CONFLICT (usuario_id, page_id) DO UPDATE en una transacción
+    """
+    validar_usuarios_y_pages(db, [p.usuario_id for p in permisos], [p.page_id for p in permisos])
 
+    resultados = upsert_permisos_usuario(db, [permiso.dict() for permiso in permisos])
+    # Serializar antes del commit: después las filas quedan expiradas (una consulta por fila)
+    respuesta = [PermisosUsuarioResponse.model_validate(permiso) for permiso in resultados]
     db.commit()
-    for permiso in resultados:
-        db.refresh(permiso)
-    
-    return resultados
+    return respuesta
 
 
 @router.put("/api/permisos-usuario/{permiso_id}", response_model=PermisosUsuarioResponse)
@@ -0,0 +1,34 @@
+"""
+Endpoints de estado del servidor
+"""
+from fastapi import APIRouter, Depends
+from app.models.usuario import Usuario
+from app.dependencies.authorization import require_admin
+from app.middleware.worker_stats import read_all_worker_stats, worker_stats
+from app.services.cache import cache_maestros
+
+router = APIRouter(prefix="/api/sistema", tags=["sistema"])
+
+
+@router.get("/workers")
+def listar_workers(current_user: Usuario = Depends(require_admin)):
+    """
+    Estadísticas por worker: requests atendidos, en curso, errores 5xx y tiempo promedio.
+    Requiere rol Administrador
+    """
+    workers = read_all_worker_stats()
+    return {
+        "atendido_por": worker_stats.pid,
+        "total_workers": len(workers),
+        "total_requests": sum(w["requests"] for w in workers),
+        "workers": workers,
+    }
+
+
+@router.get("/cache")
+def metricas_cache(current_user: Usuario = Depends(require_admin)):
+    """
+    Aciertos, fallos, invalidaciones y errores de la caché de datos maestros
+    (contadores del worker que atiende la petición). Requiere rol Administrador
+    """
+    return {"atendido_por": worker_stats.pid, **cache_maestros.metricas()}
@@ -0,0 +1,60 @@
+"""
+Sincronización incremental para la app de conductores (ver app/services/sync.py)
+"""
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models.usuario import Usuario
+from app.models.operacion import VehiculoOperacion
+from app.schemas.sync import SyncResponse, SyncPush, SyncPushResponse
+from app.auth import get_current_active_user
+from app.services.sync import aplicar_cambios, leer_cursor, obtener_cambios, purgar_eliminaciones
+
+router = APIRouter(prefix="/api/sync", tags=["sync"])
+
+
+@router.get("", response_model=SyncResponse)
+def sincronizar(
+    vehiculo_operacion_id: int,
+    cursor: Optional[str] = Query(None, description="cursor de la sincronización anterior"),
+    desde: Optional[datetime] = Query(None, description="watermark (sin cursor; puede repetir filas)"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    ✅ Sin `cursor`: snapshot completo del vehículo (vehículo, entregas y fotos)
+    ✅ Con `cursor`: solo lo cambiado desde entonces y los ids borrados (`eliminados`)
+    ✅ Guardar `cursor` y repetir mientras `hay_mas` sea true
+    ✅ `desde` (watermark) se sigue aceptando para clientes anteriores al cursor
+    """
+    vehiculo = db.query(VehiculoOperacion).filter(VehiculoOperacion.id == vehiculo_operacion_id).first()
+    if not vehiculo:
+        raise HTTPException(status_code=404, detail="Vehículo no encontrado")
+
+    ultimos = None
+    if cursor:
+        try:
+            desde, ultimos = leer_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    if purgar_eliminaciones(db):
+        db.commit()
+    return obtener_cambios(db, vehiculo, desde, ultimos)
+
+
+@router.post("", response_model=SyncPushResponse)
+def enviar_cambios(
+    push: SyncPush,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    ✅ Cambios hechos sin conexión (estado / observación) en una sola transacción
+    ✅ Con `updated_at` (versión que tenía el dispositivo) los cambios sobre una entrega
+       modificada después en el servidor se devuelven como `conflicto`
+    ✅ Admite Idempotency-Key para reintentos
+    """
+    return aplicar_cambios(db, push.cambios, current_user.id)
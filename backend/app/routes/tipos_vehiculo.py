@@ -6,9 +6,25 @@ from app.models.tipo_vehiculo import TipoVehiculo
 from app.schemas.tipo_vehiculo import TipoVehiculoCreate, TipoVehiculoUpdate, TipoVehiculoResponse
 from app.auth import get_current_active_user
 from app.models.usuario import Usuario
+from app.services.cache import cacheado, invalidar
 
 router = APIRouter(prefix="/api/maestros/tipos-vehiculo", tags=["maestros", "tipos-vehiculo"])
 
+@cacheado("tipos_vehiculo")
+def _listar_tipos(db: Session, skip: int, limit: int, estado: Optional[str]) -> List[dict]:
+    query = db.query(TipoVehiculo)
+
+    if estado:
+        query = query.filter(TipoVehiculo.estado == estado)
+
+    tipos = query.order_by(TipoVehiculo.descripcion).offset(skip).limit(limit).all()
+    return [TipoVehiculoResponse.model_validate(tipo).model_dump(mode="json") for tipo in tipos]
+
+@cacheado("tipos_vehiculo")
+def _obtener_tipo(db: Session, tipo_id: int) -> Optional[dict]:
+    tipo = db.query(TipoVehiculo).filter(TipoVehiculo.id == tipo_id).first()
+    return TipoVehiculoResponse.model_validate(tipo).model_dump(mode="json") if tipo else None
+
 @router.get("/", response_model=List[TipoVehiculoResponse])
 def list_tipos_vehiculo(
     skip: int = 0,
@@ -17,14 +33,8 @@ def list_tipos_vehiculo(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
-    """Listar tipos de vehículos"""
-    query = db.query(TipoVehiculo)
-
-    if estado:
-        query = query.filter(TipoVehiculo.estado == estado)
-
-    tipos = query.order_by(TipoVehiculo.descripcion).offset(skip).limit(limit).all()
-    return tipos
+    """Listar tipos de vehículos (cacheado, ver app/services/cache.py)"""
+    return _listar_tipos(db, skip, limit, estado)
 
 @router.get("/{tipo_id}", response_model=TipoVehiculoResponse)
 def get_tipo_vehiculo(
@@ -32,8 +42,8 @@ def get_tipo_vehiculo(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
-    """Obtener un tipo de vehículo por ID"""
-    tipo = db.query(TipoVehiculo).filter(TipoVehiculo.id == tipo_id).first()
+    """Obtener un tipo de vehículo por ID (cacheado)"""
+    tipo = _obtener_tipo(db, tipo_id)
     if not tipo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -59,6 +69,7 @@ def create_tipo_vehiculo(
     tipo = TipoVehiculo(**tipo_data.model_dump(), usuario_control=current_user.id)
     db.add(tipo)
     db.commit()
+    invalidar("tipos_vehiculo")
     db.refresh(tipo)
     return tipo
 
@@ -92,6 +103,7 @@ def update_tipo_vehiculo(
 
     tipo.usuario_control = current_user.id
     db.commit()
+    invalidar("tipos_vehiculo")
     db.refresh(tipo)
     return tipo
 
@@ -112,4 +124,5 @@ def delete_tipo_vehiculo(
     tipo.estado = 'inactivo'
     tipo.usuario_control = current_user.id
     db.commit()
+    invalidar("tipos_vehiculo")
     return None
@@ -15,6 +15,8 @@ from app.schemas.rbac import (
 )
 from app.auth import get_password_hash, get_current_active_user
 from app.dependencies.authorization import require_admin, require_permission
+from app.dependencies.cargadores import get_cargadores
+from app.services.cargadores import Cargadores
 from app.services.authorization import AuthorizationService
 
 router = APIRouter(prefix="/api/usuarios", tags=["usuarios"])
@@ -26,11 +28,13 @@ def listar_usuarios(
     limit: int = 100,
     activo: bool = None,
     db: Session = Depends(get_db),
+    cargadores: Cargadores = Depends(get_cargadores),
     _: None = Depends(require_permission("usuarios", "ver"))
 ):
     """
     Lista todos los usuarios del sistema.
     Requiere permiso de 'ver' en página 'usuarios'.
+    ✅ Los roles se cargan con una sola consulta (no una por usuario)
     """
     query = db.query(Usuario)
 
@@ -38,6 +42,7 @@ def listar_usuarios(
         query = query.filter(Usuario.activo == activo)
 
     usuarios = query.offset(skip).limit(limit).all()
+    cargadores.relacionar(usuarios, Usuario.rol)
     return usuarios
 
 
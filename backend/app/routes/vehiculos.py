@@ -6,9 +6,28 @@ from app.models.vehiculo import Vehiculo
 from app.schemas.vehiculo import VehiculoCreate, VehiculoUpdate, VehiculoResponse
 from app.auth import get_current_active_user
 from app.models.usuario import Usuario
+from app.services.cache import cacheado, invalidar
 
 router = APIRouter(prefix="/api/vehiculos", tags=["vehiculos"])
 
+@cacheado("vehiculos")
+def _listar_vehiculos(db: Session, skip: int, limit: int, activo: Optional[bool], estado: Optional[str]) -> List[dict]:
+    query = db.query(Vehiculo)
+
+    if activo is not None:
+        query = query.filter(Vehiculo.activo == activo)
+
+    if estado:
+        query = query.filter(Vehiculo.estado == estado)
+
+    vehiculos = query.order_by(Vehiculo.fecha_creacion.desc()).offset(skip).limit(limit).all()
+    return [VehiculoResponse.model_validate(vehiculo).model_dump(mode="json") for vehiculo in vehiculos]
+
+@cacheado("vehiculos")
+def _obtener_vehiculo(db: Session, vehiculo_id: int) -> Optional[dict]:
+    vehiculo = db.query(Vehiculo).filter(Vehiculo.id == vehiculo_id).first()
+    return VehiculoResponse.model_validate(vehiculo).model_dump(mode="json") if vehiculo else None
+
 @router.get("/", response_model=List[VehiculoResponse])
 def list_vehiculos(
     skip: int = 0,
@@ -19,18 +38,9 @@ def list_vehiculos(
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
-    Listar vehículos con filtros opcionales
+    Listar vehículos con filtros opcionales (cacheado, ver app/services/cache.py)
     """
-    query = db.query(Vehiculo)
-
-    if activo is not None:
-        query = query.filter(Vehiculo.activo == activo)
-
-    if estado:
-        query = query.filter(Vehiculo.estado == estado)
-
-    vehiculos = query.order_by(Vehiculo.fecha_creacion.desc()).offset(skip).limit(limit).all()
-    return vehiculos
+    return _listar_vehiculos(db, skip, limit, activo, estado)
 
 @router.get("/{vehiculo_id}", response_model=VehiculoResponse)
 def get_vehiculo(
@@ -39,9 +49,9 @@ def get_vehiculo(
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
-    Obtener un vehículo por ID
+    Obtener un vehículo por ID (cacheado)
     """
-    vehiculo = db.query(Vehiculo).filter(Vehiculo.id == vehiculo_id).first()
+    vehiculo = _obtener_vehiculo(db, vehiculo_id)
     if not vehiculo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -70,6 +80,7 @@ def create_vehiculo(
     vehiculo = Vehiculo(**vehiculo_data.model_dump())
     db.add(vehiculo)
     db.commit()
+    invalidar("vehiculos")
     db.refresh(vehiculo)
     return vehiculo
 
@@ -104,6 +115,7 @@ def update_vehiculo(
         setattr(vehiculo, field, value)
 
     db.commit()
+    invalidar("vehiculos")
     db.refresh(vehiculo)
     return vehiculo
 
@@ -125,4 +137,5 @@ def delete_vehiculo(
 
     vehiculo.activo = False
     db.commit()
+    invalidar("vehiculos")
     return None
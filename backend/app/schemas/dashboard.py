@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional
-from datetime import date
+from typing import Optional, List
+from datetime import date, datetime
 
 class DashboardFilters(BaseModel):
     fecha_operacion_inicio: Optional[date] = None
@@ -19,3 +19,38 @@ class DashboardKPIs(BaseModel):
     porcentaje_cumplimiento: float
     vehiculos_activos_hoy: int
     entregas_hoy: int
+
+class PuntoTendencia(BaseModel):
+    periodo: datetime  # Inicio del periodo en hora de Colombia
+    total: int
+    pendientes: int
+    cumplidas: int
+    no_cumplidas: int
+    porcentaje_cumplimiento: float  # cumplidas / total
+
+class TendenciasResponse(BaseModel):
+    granularidad: str
+    fecha_inicio: date
+    fecha_fin: date
+    zona_horaria: str
+    puntos: List[PuntoTendencia]
+
+class ProductividadItem(BaseModel):
+    placa: Optional[str] = None  # agrupar=vehiculo
+    operacion_id: Optional[int] = None  # agrupar=operacion
+    fecha_operacion: Optional[date] = None  # agrupar=operacion
+    jornadas: int  # Vehículos-operación incluidos
+    total_entregas: int
+    cumplidas: int
+    no_cumplidas: int
+    tasa_cumplimiento: float  # cumplidas / total
+    horas_trabajadas: Optional[float] = None
+    entregas_por_hora: Optional[float] = None  # Cumplidas por hora trabajada
+    mediana_minutos_entre_cumplidos: Optional[float] = None
+    ranking: int
+
+class ProductividadResponse(BaseModel):
+    agrupar: str
+    fecha_inicio: date
+    fecha_fin: date
+    resultados: List[ProductividadItem]
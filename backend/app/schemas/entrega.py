@@ -1,5 +1,5 @@
-from pydantic import BaseModel, field_validator
-from typing import Optional, List
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List, Literal
 from datetime import date, datetime
 import os
 
@@ -40,6 +40,29 @@ class EntregaUpdate(BaseModel):
     observacion: Optional[str] = None
     fecha_cumplido: Optional[datetime] = None
 
+EstadoEntrega = Literal["pendiente", "cumplido", "no_cumplido"]
+
+class EntregaEstadoBatch(BaseModel):
+    """Cambio de estado masivo: por lista de ids o por vehículo (opcionalmente filtrando el estado actual)"""
+    estado: EstadoEntrega
+    entrega_ids: Optional[List[int]] = Field(None, min_length=1, max_length=1000)
+    vehiculo_operacion_id: Optional[int] = None
+    estado_actual: Optional[EstadoEntrega] = None
+
+class EntregaEstadoResumen(BaseModel):
+    id: int
+    vehiculo_operacion_id: int
+    estado: str
+    fecha_cumplido: Optional[datetime] = None
+    usuario_cumplido_id: Optional[int] = None
+
+class EntregaEstadoBatchResponse(BaseModel):
+    estado: str
+    actualizadas: int
+    entregas: List[EntregaEstadoResumen]
+    sin_cambios: List[int] = []  # Ya estaban en ese estado o no cumplen estado_actual
+    no_encontradas: List[int] = []
+
 class EntregaResponse(EntregaBase):
     id: int
     vehiculo_operacion_id: int
@@ -52,3 +75,27 @@ class EntregaResponse(EntregaBase):
 
     class Config:
         from_attributes = True
+
+class EntregaBusquedaResponse(EntregaResponse):
+    relevancia: float
+
+class OperacionFacturaResumen(BaseModel):
+    id: int
+    fecha_operacion: date
+    observacion: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class VehiculoFacturaResumen(BaseModel):
+    id: int
+    placa: str
+    activo: bool
+    operacion: OperacionFacturaResumen
+
+    class Config:
+        from_attributes = True
+
+class EntregaFacturaResponse(EntregaResponse):
+    vehiculo: Optional[VehiculoFacturaResumen] = None  # None si el vehículo de una entrega archivada ya no existe
+    archivada: bool = False
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Optional, Any
+from datetime import datetime
+
+class JobResponse(BaseModel):
+    id: int
+    tipo: str
+    estado: str
+    prioridad: int
+    intentos: int
+    max_intentos: int
+    ejecutar_despues: Optional[datetime] = None
+    ultimo_error: Optional[str] = None
+    resultado: Optional[Any] = None
+    usuario_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    finalizado_en: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class JobEncolado(BaseModel):
+    message: str
+    job_id: int
+    estado: str
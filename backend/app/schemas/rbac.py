@@ -106,6 +106,49 @@ class PermisosRolResponse(PermisosBase):
         from_attributes = True
 
 
+# ==================== SCHEMAS DE MATRIZ ROL × PÁGINA ====================
+
+class MatrizPermiso(PermisosBase):
+    """Permisos de un rol en una página (sin fila en permisos_rol = todo en False)"""
+    page_id: int = Field(..., description="ID de la página")
+
+
+class MatrizCelda(MatrizPermiso):
+    page_nombre: str
+    page_display: str
+    page_ruta: str
+    asignado: bool = Field(..., description="El rol tiene fila en permisos_rol para esta página")
+
+
+class RolMatrizResponse(BaseModel):
+    rol_id: int
+    rol_nombre: str
+    permisos: List[MatrizCelda]
+
+
+class RolMatrizUpdate(BaseModel):
+    """Matriz completa del rol: las páginas que no vienen quedan sin permisos"""
+    permisos: List[MatrizPermiso]
+
+
+class MatrizPage(BaseModel):
+    id: int
+    nombre: str
+    nombre_display: str
+    ruta: str
+
+
+class MatrizRol(BaseModel):
+    rol_id: int
+    rol_nombre: str
+    permisos: List[MatrizPermiso]  # Mismo orden que `pages`
+
+
+class MatrizRolesResponse(BaseModel):
+    pages: List[MatrizPage]
+    roles: List[MatrizRol]
+
+
 class PermisosUsuarioBase(BaseModel):
     """NULL significa 'usar el permiso del rol'"""
     puede_ver: Optional[bool] = Field(None, description="Permiso para ver (null = heredar del rol)")
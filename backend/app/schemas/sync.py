@@ -0,0 +1,54 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import date, datetime
+from app.schemas.entrega import EstadoEntrega, FotoEvidenciaResponse
+from app.schemas.operacion import VehiculoOperacionResponse
+
+class EntregaSync(BaseModel):
+    id: int
+    vehiculo_operacion_id: int
+    numero_factura: str
+    cliente: Optional[str] = None
+    observacion: Optional[str] = None
+    estado: Optional[str] = None
+    fecha_operacion: date
+    fecha_cumplido: Optional[datetime] = None
+    usuario_cumplido_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None  # Versión: enviarla de vuelta en los cambios offline
+
+    class Config:
+        from_attributes = True
+
+class EliminacionSyncResponse(BaseModel):
+    tabla: str
+    id: int
+
+class SyncResponse(BaseModel):
+    watermark: datetime  # Marca de tiempo del cursor (informativa)
+    cursor: str  # Enviar como ?cursor= en la siguiente sincronización
+    completo: bool  # true: snapshot completo (reemplazar los datos locales del vehículo)
+    hay_mas: bool  # true: quedan cambios, volver a llamar con el nuevo cursor
+    vehiculo: Optional[VehiculoOperacionResponse] = None
+    entregas: List[EntregaSync] = []
+    fotos: List[FotoEvidenciaResponse] = []
+    eliminados: List[EliminacionSyncResponse] = []
+
+class CambioEntregaSync(BaseModel):
+    entrega_id: int
+    estado: Optional[EstadoEntrega] = None
+    observacion: Optional[str] = None
+    updated_at: Optional[datetime] = None  # Versión que tenía el dispositivo (sin ella gana el último)
+
+class SyncPush(BaseModel):
+    cambios: List[CambioEntregaSync] = Field(..., min_length=1, max_length=500)
+
+class ResultadoCambioSync(BaseModel):
+    entrega_id: int
+    resultado: str  # aplicado | conflicto | no_encontrada
+    entrega: Optional[EntregaSync] = None  # Versión actual del servidor
+
+class SyncPushResponse(BaseModel):
+    aplicados: int
+    conflictos: int
+    resultados: List[ResultadoCambioSync]
@@ -28,5 +28,9 @@ class Token(BaseModel):
     access_token: str
     token_type: str
 
+class TicketStream(BaseModel):
+    ticket: str  # Enviar como ?ticket= al abrir el EventSource (un solo uso)
+    expira_en: datetime
+
 class TokenData(BaseModel):
     username: Optional[str] = None
@@ -0,0 +1,27 @@
+"""
+Dimensionamiento del servidor de producción (ver serve.py y gunicorn.conf.py)
+"""
+import os
+from typing import Optional
+
+from app.config import Settings
+
+
+def conexiones_por_worker(settings: Settings) -> int:
+    """Conexiones máximas que abre un worker: pool + overflow + LISTEN de eventos"""
+    return settings.db_pool_size + settings.db_max_overflow + 1
+
+
+def calcular_workers(settings: Settings, cpu_count: Optional[int] = None) -> int:
+    """
+    Número de workers: WEB_WORKERS si se configuró; si no, 2 * CPU + 1
+    limitado por las conexiones que la base de datos puede dar a la aplicación
+    (DB_MAX_CONNECTIONS / conexiones por worker). Mínimo 1.
+    """
+    if settings.web_workers > 0:
+        return settings.web_workers
+
+    cpus = cpu_count or os.cpu_count() or 1
+    por_cpu = 2 * cpus + 1
+    por_base_datos = settings.db_max_connections // conexiones_por_worker(settings)
+    return max(1, min(por_cpu, por_base_datos))
@@ -0,0 +1,264 @@
+"""
+Archivo de entregas antiguas
+✅ Mueve las entregas con fecha_operacion anterior al horizonte a entregas_archivadas
+   (entrega + metadata de fotos como JSON comprimido con zlib)
+✅ Las fotos se empaquetan en zips mensuales en ARCHIVO_DIR/fotos/AAAA-MM.zip
+   y se eliminan del volumen de uploads
+✅ Lectura bajo demanda: leer_entrega_archivada() devuelve la entrega; sus fotos se sirven
+   directo desde el zip en /uploads/... (buscar_foto_archivada), sin volver a copiarlas
+✅ El trabajo renueva su bloqueo en la cola después de cada lote
+
+Se ejecuta como trabajo en segundo plano: POST /api/archivo/entregas
+"""
+import json
+import logging
+import os
+import re
+import shutil
+import uuid
+import zipfile
+import zlib
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.archivo import EntregaArchivada
+from app.models.entrega import Entrega, FotoEvidencia
+from app.services.entregas import ahora_colombia
+from app.services.jobs import BloqueoPerdido, job_handler, renovar_bloqueo
+from app.utils.facturas import normalizar_factura
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+COLUMNAS_ENTREGA = (
+    "id", "vehiculo_operacion_id", "numero_factura", "cliente", "observacion", "estado",
+    "fecha_operacion", "fecha_cumplido", "usuario_cumplido_id", "created_at", "updated_at",
+)
+COLUMNAS_FOTO = ("id", "entrega_id", "ruta_archivo", "nombre_archivo", "tipo_mime", "tamano_bytes", "uploaded_at")
+
+
+def _json_default(valor: Any) -> str:
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+def comprimir(datos: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(datos, default=_json_default, ensure_ascii=False).encode("utf-8"), 9)
+
+
+def descomprimir(datos: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(datos).decode("utf-8"))
+
+
+def serializar_entrega(entrega: Entrega) -> Dict[str, Any]:
+    datos = {columna: getattr(entrega, columna) for columna in COLUMNAS_ENTREGA}
+    datos["usuario_cumplido_nombre"] = (
+        entrega.usuario_cumplido.nombre_completo if entrega.usuario_cumplido else None
+    )
+    datos["fotos"] = [{columna: getattr(foto, columna) for columna in COLUMNAS_FOTO} for foto in entrega.fotos]
+    return datos
+
+
+def ruta_paquete(fecha_operacion: date) -> str:
+    """Zip de fotos del mes, relativo a ARCHIVO_DIR"""
+    return f"fotos/{fecha_operacion:%Y-%m}.zip"
+
+
+def _upload_dir() -> Path:
+    return Path(settings.upload_dir).resolve()
+
+
+def _archivo_dir() -> Path:
+    return Path(settings.archivo_dir).resolve()
+
+
+def empaquetar_fotos(paquete: Path, fotos: List[FotoEvidencia]) -> List[Path]:
+    """
+    Agrega las fotos al zip (sin recomprimir: JPEG/PNG ya están comprimidos).
+    Idempotente: las que ya están en el zip no se vuelven a escribir.
+    Se escribe sobre una copia temporal que reemplaza al zip con os.replace: quien lo esté
+    leyendo (buscar_foto_archivada) sigue viendo el zip anterior completo.
+
+    Returns:
+        Archivos originales que quedaron empaquetados (para borrarlos tras el commit)
+    """
+    paquete.parent.mkdir(parents=True, exist_ok=True)
+    existentes = set()
+    if paquete.exists():
+        with zipfile.ZipFile(paquete) as zf:
+            existentes = set(zf.namelist())
+
+    empaquetados = []
+    nuevas = []
+    for foto in fotos:
+        nombre = Path(foto.ruta_archivo).name
+        origen = _upload_dir() / nombre
+        if nombre in existentes:
+            empaquetados.append(origen)
+            continue
+        if not origen.exists():
+            logger.warning(f"⚠️  Foto {foto.id} sin archivo en uploads ({nombre}); se archiva solo la metadata")
+            continue
+        existentes.add(nombre)
+        nuevas.append((origen, nombre))
+    if not nuevas:
+        return empaquetados
+
+    temporal = paquete.with_name(f".{paquete.name}.{uuid.uuid4().hex}.part")
+    try:
+        if paquete.exists():
+            shutil.copyfile(paquete, temporal)
+        with zipfile.ZipFile(temporal, "a", compression=zipfile.ZIP_STORED) as zf:
+            for origen, nombre in nuevas:
+                zf.write(origen, arcname=nombre)
+        with open(temporal, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(temporal, paquete)
+    except Exception:
+        temporal.unlink(missing_ok=True)
+        raise
+    empaquetados.extend(origen for origen, _ in nuevas)
+    return empaquetados
+
+
+def archivar_lote(db: Session, antes_de: date, lote: int) -> Dict[str, int]:
+    """Archiva hasta `lote` entregas con fecha_operacion < antes_de en una transacción"""
+    if db.bind.dialect.name == "postgresql":
+        # Un solo archivador a la vez escribe en los zips
+        db.execute(text("SELECT pg_advisory_xact_lock(hashtext('archivo_entregas'))"))
+
+    entregas = db.query(Entrega).options(
+        selectinload(Entrega.fotos), joinedload(Entrega.usuario_cumplido)
+    ).filter(
+        Entrega.fecha_operacion < antes_de
+    ).order_by(Entrega.fecha_operacion, Entrega.id).limit(lote).all()
+
+    if not entregas:
+        db.rollback()
+        return {"entregas": 0, "fotos": 0}
+
+    por_paquete: Dict[str, List[Entrega]] = defaultdict(list)
+    for entrega in entregas:
+        por_paquete[ruta_paquete(entrega.fecha_operacion)].append(entrega)
+
+    originales: List[Path] = []
+    for relativo, grupo in por_paquete.items():
+        fotos = [foto for entrega in grupo for foto in entrega.fotos]
+        if fotos:
+            originales.extend(empaquetar_fotos(_archivo_dir() / relativo, fotos))
+
+    total_fotos = 0
+    for entrega in entregas:
+        total_fotos += len(entrega.fotos)
+        db.add(EntregaArchivada(
+            id=entrega.id,
+            vehiculo_operacion_id=entrega.vehiculo_operacion_id,
+            numero_factura=entrega.numero_factura,
+            factura_normalizada=normalizar_factura(entrega.numero_factura),
+            estado=entrega.estado,
+            fecha_operacion=entrega.fecha_operacion,
+            datos=comprimir(serializar_entrega(entrega)),
+            paquete_fotos=ruta_paquete(entrega.fecha_operacion) if entrega.fotos else None,
+            total_fotos=len(entrega.fotos)
+        ))
+
+    ids = [entrega.id for entrega in entregas]
+    db.query(FotoEvidencia).filter(FotoEvidencia.entrega_id.in_(ids)).delete(synchronize_session=False)
+    db.query(Entrega).filter(Entrega.id.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+
+    # Solo después del commit: si algo falla antes, los originales siguen en su lugar
+    for origen in originales:
+        origen.unlink(missing_ok=True)
+
+    return {"entregas": len(entregas), "fotos": total_fotos}
+
+
+def archivar_entregas(
+    db: Session,
+    antes_de: Optional[date] = None,
+    lote: Optional[int] = None,
+    max_lotes: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Archiva por lotes todas las entregas anteriores a `antes_de`
+    (por defecto: hoy en Colombia - ARCHIVO_HORIZONTE_DIAS)
+    """
+    antes_de = antes_de or ahora_colombia().date() - timedelta(days=settings.archivo_horizonte_dias)
+    lote = lote or settings.archivo_lote
+    resultado = {"antes_de": antes_de.isoformat(), "entregas": 0, "fotos": 0, "lotes": 0}
+
+    while max_lotes is None or resultado["lotes"] < max_lotes:
+        parcial = archivar_lote(db, antes_de, lote)
+        if not parcial["entregas"]:
+            break
+        resultado["entregas"] += parcial["entregas"]
+        resultado["fotos"] += parcial["fotos"]
+        resultado["lotes"] += 1
+        # Cada lote ya está confirmado: si otro worker tomó el trabajo, continúa desde aquí
+        if not renovar_bloqueo():
+            raise BloqueoPerdido(f"Archivo detenido tras {resultado['lotes']} lotes")
+
+    logger.info(
+        f"🗄️  Archivo: {resultado['entregas']} entregas y {resultado['fotos']} fotos "
+        f"anteriores a {resultado['antes_de']}"
+    )
+    return resultado
+
+
+@job_handler("archivo.archivar_entregas")
+def archivar_entregas_job(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    antes_de = date.fromisoformat(payload["antes_de"]) if payload.get("antes_de") else None
+    return archivar_entregas(db, antes_de, payload.get("lote"), payload.get("max_lotes"))
+
+
+# ==================== LECTURA BAJO DEMANDA ====================
+
+# Nombre de las fotos subidas: entrega_<id>_<hash>.<ext> (ver routes/entregas.py)
+FOTO_ENTREGA_RE = re.compile(r"^entrega_(\d+)_[^/\\]+$")
+
+
+def buscar_foto_archivada(nombre: str) -> Optional[Tuple[Path, str]]:
+    """
+    Zip y nombre dentro del zip de una foto que ya no está en uploads
+    (respaldo de /uploads, ver UploadsStaticFiles). None si no está archivada.
+    """
+    coincidencia = FOTO_ENTREGA_RE.match(nombre)
+    if not coincidencia:
+        return None
+    db = SessionLocal()
+    try:
+        paquete = db.query(EntregaArchivada.paquete_fotos).filter(
+            EntregaArchivada.id == int(coincidencia.group(1))
+        ).scalar()
+    finally:
+        db.close()
+    if not paquete:
+        return None
+    return _archivo_dir() / paquete, nombre
+
+
+def leer_entrega_archivada(db: Session, entrega_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Entrega archivada con el formato de EntregaResponse (None si no está en el archivo).
+    Sus fotos siguen disponibles en /uploads/...: se leen del zip del mes.
+    """
+    archivada = db.query(EntregaArchivada).filter(EntregaArchivada.id == entrega_id).first()
+    if not archivada:
+        return None
+    return descomprimir(archivada.datos)
+
+
+def facturas_archivadas(db: Session, normalizada: str) -> List[EntregaArchivada]:
+    """Entregas archivadas de una factura (índice factura_normalizada), más reciente primero"""
+    return db.query(EntregaArchivada).filter(
+        EntregaArchivada.factura_normalizada == normalizada
+    ).order_by(EntregaArchivada.fecha_operacion.desc(), EntregaArchivada.id.desc()).all()
@@ -0,0 +1,154 @@
+"""
+Búsqueda de texto en entregas (numero_factura, cliente, observacion)
+✅ PostgreSQL: columna generada entregas.busqueda (tsvector 'spanish' sin tildes) con índice
+   GIN (migrations/012_busqueda_entregas.sql), prefijos (término:*) y ranking ts_rank_cd
+✅ Sin la migración en PostgreSQL se calcula el tsvector al vuelo (correcto, sin índice), sin
+   tildes con f_unaccent / unaccent si existen o translate() de las vocales y la ñ si no
+✅ Otras bases (SQLite en pruebas): mismo criterio en Python sobre las filas filtradas
+"""
+import re
+import unicodedata
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, inspect, literal_column, select
+from sqlalchemy.orm import Query, Session, selectinload
+
+from app.models.entrega import Entrega
+
+MAX_TERMINOS = 10
+
+# Pesos de ts_rank (A, B, C): la factura pesa más que el cliente y este más que la observación
+PESOS = {"numero_factura": 1.0, "cliente": 0.4, "observacion": 0.2}
+
+# Respaldo de unaccent sin la extensión: letras con tilde del español
+CON_TILDE = "áéíóúüñÁÉÍÓÚÜÑ"
+SIN_TILDE = "aeiouunAEIOUUN"
+
+_columna_busqueda: Dict[str, bool] = {}
+_funcion_sin_tildes: Dict[str, Optional[str]] = {}
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin tildes (equivalente a unaccent + lower)"""
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+
+
+def palabras(texto: str) -> List[str]:
+    return re.findall(r"[0-9a-zñ]+", normalizar(texto))
+
+
+def extraer_terminos(texto: str) -> List[str]:
+    return palabras(texto)[:MAX_TERMINOS]
+
+
+def a_tsquery(terminos: List[str]) -> str:
+    """Todos los términos (AND), cada uno como prefijo: 'farma & 1234' -> 'farma:* & 1234:*'"""
+    return " & ".join(f"{termino}:*" for termino in terminos)
+
+
+def tiene_columna_busqueda(db: Session) -> bool:
+    bind = db.get_bind()
+    clave = str(bind.url)
+    if clave not in _columna_busqueda:
+        columnas = {columna["name"] for columna in inspect(bind).get_columns("entregas")}
+        _columna_busqueda[clave] = "busqueda" in columnas
+    return _columna_busqueda[clave]
+
+
+def funcion_sin_tildes(db: Session) -> Optional[str]:
+    """f_unaccent (migración 012) o unaccent (extensión) si existen en la base"""
+    bind = db.get_bind()
+    clave = str(bind.url)
+    if clave not in _funcion_sin_tildes:
+        _funcion_sin_tildes[clave] = next(
+            (
+                nombre for nombre in ("f_unaccent", "unaccent")
+                if db.execute(select(func.to_regprocedure(f"{nombre}(text)").isnot(None))).scalar()
+            ),
+            None
+        )
+    return _funcion_sin_tildes[clave]
+
+
+def _vector_al_vuelo(db: Session):
+    """Mismo tsvector que la columna generada de la migración 012"""
+    sin_tildes = funcion_sin_tildes(db)
+
+    def campo(columna, peso):
+        texto = func.coalesce(columna, "")
+        texto = getattr(func, sin_tildes)(texto) if sin_tildes else func.translate(texto, CON_TILDE, SIN_TILDE)
+        return func.setweight(func.to_tsvector("spanish", texto), peso)
+    return campo(Entrega.numero_factura, "A").op("||")(campo(Entrega.cliente, "B")).op("||")(
+        campo(Entrega.observacion, "C")
+    )
+
+
+def _aplicar_filtros(query: Query, fecha_inicio: Optional[date], fecha_fin: Optional[date], estado: Optional[str]) -> Query:
+    if fecha_inicio:
+        query = query.filter(Entrega.fecha_operacion >= fecha_inicio)
+    if fecha_fin:
+        query = query.filter(Entrega.fecha_operacion <= fecha_fin)
+    if estado:
+        query = query.filter(Entrega.estado == estado)
+    return query
+
+
+def _puntaje(entrega: Entrega, terminos: List[str]) -> float:
+    """0 si algún término no es prefijo de una palabra de la entrega; si no, suma de pesos"""
+    por_campo = {campo: palabras(getattr(entrega, campo) or "") for campo in PESOS}
+    total = 0.0
+    for termino in terminos:
+        mejor = max(
+            (peso for campo, peso in PESOS.items() if any(p.startswith(termino) for p in por_campo[campo])),
+            default=0.0
+        )
+        if not mejor:
+            return 0.0
+        total += mejor
+    return total
+
+
+def buscar_entregas_texto(
+    db: Session,
+    texto: str,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    estado: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50
+) -> List[Tuple[Entrega, float]]:
+    """
+    Entregas que contienen todos los términos (como prefijo), ordenadas por relevancia
+    y luego por fecha de operación descendente
+
+    Returns:
+        Pares (entrega, relevancia); lista vacía si el texto no tiene términos
+    """
+    terminos = extraer_terminos(texto)
+    if not terminos:
+        return []
+
+    if db.get_bind().dialect.name == "postgresql":
+        vector = literal_column("entregas.busqueda") if tiene_columna_busqueda(db) else _vector_al_vuelo(db)
+        consulta = func.to_tsquery("spanish", a_tsquery(terminos))
+        relevancia = func.ts_rank_cd(vector, consulta).label("relevancia")
+        query = db.query(Entrega, relevancia).options(
+            selectinload(Entrega.fotos), selectinload(Entrega.usuario_cumplido)
+        ).filter(vector.op("@@")(consulta))
+        query = _aplicar_filtros(query, fecha_inicio, fecha_fin, estado)
+        filas = query.order_by(
+            relevancia.desc(), Entrega.fecha_operacion.desc(), Entrega.id.desc()
+        ).offset(skip).limit(limit).all()
+        return [(entrega, float(puntaje)) for entrega, puntaje in filas]
+
+    # Respaldo en Python (pruebas con SQLite): recorre las filas que pasan los filtros
+    query = _aplicar_filtros(db.query(Entrega), fecha_inicio, fecha_fin, estado)
+    resultados = []
+    for entrega in query.yield_per(1000):
+        puntaje = _puntaje(entrega, terminos)
+        if puntaje:
+            resultados.append((entrega, puntaje))
+    resultados.sort(key=lambda par: (-par[1], -par[0].fecha_operacion.toordinal(), -par[0].id))
+    return resultados[skip:skip + limit]
@@ -0,0 +1,300 @@
+"""
+Caché de lectura para datos maestros (tipos de vehículo, vehículos, roles, páginas)
+✅ Read-through: @cacheado("entidad") sobre la función que consulta la base
+✅ Backends: "memoria" (LRU por worker) o "redis" (compartido entre workers y servidores)
+✅ TTL por entidad (CACHE_TTL_SEGUNDOS="tipos_vehiculo=600,vehiculos=120,...")
+✅ invalidar("entidad") tras el commit de crear/editar/eliminar: sube la versión de la entidad
+   y las claves anteriores dejan de usarse (con redis la invalidación llega a todos los workers;
+   con memoria se difunde a los demás workers con NOTIFY/LISTEN de PostgreSQL)
+✅ Métricas de aciertos/fallos por entidad: GET /api/sistema/cache
+✅ Los valores deben ser serializables a JSON (respuestas con model_dump(mode="json"))
+"""
+import functools
+import json
+import logging
+import select
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Los valores se guardan envueltos para distinguir un None cacheado de una clave ausente
+_VACIO = object()
+
+# Canal de NOTIFY/LISTEN para invalidar la caché en memoria de los demás workers
+CANAL_INVALIDACIONES = "cache_invalidaciones"
+
+
+class BackendMemoria:
+    """
+    LRU en memoria con expiración por entrada (por worker).
+    Con PostgreSQL cada invalidación se publica con NOTIFY y los demás workers (también de
+    otros servidores) la aplican desde su hilo de LISTEN (iniciar()). Sin PostgreSQL (ej:
+    SQLite en pruebas) la invalidación solo llega al worker que la hace.
+    """
+
+    nombre = "memoria"
+
+    def __init__(self, max_entradas: int):
+        self.max_entradas = max_entradas
+        self._datos: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._versiones: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._origen = uuid.uuid4().hex  # Para ignorar las notificaciones propias
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def usa_notify(self) -> bool:
+        return engine.dialect.name == "postgresql"
+
+    def leer(self, clave: str) -> Any:
+        with self._lock:
+            guardado = self._datos.get(clave)
+            if guardado is None:
+                return _VACIO
+            if guardado[0] <= time.monotonic():
+                del self._datos[clave]
+                return _VACIO
+            self._datos.move_to_end(clave)
+            return guardado[1]
+
+    def escribir(self, clave: str, valor: Any, ttl: float) -> None:
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def version(self, entidad: str) -> int:
+        return self._versiones[entidad]
+
+    def invalidar(self, entidad: str) -> None:
+        self._subir_version(entidad)
+        if self.usa_notify:
+            with engine.connect() as conexion:
+                conexion.execute(
+                    text("SELECT pg_notify(:canal, :payload)"),
+                    {"canal": CANAL_INVALIDACIONES, "payload": json.dumps({"entidad": entidad, "origen": self._origen})}
+                )
+                conexion.commit()
+
+    def _subir_version(self, entidad: str) -> None:
+        with self._lock:
+            self._versiones[entidad] += 1
+
+    def _vaciar(self) -> None:
+        with self._lock:
+            self._datos.clear()
+
+    def entradas(self) -> int:
+        return len(self._datos)
+
+    def iniciar(self) -> None:
+        """Escucha las invalidaciones de los demás workers en un hilo (solo PostgreSQL)"""
+        if self._thread or not self.usa_notify:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._escuchar, name="cache-listen", daemon=True)
+        self._thread.start()
+
+    def detener(self, timeout: float = 10) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _recibir(self, payload: str) -> None:
+        try:
+            mensaje = json.loads(payload)
+        except ValueError:
+            logger.warning(f"⚠️  Payload de invalidación inválido: {payload!r}")
+            return
+        if mensaje.get("origen") != self._origen and mensaje.get("entidad"):
+            self._subir_version(mensaje["entidad"])
+
+    def _escuchar(self) -> None:
+        """LISTEN en una conexión dedicada (fuera del pool), con reconexión"""
+        espera = 1
+        while not self._stop.is_set():
+            conexion = None
+            try:
+                cargs, cparams = engine.dialect.create_connect_args(engine.url)
+                conexion = engine.dialect.connect(*cargs, **cparams)
+                conexion.autocommit = True
+                conexion.cursor().execute(f"LISTEN {CANAL_INVALIDACIONES}")
+                # Las invalidaciones de mientras no se escuchaba se perdieron: se descarta todo
+                self._vaciar()
+                espera = 1
+
+                while not self._stop.is_set():
+                    if select.select([conexion], [], [], 5) == ([], [], []):
+                        continue
+                    conexion.poll()
+                    while conexion.notifies:
+                        self._recibir(conexion.notifies.pop(0).payload)
+            except Exception as e:
+                logger.error(f"❌ Error en LISTEN de invalidaciones de caché: {str(e)}. Reintentando en {espera}s")
+                self._stop.wait(espera)
+                espera = min(espera * 2, 30)
+            finally:
+                if conexion is not None:
+                    try:
+                        conexion.close()
+                    except Exception:
+                        pass
+
+
+class BackendRedis:
+    """Redis (o compatible: Valkey, KeyDB, Dragonfly) con valores JSON y TTL nativo"""
+
+    nombre = "redis"
+
+    def __init__(self, url: str, prefijo: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requiere el paquete 'redis' (pip install redis)") from e
+        self.prefijo = prefijo
+        self._cliente = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+
+    def leer(self, clave: str) -> Any:
+        datos = self._cliente.get(f"{self.prefijo}:{clave}")
+        return _VACIO if datos is None else json.loads(datos)
+
+    def escribir(self, clave: str, valor: Any, ttl: float) -> None:
+        self._cliente.set(f"{self.prefijo}:{clave}", json.dumps(valor), ex=max(1, int(ttl)))
+
+    def version(self, entidad: str) -> int:
+        return int(self._cliente.get(f"{self.prefijo}:version:{entidad}") or 0)
+
+    def invalidar(self, entidad: str) -> None:
+        self._cliente.incr(f"{self.prefijo}:version:{entidad}")
+
+    def entradas(self) -> Optional[int]:
+        return None
+
+    def iniciar(self) -> None:
+        pass  # La versión vive en redis: no hay nada que difundir
+
+    def detener(self) -> None:
+        pass
+
+
+def _parsear_ttls(valor: str) -> Dict[str, float]:
+    """"tipos_vehiculo=600,vehiculos=120" -> {"tipos_vehiculo": 600.0, "vehiculos": 120.0}"""
+    ttls = {}
+    for par in valor.split(","):
+        if "=" in par:
+            entidad, segundos = par.split("=", 1)
+            ttls[entidad.strip()] = float(segundos)
+    return ttls
+
+
+class CacheMaestros:
+    """Caché read-through con versión por entidad y métricas por worker"""
+
+    def __init__(self, backend, ttls: Dict[str, float], ttl_defecto: float):
+        self.backend = backend
+        self.ttls = ttls
+        self.ttl_defecto = ttl_defecto
+        self._metricas: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"aciertos": 0, "fallos": 0, "invalidaciones": 0, "errores": 0}
+        )
+
+    def ttl(self, entidad: str) -> float:
+        return self.ttls.get(entidad, self.ttl_defecto)
+
+    def obtener(self, entidad: str, clave: str, calcular: Callable[[], Any]) -> Any:
+        ttl = self.ttl(entidad)
+        if ttl <= 0:
+            return calcular()
+
+        metricas = self._metricas[entidad]
+        try:
+            clave_completa = f"{entidad}:v{self.backend.version(entidad)}:{clave}"
+            guardado = self.backend.leer(clave_completa)
+        except Exception as e:
+            # La caché nunca debe tumbar una lectura: se consulta la base directamente
+            metricas["errores"] += 1
+            logger.warning(f"⚠️  Caché {self.backend.nombre} no disponible ({entidad}): {str(e)}")
+            return calcular()
+
+        if guardado is not _VACIO:
+            metricas["aciertos"] += 1
+            return guardado["valor"]
+
+        metricas["fallos"] += 1
+        valor = calcular()
+        try:
+            self.backend.escribir(clave_completa, {"valor": valor}, ttl)
+        except Exception as e:
+            metricas["errores"] += 1
+            logger.warning(f"⚠️  No se pudo guardar en caché {self.backend.nombre} ({entidad}): {str(e)}")
+        return valor
+
+    def invalidar(self, entidad: str) -> None:
+        self._metricas[entidad]["invalidaciones"] += 1
+        try:
+            self.backend.invalidar(entidad)
+        except Exception as e:
+            self._metricas[entidad]["errores"] += 1
+            logger.error(f"❌ No se pudo invalidar la caché de {entidad}: {str(e)}")
+
+    def iniciar(self) -> None:
+        self.backend.iniciar()
+
+    def detener(self) -> None:
+        self.backend.detener()
+
+    def metricas(self) -> Dict[str, Any]:
+        entidades = {}
+        for entidad, valores in self._metricas.items():
+            consultas = valores["aciertos"] + valores["fallos"]
+            entidades[entidad] = {
+                **valores,
+                "ttl_segundos": self.ttl(entidad),
+                "tasa_aciertos": round(valores["aciertos"] / consultas * 100, 2) if consultas else 0.0,
+            }
+        return {"backend": self.backend.nombre, "entradas": self.backend.entradas(), "entidades": entidades}
+
+
+def _crear_backend():
+    if settings.cache_backend == "redis":
+        return BackendRedis(settings.cache_redis_url, settings.cache_redis_prefijo)
+    return BackendMemoria(settings.cache_max_entradas)
+
+
+cache_maestros = CacheMaestros(
+    _crear_backend(),
+    _parsear_ttls(settings.cache_ttl_segundos),
+    settings.cache_ttl_defecto_segundos
+)
+
+
+def cacheado(entidad: str):
+    """
+    Decorador read-through para funciones de lectura `f(db, *args, **kwargs)`.
+    La clave es el nombre de la función y sus argumentos (sin la sesión).
+    """
+    def decorador(funcion: Callable) -> Callable:
+        @functools.wraps(funcion)
+        def envoltura(db, *args, **kwargs):
+            clave = f"{funcion.__name__}:{json.dumps([args, kwargs], sort_keys=True, default=str)}"
+            return cache_maestros.obtener(entidad, clave, lambda: funcion(db, *args, **kwargs))
+        return envoltura
+    return decorador
+
+
+def invalidar(entidad: str) -> None:
+    """Descarta lo cacheado de la entidad (llamar después del commit)"""
+    cache_maestros.invalidar(entidad)
@@ -0,0 +1,81 @@
+"""
+Caché de KPIs del dashboard (GET /api/dashboard/kpis)
+✅ Clave (fecha_inicio, fecha_fin, hoy): al cambiar el día en Colombia la clave cambia sola
+✅ TTL corto (KPIS_CACHE_TTL_SEGUNDOS, 0 = sin caché)
+✅ Single-flight: si muchas pantallas piden lo mismo sin caché, se calcula una sola vez
+   y las demás peticiones esperan ese resultado
+✅ invalidar_kpis(): lo llaman las escrituras de entregas, operaciones y vehículos tras el commit.
+   La caché es por worker; en los demás workers el valor se renueva al vencer el TTL
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Combinaciones de fechas distintas que se guardan como máximo
+MAX_ENTRADAS = 256
+
+
+class CacheSingleFlight:
+    """Caché en memoria con TTL, cálculo único por clave e invalidación total"""
+
+    def __init__(self, ttl_segundos: float, max_entradas: int = MAX_ENTRADAS):
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        self._valores: Dict[Hashable, Tuple[float, Any]] = {}
+        self._en_curso: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+        self._generacion = 0
+        # invalidar() puede llamarse desde hilos del threadpool (rutas síncronas)
+        self._lock = threading.Lock()
+
+    async def obtener(self, clave: Hashable, calcular: Callable[[], Awaitable[Any]]) -> Any:
+        if self.ttl_segundos <= 0:
+            return await calcular()
+
+        with self._lock:
+            guardado = self._valores.get(clave)
+            if guardado and guardado[0] > time.monotonic():
+                return guardado[1]
+            generacion = self._generacion
+
+        # Un cálculo iniciado antes de una invalidación no se comparte con peticiones posteriores
+        vuelo = (generacion, clave)
+        tarea = self._en_curso.get(vuelo)
+        if tarea is None:
+            # Tarea propia: si la petición que la inició se cancela, las demás siguen esperándola
+            tarea = asyncio.ensure_future(calcular())
+            self._en_curso[vuelo] = tarea
+            tarea.add_done_callback(lambda t: self._terminar(vuelo, t))
+        return await asyncio.shield(tarea)
+
+    def _terminar(self, vuelo: Tuple[int, Hashable], tarea: asyncio.Task) -> None:
+        self._en_curso.pop(vuelo, None)
+        if tarea.cancelled() or tarea.exception() is not None:
+            return
+        generacion, clave = vuelo
+        with self._lock:
+            if generacion != self._generacion:
+                return  # Hubo escrituras mientras se calculaba
+            ahora = time.monotonic()
+            if len(self._valores) >= self.max_entradas:
+                self._valores = {c: v for c, v in self._valores.items() if v[0] > ahora}
+                if len(self._valores) >= self.max_entradas:
+                    self._valores.pop(min(self._valores, key=lambda c: self._valores[c][0]))
+            self._valores[clave] = (ahora + self.ttl_segundos, tarea.result())
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self._generacion += 1
+            self._valores.clear()
+
+
+cache_kpis = CacheSingleFlight(settings.kpis_cache_ttl_segundos)
+
+
+def invalidar_kpis() -> None:
+    """Descarta los KPIs cacheados en este worker (llamar después del commit)"""
+    cache_kpis.invalidar()
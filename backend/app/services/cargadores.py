@@ -0,0 +1,118 @@
+"""
+Carga por lotes de relaciones (estilo DataLoader) con alcance de request
+✅ Se registran las claves que se van a necesitar y se resuelven todas con un solo
+   SELECT ... WHERE columna IN (...) por entidad, en vez de una consulta por fila (N+1)
+✅ Memoización por request: una clave ya cargada (o inexistente) no vuelve a la base
+✅ relacionar() llena relaciones ORM (Usuario.rol, Entrega.fotos, Entrega.usuario_cumplido)
+   sin lazy load, así los esquemas con from_attributes no disparan consultas
+
+Uso en rutas:
+    def listar(db: Session = Depends(get_db), cargadores: Cargadores = Depends(get_cargadores)):
+        usuarios = db.query(Usuario).all()
+        cargadores.relacionar(usuarios, Usuario.rol)       # 1 consulta para todos los roles
+
+        paginas = cargadores.por(Page.id)
+        paginas.pedir(p.page_id for p in permisos)          # solo registra
+        page = paginas.obtener(permiso.page_id)             # 1 consulta para todas las pedidas
+"""
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import InstrumentedAttribute, set_committed_value
+
+# Límite de parámetros por IN (SQLite admite 999 en versiones antiguas)
+TAMANO_LOTE = 900
+
+_SIN_VALOR = object()
+
+
+class Cargador:
+    """
+    Filas de un modelo por una columna (normalmente la PK o una FK).
+    Con muchos=True cada clave devuelve la lista de filas (uno a muchos).
+    """
+
+    def __init__(self, db: Session, columna: InstrumentedAttribute, muchos: bool = False):
+        self.db = db
+        self.columna = columna
+        self.modelo = columna.class_
+        self.muchos = muchos
+        self._cache: Dict[Hashable, Any] = {}
+        self._pendientes: Set[Hashable] = set()
+
+    def pedir(self, claves: Iterable[Hashable]) -> None:
+        """Registra claves para la próxima consulta (no toca la base)"""
+        for clave in claves:
+            if clave is not None and clave not in self._cache:
+                self._pendientes.add(clave)
+
+    def cebar(self, clave: Hashable, valor: Any) -> None:
+        """Guarda un valor ya conocido (por ejemplo, recién creado) para no consultarlo"""
+        self._cache[clave] = valor
+        self._pendientes.discard(clave)
+
+    def _despachar(self) -> None:
+        pendientes = list(self._pendientes)
+        self._pendientes.clear()
+        encontrados: Dict[Hashable, Any] = {clave: [] if self.muchos else None for clave in pendientes}
+        for inicio in range(0, len(pendientes), TAMANO_LOTE):
+            lote = pendientes[inicio:inicio + TAMANO_LOTE]
+            for fila in self.db.query(self.modelo).filter(self.columna.in_(lote)):
+                clave = getattr(fila, self.columna.key)
+                if self.muchos:
+                    encontrados[clave].append(fila)
+                else:
+                    encontrados[clave] = fila
+        self._cache.update(encontrados)
+
+    def obtener(self, clave: Optional[Hashable]) -> Any:
+        """Fila (o lista con muchos=True) de la clave; None / [] si no existe"""
+        if clave is None:
+            return [] if self.muchos else None
+        valor = self._cache.get(clave, _SIN_VALOR)
+        if valor is _SIN_VALOR:
+            self._pendientes.add(clave)
+            self._despachar()
+            valor = self._cache[clave]
+        return valor
+
+    def obtener_muchos(self, claves: Iterable[Optional[Hashable]]) -> List[Any]:
+        """Valores en el mismo orden de las claves, con una sola consulta para las que faltan"""
+        claves = list(claves)
+        self.pedir(claves)
+        if self._pendientes:
+            self._despachar()
+        return [self.obtener(clave) for clave in claves]
+
+
+class Cargadores:
+    """Registro de cargadores de un request (uno por columna y cardinalidad)"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._cargadores: Dict[Tuple[type, str, bool], Cargador] = {}
+
+    def por(self, columna: InstrumentedAttribute, muchos: bool = False) -> Cargador:
+        # Atributos ORM redefinen ==: la clave usa modelo y nombre de columna
+        clave = (columna.class_, columna.key, muchos)
+        if clave not in self._cargadores:
+            self._cargadores[clave] = Cargador(self.db, columna, muchos)
+        return self._cargadores[clave]
+
+    def relacionar(self, objetos: Iterable[Any], relacion: InstrumentedAttribute) -> None:
+        """
+        Llena la relación en todos los objetos con una consulta IN (solo relaciones de una columna).
+        Los objetos que ya la tienen cargada no se tocan.
+        """
+        prop = relacion.property
+        if len(prop.local_remote_pairs) != 1:
+            raise ValueError(f"Relación {relacion} con clave compuesta: no soportada")
+        local, remota = prop.local_remote_pairs[0]
+        atributo_local = prop.parent.get_property_by_column(local).key
+        cargador = self.por(getattr(prop.mapper.class_, prop.mapper.get_property_by_column(remota).key), prop.uselist)
+
+        pendientes = [objeto for objeto in objetos if relacion.key not in objeto.__dict__]
+        valores = cargador.obtener_muchos(getattr(objeto, atributo_local) for objeto in pendientes)
+        for objeto, valor in zip(pendientes, valores):
+            # Lista propia por objeto: el ORM la toma como colección de ese padre
+            set_committed_value(objeto, relacion.key, list(valor) if prop.uselist else valor)
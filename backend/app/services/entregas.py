@@ -0,0 +1,27 @@
+"""
+Reglas de negocio de entregas compartidas por las rutas de entregas y de sincronización
+"""
+from datetime import datetime
+from typing import Any, Dict
+from zoneinfo import ZoneInfo
+
+ZONA_COLOMBIA = ZoneInfo("America/Bogota")
+
+# Estados que registran quién y cuándo cerró la entrega
+ESTADOS_CIERRE = ("cumplido", "no_cumplido")
+
+
+def ahora_colombia() -> datetime:
+    return datetime.now(ZONA_COLOMBIA)
+
+
+def aplicar_reglas_estado(update_data: Dict[str, Any], estado_actual: str, usuario_id: int) -> Dict[str, Any]:
+    """
+    Al pasar a cumplido/no_cumplido registra fecha_cumplido (hora Colombia) y
+    usuario_cumplido_id. Si la entrega ya estaba en ese estado no cambia nada.
+    """
+    nuevo_estado = update_data.get("estado")
+    if nuevo_estado in ESTADOS_CIERRE and estado_actual != nuevo_estado:
+        update_data["fecha_cumplido"] = ahora_colombia()
+        update_data["usuario_cumplido_id"] = usuario_id
+    return update_data
@@ -0,0 +1,188 @@
+"""
+Servicio de eventos de entregas en tiempo real
+✅ Los cambios de entregas se publican con NOTIFY (PostgreSQL) al hacer commit
+✅ Cada worker escucha el canal con LISTEN y reparte los eventos a sus suscriptores SSE
+✅ Sin PostgreSQL (ej: SQLite en pruebas) los eventos se reparten dentro del proceso
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Canal de NOTIFY/LISTEN para cambios de entregas
+CANAL_ENTREGAS = "entregas_eventos"
+
+# Eventos pendientes por suscriptor antes de descartar (cliente lento)
+MAX_EVENTOS_EN_COLA = 100
+
+
+class Suscripcion:
+    """Suscriptor SSE con sus filtros opcionales"""
+
+    def __init__(self, operacion_id: Optional[int] = None, fecha: Optional[date] = None):
+        self.operacion_id = operacion_id
+        self.fecha = fecha.isoformat() if fecha else None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_EVENTOS_EN_COLA)
+
+    def acepta(self, evento: Dict[str, Any]) -> bool:
+        if self.operacion_id is not None and evento.get("operacion_id") != self.operacion_id:
+            return False
+        if self.fecha is not None and evento.get("fecha_operacion") != self.fecha:
+            return False
+        return True
+
+
+class EntregasEventBroker:
+    """Reparte eventos de entregas a los suscriptores conectados a este worker"""
+
+    def __init__(self):
+        self._suscripciones: Set[Suscripcion] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def usa_notify(self) -> bool:
+        return engine.dialect.name == "postgresql"
+
+    def suscribir(self, operacion_id: Optional[int] = None, fecha: Optional[date] = None) -> Suscripcion:
+        """Registra un suscriptor (debe llamarse desde el event loop)"""
+        self._loop = asyncio.get_running_loop()
+        suscripcion = Suscripcion(operacion_id, fecha)
+        self._suscripciones.add(suscripcion)
+        if self.usa_notify:
+            self._iniciar_listener()
+        return suscripcion
+
+    def desuscribir(self, suscripcion: Suscripcion) -> None:
+        self._suscripciones.discard(suscripcion)
+
+    def despachar(self, evento: Dict[str, Any]) -> None:
+        """Entrega un evento a los suscriptores (seguro desde cualquier hilo)"""
+        loop = self._loop
+        if loop is None or not self._suscripciones or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._repartir, evento)
+
+    def _repartir(self, evento: Dict[str, Any]) -> None:
+        for suscripcion in list(self._suscripciones):
+            if not suscripcion.acepta(evento):
+                continue
+            try:
+                suscripcion.queue.put_nowait(evento)
+            except asyncio.QueueFull:
+                logger.warning("⚠️  Suscriptor SSE lento: se descarta un evento de entregas")
+
+    def _iniciar_listener(self) -> None:
+        with self._lock:
+            if self._listener and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(
+                target=self._escuchar, name="entregas-listen", daemon=True
+            )
+            self._listener.start()
+
+    def _escuchar(self) -> None:
+        """LISTEN en una conexión dedicada (fuera del pool), con reconexión"""
+        espera = 1
+        while True:
+            conexion = None
+            try:
+                cargs, cparams = engine.dialect.create_connect_args(engine.url)
+                conexion = engine.dialect.connect(*cargs, **cparams)
+                conexion.autocommit = True
+                cursor = conexion.cursor()
+                cursor.execute(f"LISTEN {CANAL_ENTREGAS}")
+                logger.info(f"📡 Escuchando eventos de entregas en canal '{CANAL_ENTREGAS}'")
+                espera = 1
+
+                while True:
+                    if select.select([conexion], [], [], 5) == ([], [], []):
+                        continue
+                    conexion.poll()
+                    while conexion.notifies:
+                        notificacion = conexion.notifies.pop(0)
+                        try:
+                            self.despachar(json.loads(notificacion.payload))
+                        except ValueError:
+                            logger.warning(f"⚠️  Payload de evento inválido: {notificacion.payload!r}")
+            except Exception as e:
+                logger.error(f"❌ Error en LISTEN de entregas: {str(e)}. Reintentando en {espera}s")
+                time.sleep(espera)
+                espera = min(espera * 2, 30)
+            finally:
+                if conexion is not None:
+                    try:
+                        conexion.close()
+                    except Exception:
+                        pass
+
+
+# Instancia global del broker (una por worker)
+broker_entregas = EntregasEventBroker()
+
+
+def publicar_evento_entrega(db: Session, tipo: str, entrega, operacion_id: int) -> None:
+    """
+    Publica un cambio de entrega. Llamar ANTES de db.commit():
+    el evento solo se entrega si la transacción se confirma.
+
+    Args:
+        db: Sesión de base de datos
+        tipo: "entrega_creada" | "entrega_actualizada"
+        entrega: Instancia de Entrega (con id asignado tras flush)
+        operacion_id: Operación a la que pertenece el vehículo de la entrega
+    """
+    if entrega.id is None:
+        db.flush()
+    publicar_eventos_entregas(db, tipo, [(entrega, operacion_id)])
+
+
+def publicar_eventos_entregas(db: Session, tipo: str, entregas: Iterable[Tuple[Any, int]]) -> None:
+    """
+    Publica varios cambios de entrega con un solo NOTIFY por lote (cambios masivos).
+    Llamar ANTES de db.commit(), igual que publicar_evento_entrega.
+
+    Args:
+        db: Sesión de base de datos
+        tipo: "entrega_creada" | "entrega_actualizada"
+        entregas: Pares (entrega, operacion_id); la entrega puede ser una fila de
+                  UPDATE ... RETURNING con id, vehiculo_operacion_id, fecha_operacion y estado
+    """
+    eventos = [
+        {
+            "tipo": tipo,
+            "entrega_id": entrega.id,
+            "vehiculo_operacion_id": entrega.vehiculo_operacion_id,
+            "operacion_id": operacion_id,
+            "fecha_operacion": entrega.fecha_operacion.isoformat() if entrega.fecha_operacion else None,
+            "estado": entrega.estado or "pendiente",
+        }
+        for entrega, operacion_id in entregas
+    ]
+    if not eventos:
+        return
+
+    if db.get_bind().dialect.name == "postgresql":
+        # NOTIFY es transaccional: PostgreSQL lo envía al confirmar el commit
+        db.execute(
+            text("SELECT pg_notify(:canal, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {"canal": CANAL_ENTREGAS, "payloads": [json.dumps(evento) for evento in eventos]}
+        )
+    else:
+        def despachar(session):
+            for evento in eventos:
+                broker_entregas.despachar(evento)
+
+        event.listen(db, "after_commit", despachar, once=True)
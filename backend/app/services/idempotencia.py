@@ -0,0 +1,126 @@
+"""
+Almacén de Idempotency-Key (tabla claves_idempotencia, ver app/middleware/idempotency.py)
+✅ reservar_clave(): la primera vez la escritura se ejecuta; en los reintentos se devuelve
+   la respuesta guardada (o "en_proceso" si la original todavía no termina)
+✅ Compartido entre workers: la reserva es un INSERT con restricción única (sujeto, clave)
+✅ La clave guarda el SHA-256 del cuerpo: reutilizarla con otro cuerpo es un "conflicto"
+✅ Las claves vencidas se purgan solas (como mucho una vez cada PURGA_INTERVALO_SEGUNDOS)
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.idempotencia import ClaveIdempotencia
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PURGA_INTERVALO_SEGUNDOS = 600
+_ultima_purga = 0.0
+
+
+@dataclass
+class Reserva:
+    estado: str  # nueva | repetida | en_proceso | conflicto
+    registro: Optional[ClaveIdempotencia] = None
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def purgar_claves_vencidas(db: Session, forzar: bool = False) -> int:
+    """Elimina las claves cuyo expira_en ya pasó. No hace commit."""
+    global _ultima_purga
+    ahora = time.monotonic()
+    if not forzar and ahora - _ultima_purga < PURGA_INTERVALO_SEGUNDOS:
+        return 0
+    _ultima_purga = ahora
+    return db.query(ClaveIdempotencia).filter(
+        ClaveIdempotencia.expira_en < _utcnow()
+    ).delete(synchronize_session=False)
+
+
+def reservar_clave(
+    db: Session, sujeto: str, clave: str, metodo: str, ruta: str, hash_cuerpo: Optional[str] = None
+) -> Reserva:
+    """
+    Reserva la clave para esta escritura (commit inmediato, visible para los demás workers)
+
+    Returns:
+        Reserva "nueva" (ejecutar y luego completar_clave/liberar_clave),
+        "repetida" (registro con la respuesta guardada), "en_proceso" o
+        "conflicto" (la clave ya se usó con otro método, ruta o cuerpo)
+    """
+    ahora = _utcnow()
+    purgar_claves_vencidas(db)
+
+    # La clave vuelve a estar libre si venció o si quedó en_proceso (worker caído)
+    db.query(ClaveIdempotencia).filter(
+        ClaveIdempotencia.sujeto == sujeto,
+        ClaveIdempotencia.clave == clave,
+        or_(
+            ClaveIdempotencia.expira_en < ahora,
+            and_(
+                ClaveIdempotencia.estado == "en_proceso",
+                ClaveIdempotencia.created_at < ahora - timedelta(seconds=settings.idempotencia_bloqueo_segundos)
+            )
+        )
+    ).delete(synchronize_session=False)
+
+    registro = ClaveIdempotencia(
+        clave=clave,
+        sujeto=sujeto,
+        metodo=metodo,
+        ruta=ruta,
+        hash_cuerpo=hash_cuerpo,
+        estado="en_proceso",
+        created_at=ahora,
+        expira_en=ahora + timedelta(hours=settings.idempotencia_ttl_horas)
+    )
+    db.add(registro)
+    try:
+        db.commit()
+        db.refresh(registro)
+        return Reserva("nueva", registro)
+    except IntegrityError:
+        db.rollback()
+
+    existente = db.query(ClaveIdempotencia).filter(
+        ClaveIdempotencia.sujeto == sujeto,
+        ClaveIdempotencia.clave == clave
+    ).first()
+    if existente is None:
+        # Se liberó mientras tanto: el cliente puede reintentar
+        return Reserva("en_proceso")
+    if existente.metodo != metodo or existente.ruta != ruta:
+        return Reserva("conflicto", existente)
+    if existente.hash_cuerpo is not None and existente.hash_cuerpo != hash_cuerpo:
+        return Reserva("conflicto", existente)
+    if existente.estado == "completado":
+        return Reserva("repetida", existente)
+    return Reserva("en_proceso", existente)
+
+
+def completar_clave(db: Session, registro_id: int, status_code: int, content_type: Optional[str], respuesta: bytes) -> None:
+    """Guarda la respuesta de la escritura para los reintentos"""
+    db.query(ClaveIdempotencia).filter(ClaveIdempotencia.id == registro_id).update({
+        "estado": "completado",
+        "status_code": status_code,
+        "content_type": content_type,
+        "respuesta": respuesta
+    }, synchronize_session=False)
+    db.commit()
+
+
+def liberar_clave(db: Session, registro_id: int) -> None:
+    """La escritura falló: el siguiente reintento con la misma clave se ejecuta de nuevo"""
+    db.query(ClaveIdempotencia).filter(ClaveIdempotencia.id == registro_id).delete(synchronize_session=False)
+    db.commit()
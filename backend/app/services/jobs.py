@@ -0,0 +1,271 @@
+"""
+Cola persistente de trabajos en segundo plano
+✅ Los trabajos se guardan en la tabla jobs (sobreviven reinicios)
+✅ Reclamo concurrente con SELECT ... FOR UPDATE SKIP LOCKED (varios workers/procesos)
+✅ Prioridades, reintentos con backoff exponencial y recuperación de trabajos huérfanos
+✅ Trabajos largos: renovar_bloqueo() entre lotes para no ser reclamados como huérfanos
+
+Uso:
+    @job_handler("permisos_usuario.reemplazar")
+    def reemplazar_permisos(db: Session, payload: dict) -> dict:
+        ...
+
+    job = encolar_job(db, "permisos_usuario.reemplazar", {...}, prioridad=5)
+    db.commit()
+"""
+import logging
+import os
+import random
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.job import Job, EstadoJob
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Session, Dict[str, Any]], Any]
+
+# Registro de handlers: tipo -> función
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(tipo: str) -> Callable[[JobHandler], JobHandler]:
+    """Decorador para registrar la función que ejecuta un tipo de trabajo"""
+    def decorator(func: JobHandler) -> JobHandler:
+        _handlers[tipo] = func
+        return func
+    return decorator
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class BloqueoPerdido(Exception):
+    """Otro worker reclamó el trabajo en curso (se venció JOBS_LOCK_TIMEOUT)"""
+
+
+# Trabajo que ejecuta el hilo actual: (id, bloqueado_por, intentos)
+_en_curso = threading.local()
+
+
+def renovar_bloqueo() -> bool:
+    """
+    Extiende el bloqueo del trabajo que ejecuta este hilo (llamar entre lotes).
+    Usa una sesión propia: no afecta la transacción del handler.
+
+    Returns:
+        False si el trabajo ya fue reclamado por otro worker: el handler debe detenerse
+        (lanzar BloqueoPerdido). Fuera de un trabajo siempre retorna True.
+    """
+    actual = getattr(_en_curso, "job", None)
+    if actual is None:
+        return True
+    db = SessionLocal()
+    try:
+        filas = _bloqueo_propio(db, actual).update({Job.bloqueado_en: _utcnow()}, synchronize_session=False)
+        db.commit()
+        return filas == 1
+    finally:
+        db.close()
+
+
+def _bloqueo_propio(db: Session, actual: Tuple[int, str, int]):
+    """La fila del trabajo solo si este worker todavía tiene el bloqueo (mismo reclamo)"""
+    job_id, bloqueado_por, intentos = actual
+    return db.query(Job).filter(
+        Job.id == job_id,
+        Job.estado == EstadoJob.EN_PROCESO.value,
+        Job.bloqueado_por == bloqueado_por,
+        Job.intentos == intentos
+    )
+
+
+def encolar_job(
+    db: Session,
+    tipo: str,
+    payload: Optional[Dict[str, Any]] = None,
+    prioridad: int = 0,
+    max_intentos: int = 5,
+    ejecutar_despues: Optional[datetime] = None,
+    usuario_id: Optional[int] = None
+) -> Job:
+    """
+    Agrega un trabajo a la cola. No hace commit: el trabajo se confirma
+    junto con el resto de la transacción del request.
+
+    Args:
+        db: Sesión de base de datos
+        tipo: Tipo registrado con @job_handler
+        payload: Datos JSON para el handler
+        prioridad: Mayor número = se ejecuta antes
+        max_intentos: Intentos antes de marcar como fallido
+        ejecutar_despues: No ejecutar antes de esta fecha (por defecto: ya)
+        usuario_id: Usuario que originó el trabajo
+
+    Returns:
+        Job creado (con id asignado)
+    """
+    if tipo not in _handlers:
+        raise ValueError(f"Tipo de trabajo no registrado: {tipo}")
+
+    job = Job(
+        tipo=tipo,
+        payload=payload or {},
+        estado=EstadoJob.PENDIENTE.value,
+        prioridad=prioridad,
+        max_intentos=max_intentos,
+        ejecutar_despues=ejecutar_despues or _utcnow(),
+        usuario_id=usuario_id
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def calcular_backoff(intentos: int, base_segundos: float = 5, max_segundos: float = 3600) -> timedelta:
+    """Backoff exponencial con jitter: base * 2^(intentos-1) ± 20%"""
+    espera = min(base_segundos * (2 ** max(intentos - 1, 0)), max_segundos)
+    return timedelta(seconds=espera * random.uniform(0.8, 1.2))
+
+
+class JobRunner:
+    """
+    Ejecuta trabajos de la tabla jobs en hilos del propio proceso
+
+    Args:
+        workers: Número de hilos que reclaman trabajos
+        poll_interval: Segundos de espera cuando la cola está vacía
+        lock_timeout: Segundos tras los cuales un trabajo en_proceso se considera huérfano
+    """
+
+    def __init__(self, workers: int = 1, poll_interval: float = 1.0, lock_timeout: int = 600):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lock_timeout = lock_timeout
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._loop, name=f"job-runner-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"⚙️  Job runner iniciado ({self.workers} hilo(s), id {self.worker_id})")
+
+    def stop(self, timeout: float = 10) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                procesado = self.ejecutar_siguiente()
+            except Exception as e:
+                logger.error(f"❌ Error en job runner: {str(e)}")
+                procesado = False
+            if not procesado:
+                self._stop.wait(self.poll_interval)
+
+    def reclamar(self, db: Session) -> Optional[Job]:
+        """Reclama el siguiente trabajo disponible (FOR UPDATE SKIP LOCKED)"""
+        ahora = _utcnow()
+        vencido = ahora - timedelta(seconds=self.lock_timeout)
+
+        job = db.query(Job).filter(
+            (
+                (Job.estado == EstadoJob.PENDIENTE.value) & (Job.ejecutar_despues <= ahora)
+            ) | (
+                (Job.estado == EstadoJob.EN_PROCESO.value) & (Job.bloqueado_en < vencido)
+            )
+        ).order_by(
+            Job.prioridad.desc(), Job.ejecutar_despues, Job.id
+        ).with_for_update(skip_locked=True).first()
+
+        if not job:
+            db.rollback()
+            return None
+
+        job.estado = EstadoJob.EN_PROCESO.value
+        job.bloqueado_por = self.worker_id
+        job.bloqueado_en = ahora
+        job.intentos = (job.intentos or 0) + 1
+        db.commit()
+        return job
+
+    def ejecutar_siguiente(self) -> bool:
+        """Reclama y ejecuta un trabajo. Retorna False si la cola estaba vacía"""
+        db = SessionLocal()
+        try:
+            job = self.reclamar(db)
+            if not job:
+                return False
+            self._ejecutar(db, job)
+            return True
+        finally:
+            db.close()
+
+    def _ejecutar(self, db: Session, job: Job) -> None:
+        handler = _handlers.get(job.tipo)
+        job_id, tipo, intento = job.id, job.tipo, job.intentos
+        actual = (job.id, job.bloqueado_por, job.intentos)
+        _en_curso.job = actual
+        try:
+            if handler is None:
+                raise LookupError(f"Tipo de trabajo no registrado: {job.tipo}")
+            resultado = handler(db, dict(job.payload or {}))
+            # Cierre condicional, en la misma transacción que el trabajo del handler: si el
+            # bloqueo venció y otro worker reclamó el trabajo, no se pisa su estado
+            filas = _bloqueo_propio(db, actual).update({
+                Job.estado: EstadoJob.COMPLETADO.value,
+                Job.resultado: resultado,
+                Job.ultimo_error: None,
+                Job.finalizado_en: _utcnow(),
+                Job.bloqueado_por: None,
+                Job.bloqueado_en: None,
+            }, synchronize_session=False)
+            if filas != 1:
+                raise BloqueoPerdido()
+            db.commit()
+            logger.info(f"✅ Job {job_id} ({tipo}) completado en intento {intento}")
+        except BloqueoPerdido:
+            # El trabajo ahora es de otro worker: no se toca su fila
+            db.rollback()
+            logger.warning(f"⚠️  Job {job_id} ({tipo}) reclamado por otro worker; se detiene este intento")
+        except Exception as e:
+            db.rollback()
+            job = _bloqueo_propio(db, actual).with_for_update().first()
+            if job is None:
+                db.rollback()
+                logger.warning(
+                    f"⚠️  Job {job_id} ({tipo}) falló pero ya lo reclamó otro worker: {type(e).__name__}: {str(e)}"
+                )
+                return
+            job.ultimo_error = f"{type(e).__name__}: {str(e)}"
+            job.bloqueado_por = None
+            job.bloqueado_en = None
+            if job.intentos >= job.max_intentos:
+                job.estado = EstadoJob.FALLIDO.value
+                job.finalizado_en = _utcnow()
+                logger.error(f"❌ Job {job.id} ({job.tipo}) falló definitivamente: {job.ultimo_error}")
+            else:
+                job.estado = EstadoJob.PENDIENTE.value
+                job.ejecutar_despues = _utcnow() + calcular_backoff(job.intentos)
+                logger.warning(
+                    f"⚠️  Job {job.id} ({job.tipo}) falló (intento {job.intentos}/{job.max_intentos}), "
+                    f"reintento programado: {job.ultimo_error}"
+                )
+            db.commit()
+        finally:
+            _en_curso.job = None
@@ -0,0 +1,62 @@
+"""
+Mantenimiento de particiones mensuales (migrations/008_partition_entregas.sql)
+✅ Crea por adelantado las particiones de los próximos meses de entregas y fotos_evidencia
+✅ Sin efecto si la base no es PostgreSQL o las tablas no están particionadas
+"""
+import logging
+from datetime import date
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+TABLAS_PARTICIONADAS = ("entregas", "fotos_evidencia")
+
+
+def sumar_meses(fecha: date, meses: int) -> date:
+    """Primer día del mes que está `meses` meses después del mes de `fecha`"""
+    indice = fecha.year * 12 + fecha.month - 1 + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def tabla_particionada(conexion, tabla: str) -> bool:
+    return conexion.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:tabla))"),
+        {"tabla": tabla}
+    ).scalar()
+
+
+def asegurar_particiones(
+    engine: Engine,
+    meses_adelante: int = 3,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None
+) -> Dict[str, int]:
+    """
+    Crea las particiones mensuales faltantes entre `desde` (por defecto el mes actual)
+    y `hasta` (por defecto `meses_adelante` meses después). Idempotente.
+
+    Returns:
+        Particiones creadas por tabla
+    """
+    if engine.dialect.name != "postgresql":
+        return {}
+
+    desde = desde or date.today()
+    hasta = hasta or sumar_meses(desde, meses_adelante)
+    creadas: Dict[str, int] = {}
+    with engine.begin() as conexion:
+        # Varios workers arrancan a la vez: solo uno crea particiones por vez
+        conexion.execute(text("SELECT pg_advisory_xact_lock(hashtext('crear_particiones_mensuales'))"))
+        for tabla in TABLAS_PARTICIONADAS:
+            if not tabla_particionada(conexion, tabla):
+                continue
+            creadas[tabla] = conexion.execute(
+                text("SELECT crear_particiones_mensuales(:tabla, :desde, :hasta)"),
+                {"tabla": tabla, "desde": desde, "hasta": hasta}
+            ).scalar() or 0
+    if any(creadas.values()):
+        logger.info(f"🗂️  Particiones mensuales creadas: {creadas}")
+    return creadas
@@ -0,0 +1,75 @@
+"""
+Escritura de permisos en bloque (por usuario y por rol)
+✅ Un solo INSERT ... ON CONFLICT DO UPDATE por lote, sobre las columnas únicas
+   (usuario_id, page_id) y (rol_id, page_id). Por columnas y no por nombre de constraint:
+   database/schema_rbac.sql y migrate_to_rbac.sql los crean sin nombre (UNIQUE(...))
+✅ Usuarios y páginas se validan con una consulta por tabla
+✅ No hace commit: el llamador decide la transacción
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models import Page, PermisosRol, PermisosUsuario, Usuario
+
+COLUMNAS_PERMISO = ("puede_ver", "puede_crear", "puede_editar", "puede_eliminar")
+
+
+def _validar_existentes(db: Session, columna, ids: Iterable[int], singular: str, plural: str) -> None:
+    ids = set(ids)
+    if not ids:
+        return
+    existentes = {id_ for (id_,) in db.query(columna).filter(columna.in_(ids))}
+    faltantes = sorted(ids - existentes)
+    if faltantes:
+        detalle = singular.format(faltantes[0]) if len(faltantes) == 1 else f"{plural}: {faltantes}"
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detalle)
+
+
+def validar_pages(db: Session, page_ids: Iterable[int]) -> None:
+    """404 con las páginas que no existen (una consulta)"""
+    _validar_existentes(db, Page.id, page_ids, "Página {} no encontrada", "Páginas no encontradas")
+
+
+def validar_usuarios_y_pages(db: Session, usuario_ids: Iterable[int], page_ids: Iterable[int]) -> None:
+    """404 con los ids que no existen (una consulta para usuarios y otra para páginas)"""
+    _validar_existentes(db, Usuario.id, usuario_ids, "Usuario {} no encontrado", "Usuarios no encontrados")
+    validar_pages(db, page_ids)
+
+
+def _upsert(db: Session, modelo, clave: Tuple[str, str], filas: List[Dict], extra: Dict) -> List:
+    # Una misma clave dos veces en el INSERT haría fallar el ON CONFLICT: gana la última
+    unicas = {tuple(fila[columna] for columna in clave): fila for fila in filas}
+    if not unicas:
+        return []
+
+    insertar = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insertar(modelo).values(list(unicas.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(clave),
+        set_={**{columna: stmt.excluded[columna] for columna in COLUMNAS_PERMISO}, **extra}
+    )
+    filas_resultado = db.scalars(stmt.returning(modelo), execution_options={"populate_existing": True}).all()
+
+    por_clave = {tuple(getattr(fila, columna) for columna in clave): fila for fila in filas_resultado}
+    return [por_clave[llave] for llave in unicas]
+
+
+def upsert_permisos_usuario(db: Session, filas: List[Dict]) -> List[PermisosUsuario]:
+    """
+    Crea o actualiza los permisos (dicts con usuario_id, page_id y columnas puede_*).
+    Devuelve las filas resultantes en el orden recibido.
+    """
+    return _upsert(
+        db, PermisosUsuario, ("usuario_id", "page_id"), filas,
+        {"fecha_actualizacion": func.now()}
+    )
+
+
+def upsert_permisos_rol(db: Session, filas: List[Dict]) -> List[PermisosRol]:
+    """Igual que upsert_permisos_usuario, para permisos de rol (rol_id, page_id)"""
+    return _upsert(db, PermisosRol, ("rol_id", "page_id"), filas, {})
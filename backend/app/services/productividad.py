@@ -0,0 +1,199 @@
+"""
+Productividad por vehículo / operación (GET /api/dashboard/productividad)
+✅ PostgreSQL: una sola consulta con funciones de ventana
+   - lag(fecha_cumplido) por jornada (vehículo en una operación): minutos entre cumplidos
+   - percentile_cont(0.5): mediana de esos intervalos
+   - rank(): posición por entregas cumplidas por hora
+✅ Horas trabajadas: desde hora_inicio del vehículo (hora de Colombia) hasta su último cumplido;
+   sin hora_inicio, desde su primer cumplido
+✅ Otras bases (SQLite en pruebas): mismo cálculo en Python
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from statistics import median
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.entrega import Entrega
+from app.models.operacion import OperacionDiaria, VehiculoOperacion
+from app.services.tendencias import ZONA, ZONA_HORARIA
+
+# Columnas que identifican cada fila del resultado según la agrupación
+AGRUPACIONES = {
+    "vehiculo": ("placa",),
+    "operacion": ("operacion_id", "fecha_operacion"),
+}
+
+_SQL_PRODUCTIVIDAD = """
+WITH base AS (
+    SELECT vo.id AS jornada_id, vo.placa, vo.operacion_id, o.fecha_operacion, vo.hora_inicio,
+           e.estado, e.fecha_cumplido
+    FROM entregas e
+    JOIN vehiculos_operacion vo ON vo.id = e.vehiculo_operacion_id
+    JOIN operaciones_diarias o ON o.id = vo.operacion_id
+    WHERE e.fecha_operacion BETWEEN :inicio AND :fin
+),
+intervalos AS (
+    SELECT {clave},
+           CAST(EXTRACT(EPOCH FROM fecha_cumplido - lag(fecha_cumplido) OVER (
+               PARTITION BY jornada_id ORDER BY fecha_cumplido
+           )) AS double precision) / 60 AS minutos
+    FROM base
+    WHERE estado = 'cumplido' AND fecha_cumplido IS NOT NULL
+),
+medianas AS (
+    SELECT {clave}, percentile_cont(0.5) WITHIN GROUP (ORDER BY minutos) AS mediana
+    FROM intervalos
+    WHERE minutos IS NOT NULL
+    GROUP BY {clave}
+),
+jornadas AS (
+    SELECT jornada_id, placa, operacion_id, fecha_operacion,
+           count(*) AS total,
+           count(*) FILTER (WHERE estado = 'cumplido') AS cumplidas,
+           count(*) FILTER (WHERE estado = 'no_cumplido') AS no_cumplidas,
+           CAST(EXTRACT(EPOCH FROM
+               max(fecha_cumplido) FILTER (WHERE estado = 'cumplido')
+               - COALESCE(
+                   (fecha_operacion + hora_inicio) AT TIME ZONE :zona,
+                   min(fecha_cumplido) FILTER (WHERE estado = 'cumplido')
+               )
+           ) AS double precision) / 3600 AS horas
+    FROM base
+    GROUP BY jornada_id, placa, operacion_id, fecha_operacion, hora_inicio
+),
+resumen AS (
+    SELECT {clave},
+           count(*) AS jornadas,
+           sum(total) AS total,
+           sum(cumplidas) AS cumplidas,
+           sum(no_cumplidas) AS no_cumplidas,
+           sum(horas) FILTER (WHERE horas > 0) AS horas,
+           sum(cumplidas) FILTER (WHERE horas > 0)
+               / NULLIF(sum(horas) FILTER (WHERE horas > 0), 0) AS entregas_por_hora
+    FROM jornadas
+    GROUP BY {clave}
+)
+SELECT resumen.*, medianas.mediana,
+       rank() OVER (ORDER BY resumen.entregas_por_hora DESC NULLS LAST) AS ranking
+FROM resumen
+LEFT JOIN medianas USING ({clave})
+ORDER BY ranking, {clave}
+"""
+
+
+def _local(momento: Optional[datetime]) -> Optional[datetime]:
+    """Hora de Colombia sin zona (en SQLite fecha_cumplido se guardó ya en hora de Colombia)"""
+    if momento is None or momento.tzinfo is None:
+        return momento
+    return momento.astimezone(ZONA).replace(tzinfo=None)
+
+
+def _fila(clave: Dict, jornadas: int, total: int, cumplidas: int, no_cumplidas: int,
+          horas: Optional[float], entregas_por_hora: Optional[float], mediana: Optional[float]) -> Dict:
+    return {
+        "placa": clave.get("placa"),
+        "operacion_id": clave.get("operacion_id"),
+        "fecha_operacion": clave.get("fecha_operacion"),
+        "jornadas": jornadas,
+        "total_entregas": total,
+        "cumplidas": cumplidas,
+        "no_cumplidas": no_cumplidas,
+        "tasa_cumplimiento": round(cumplidas / total * 100, 2) if total else 0.0,
+        "horas_trabajadas": round(horas, 2) if horas is not None else None,
+        "entregas_por_hora": round(entregas_por_hora, 2) if entregas_por_hora is not None else None,
+        "mediana_minutos_entre_cumplidos": round(mediana, 2) if mediana is not None else None,
+    }
+
+
+def _productividad_python(db: Session, inicio: date, fin: date, columnas: tuple) -> List[Dict]:
+    filas = db.query(
+        VehiculoOperacion.id, VehiculoOperacion.placa, VehiculoOperacion.operacion_id,
+        OperacionDiaria.fecha_operacion, VehiculoOperacion.hora_inicio,
+        Entrega.estado, Entrega.fecha_cumplido
+    ).join(
+        VehiculoOperacion, VehiculoOperacion.id == Entrega.vehiculo_operacion_id
+    ).join(
+        OperacionDiaria, OperacionDiaria.id == VehiculoOperacion.operacion_id
+    ).filter(Entrega.fecha_operacion.between(inicio, fin)).all()
+
+    jornadas: Dict[int, Dict] = {}
+    for jornada_id, placa, operacion_id, fecha_operacion, hora_inicio, estado, fecha_cumplido in filas:
+        jornada = jornadas.setdefault(jornada_id, {
+            "clave": {"placa": placa, "operacion_id": operacion_id, "fecha_operacion": fecha_operacion},
+            "inicio": datetime.combine(fecha_operacion, hora_inicio) if hora_inicio else None,
+            "total": 0, "no_cumplidas": 0, "cumplidos": [],
+        })
+        jornada["total"] += 1
+        if estado == "no_cumplido":
+            jornada["no_cumplidas"] += 1
+        elif estado == "cumplido" and fecha_cumplido is not None:
+            jornada["cumplidos"].append(_local(fecha_cumplido))
+
+    grupos: Dict[tuple, Dict] = defaultdict(lambda: {
+        "jornadas": 0, "total": 0, "cumplidas": 0, "no_cumplidas": 0,
+        "horas": 0.0, "cumplidas_con_horas": 0, "intervalos": [],
+    })
+    for jornada in jornadas.values():
+        grupo = grupos[tuple(jornada["clave"][columna] for columna in columnas)]
+        cumplidos = sorted(jornada["cumplidos"])
+        grupo["jornadas"] += 1
+        grupo["total"] += jornada["total"]
+        grupo["cumplidas"] += len(cumplidos)
+        grupo["no_cumplidas"] += jornada["no_cumplidas"]
+        grupo["intervalos"].extend(
+            (actual - anterior).total_seconds() / 60 for anterior, actual in zip(cumplidos, cumplidos[1:])
+        )
+        if cumplidos:
+            horas = (cumplidos[-1] - (jornada["inicio"] or cumplidos[0])).total_seconds() / 3600
+            if horas > 0:
+                grupo["horas"] += horas
+                grupo["cumplidas_con_horas"] += len(cumplidos)
+
+    resultados = []
+    for valores, grupo in grupos.items():
+        horas = grupo["horas"] or None
+        resultados.append(_fila(
+            dict(zip(columnas, valores)), grupo["jornadas"], grupo["total"], grupo["cumplidas"],
+            grupo["no_cumplidas"], horas, grupo["cumplidas_con_horas"] / horas if horas else None,
+            median(grupo["intervalos"]) if grupo["intervalos"] else None
+        ))
+    return resultados
+
+
+def _asignar_ranking(resultados: List[Dict], columnas: tuple) -> List[Dict]:
+    """rank() OVER (ORDER BY entregas_por_hora DESC NULLS LAST)"""
+    resultados.sort(key=lambda r: (r["entregas_por_hora"] is None, -(r["entregas_por_hora"] or 0),
+                                   tuple(r[columna] for columna in columnas)))
+    anterior, ranking = object(), 0
+    for posicion, resultado in enumerate(resultados, start=1):
+        if resultado["entregas_por_hora"] != anterior:
+            ranking, anterior = posicion, resultado["entregas_por_hora"]
+        resultado["ranking"] = ranking
+    return resultados
+
+
+def calcular_productividad(db: Session, inicio: date, fin: date, agrupar: str = "vehiculo") -> List[Dict]:
+    """
+    Entregas, tasa de cumplimiento, cumplidas por hora y mediana de minutos entre cumplidos,
+    por placa o por operación, de las entregas con fecha_operacion en el rango.
+    Ordenado por ranking (más entregas cumplidas por hora primero).
+    """
+    columnas = AGRUPACIONES[agrupar]
+
+    if db.get_bind().dialect.name != "postgresql":
+        return _asignar_ranking(_productividad_python(db, inicio, fin, columnas), columnas)
+
+    sql = _SQL_PRODUCTIVIDAD.format(clave=", ".join(columnas))
+    filas = db.execute(text(sql), {"inicio": inicio, "fin": fin, "zona": ZONA_HORARIA}).mappings()
+    resultados = []
+    for fila in filas:
+        resultado = _fila(
+            fila, fila["jornadas"], int(fila["total"]), int(fila["cumplidas"]), int(fila["no_cumplidas"]),
+            fila["horas"], fila["entregas_por_hora"], fila["mediana"]
+        )
+        resultado["ranking"] = fila["ranking"]
+        resultados.append(resultado)
+    return resultados
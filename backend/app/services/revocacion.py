@@ -0,0 +1,192 @@
+"""
+Revocación de tokens JWT por jti (tabla tokens_revocados)
+✅ POST /api/auth/logout revoca el token: se guarda su jti hasta que vence
+✅ get_user_from_token consulta solo la lista en memoria, nunca la base:
+   - filtro de Bloom: descarta de inmediato los tokens no revocados (casi todos)
+   - conjunto exacto: confirma los positivos del filtro (sin falsos positivos)
+✅ Un hilo en segundo plano (iniciado en la fase "services" del arranque, como el job runner)
+   trae cada REVOCACION_REFRESCO_SEGUNDOS solo las filas nuevas (revocado_en); la revocación
+   hecha en este worker aplica de inmediato
+✅ Cada REVOCACION_RECARGA_COMPLETA_SEGUNDOS el mismo hilo reconstruye la lista sin los tokens
+   vencidos y purga sus filas
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.revocacion import TokenRevocado
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Las transacciones en curso pueden confirmar filas con revocado_en algo anterior al último visto
+MARGEN_SEGUNDOS = 5
+
+FALSOS_POSITIVOS = 0.01
+
+
+class FiltroBloom:
+    """Filtro de Bloom sobre un bytearray (doble hashing con blake2b)"""
+
+    def __init__(self, capacidad: int, falsos_positivos: float = FALSOS_POSITIVOS):
+        capacidad = max(capacidad, 1)
+        self.bits = max(8, int(-capacidad * math.log(falsos_positivos) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacidad * math.log(2)))
+        self._datos = bytearray((self.bits + 7) // 8)
+
+    def _posiciones(self, valor: str) -> Iterable[int]:
+        digest = hashlib.blake2b(valor.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def agregar(self, valor: str) -> None:
+        for posicion in self._posiciones(valor):
+            self._datos[posicion >> 3] |= 1 << (posicion & 7)
+
+    def __contains__(self, valor: str) -> bool:
+        return all(self._datos[posicion >> 3] & (1 << (posicion & 7)) for posicion in self._posiciones(valor))
+
+
+def registrar_jti(db: Session, jti: str, usuario_id: Optional[int], expira_en: datetime) -> bool:
+    """
+    Guarda el jti en tokens_revocados (sin commit). False si ya estaba: INSERT ... ON CONFLICT
+    DO NOTHING, así dos workers que registran el mismo jti a la vez no chocan con el UNIQUE.
+    """
+    insertar = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insertar(TokenRevocado).values(jti=jti, usuario_id=usuario_id, expira_en=expira_en)
+    return db.execute(stmt.on_conflict_do_nothing(index_elements=["jti"])).rowcount == 1
+
+
+def _epoch(momento: datetime) -> float:
+    # SQLite devuelve fechas sin zona (UTC)
+    return (momento if momento.tzinfo else momento.replace(tzinfo=timezone.utc)).timestamp()
+
+
+class ListaRevocacion:
+    """Tokens revocados vigentes de todos los workers, en memoria de este worker"""
+
+    def __init__(self, refresco_segundos: float, recarga_completa_segundos: float, capacidad: int):
+        self.refresco_segundos = refresco_segundos
+        self.recarga_completa_segundos = recarga_completa_segundos
+        self.capacidad = capacidad
+        self._filtro = FiltroBloom(capacidad)
+        self._exactos: Dict[str, float] = {}  # jti -> expira (epoch)
+        self._marca: Optional[datetime] = None  # Mayor revocado_en visto (reloj de la base)
+        self._ultima_recarga: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _agregar(self, jti: str, expira: float) -> None:
+        self._exactos[jti] = expira
+        self._filtro.agregar(jti)
+
+    def _consultar(self, db: Session, desde: Optional[datetime]) -> List[Tuple[str, datetime, datetime]]:
+        consulta = db.query(TokenRevocado.jti, TokenRevocado.expira_en, TokenRevocado.revocado_en)
+        if desde is not None:
+            consulta = consulta.filter(TokenRevocado.revocado_en >= desde - timedelta(seconds=MARGEN_SEGUNDOS))
+        return consulta.all()
+
+    def _recargar(self, db: Session) -> None:
+        """Reconstruye filtro y conjunto con las revocaciones vigentes y purga las vencidas"""
+        db.query(TokenRevocado).filter(TokenRevocado.expira_en < func.now()).delete(synchronize_session=False)
+        db.commit()
+        filas = self._consultar(db, None)
+
+        # Se arma aparte y se reemplaza al final: las lecturas concurrentes nunca ven un filtro a medio cargar
+        filtro = FiltroBloom(max(self.capacidad, 2 * len(filas)))
+        exactos: Dict[str, float] = {}
+        for jti, expira_en, _ in filas:
+            exactos[jti] = _epoch(expira_en)
+            filtro.agregar(jti)
+        self._filtro, self._exactos = filtro, exactos
+        self._avanzar_marca(filas)
+        self._ultima_recarga = time.monotonic()
+
+    def _traer_nuevas(self, db: Session) -> None:
+        filas = self._consultar(db, self._marca)
+        for jti, expira_en, _ in filas:
+            self._agregar(jti, _epoch(expira_en))
+        self._avanzar_marca(filas)
+
+    def _avanzar_marca(self, filas: List[Tuple[str, datetime, datetime]]) -> None:
+        for _, _, revocado_en in filas:
+            if self._marca is None or revocado_en > self._marca:
+                self._marca = revocado_en
+
+    def refrescar(self) -> None:
+        """Trae las revocaciones nuevas (o recarga todo si toca). Solo desde start() y el hilo."""
+        ahora = time.monotonic()
+        try:
+            db = SessionLocal()
+            try:
+                with self._lock:
+                    if self._ultima_recarga is None or ahora - self._ultima_recarga >= self.recarga_completa_segundos:
+                        self._recargar(db)
+                    else:
+                        self._traer_nuevas(db)
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning(f"⚠️  No se pudo refrescar la lista de tokens revocados: {str(e)}")
+
+    def start(self) -> None:
+        """Carga inicial (bloqueante, al arrancar) y luego refresco en un hilo"""
+        if self._thread:
+            return
+        self._stop.clear()
+        self.refrescar()
+        self._thread = threading.Thread(target=self._loop, name="revocacion-refresco", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.refresco_segundos):
+            self.refrescar()
+
+    def esta_revocado(self, jti: str) -> bool:
+        """Solo memoria: se puede llamar desde el event loop"""
+        if jti not in self._filtro:
+            return False
+        return jti in self._exactos
+
+    def revocar(self, db: Session, jti: str, usuario_id: Optional[int], expira_en: datetime) -> None:
+        """
+        Guarda la revocación (commit) y la aplica de inmediato en este worker.
+        Idempotente: dos logout simultáneos del mismo token no chocan (ON CONFLICT DO NOTHING).
+        """
+        registrar_jti(db, jti, usuario_id, expira_en)
+        db.commit()
+        with self._lock:
+            self._agregar(jti, _epoch(expira_en))
+
+    def estadisticas(self) -> Dict[str, int]:
+        return {
+            "revocados_en_memoria": len(self._exactos),
+            "bits_filtro": self._filtro.bits,
+            "hashes_filtro": self._filtro.hashes,
+        }
+
+
+lista_revocacion = ListaRevocacion(
+    settings.revocacion_refresco_segundos,
+    settings.revocacion_recarga_completa_segundos,
+    settings.revocacion_capacidad
+)
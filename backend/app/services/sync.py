@@ -0,0 +1,217 @@
+"""
+Sincronización incremental para dispositivos de conductores (GET/POST /api/sync)
+✅ Pull: solo las filas de entregas, fotos_evidencia y vehiculos_operacion del vehículo
+   cambiadas desde el watermark (updated_at / uploaded_at), más tombstones de las borradas
+✅ El watermark se retrasa SYNC_MARGEN_SEGUNDOS: una fila puede llegar dos veces
+   (el cliente hace upsert por id) pero no se pierden las de transacciones en curso
+✅ Paginación por clave (marca de tiempo, id): el cursor guarda además el último id entregado
+   de cada lista con esa marca, así más de SYNC_LIMITE filas con el mismo updated_at
+   no repiten siempre la misma página
+✅ Push: cambios offline de estado/observación con control de versión por updated_at
+"""
+import base64
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, joinedload
+
+from app.config import get_settings
+from app.models.entrega import Entrega, FotoEvidencia
+from app.models.operacion import VehiculoOperacion
+from app.models.sync import EliminacionSync
+from app.schemas.sync import CambioEntregaSync
+from app.services.cache_kpis import invalidar_kpis
+from app.services.entregas import aplicar_reglas_estado
+from app.services.eventos_entregas import publicar_eventos_entregas
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PURGA_INTERVALO_SEGUNDOS = 3600
+_ultima_purga = 0.0
+
+
+def _utc(valor: Optional[datetime]) -> Optional[datetime]:
+    """Las fechas sin zona (SQLite) se guardan en UTC"""
+    if valor is None or valor.tzinfo is not None:
+        return valor
+    return valor.replace(tzinfo=timezone.utc)
+
+
+def purgar_eliminaciones(db: Session, forzar: bool = False) -> int:
+    """Borra los tombstones más antiguos que SYNC_RETENCION_DIAS. No hace commit."""
+    global _ultima_purga
+    ahora = time.monotonic()
+    if not forzar and ahora - _ultima_purga < PURGA_INTERVALO_SEGUNDOS:
+        return 0
+    _ultima_purga = ahora
+    limite = datetime.now(timezone.utc) - timedelta(days=settings.sync_retencion_dias)
+    return db.query(EliminacionSync).filter(EliminacionSync.eliminado_en < limite).delete(synchronize_session=False)
+
+
+# Lista del cursor -> columna de marca de tiempo del modelo
+LISTAS = {"e": "updated_at", "f": "uploaded_at", "x": "eliminado_en"}
+
+
+def codificar_cursor(marca: datetime, ultimos: Dict[str, Optional[int]]) -> str:
+    """Cursor opaco: watermark y último id entregado con esa marca en cada lista"""
+    datos = {"t": marca.isoformat(), **{lista: ultimo for lista, ultimo in ultimos.items() if ultimo is not None}}
+    return base64.urlsafe_b64encode(json.dumps(datos, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def leer_cursor(cursor: str) -> Tuple[datetime, Dict[str, int]]:
+    """Inverso de codificar_cursor. ValueError si el cursor no es válido."""
+    try:
+        datos = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        marca = datetime.fromisoformat(datos.pop("t"))
+        ultimos = {lista: int(datos[lista]) for lista in LISTAS if datos.get(lista) is not None}
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        raise ValueError("Cursor de sincronización inválido") from e
+    return marca, ultimos
+
+
+def _despues_de(modelo: Any, columna: str, desde: datetime, ultimo_id: Optional[int]):
+    """(marca, id) > (desde, ultimo_id); sin id, todo lo de la marca en adelante"""
+    marca = getattr(modelo, columna)
+    if ultimo_id is None:
+        return marca >= desde
+    return or_(marca > desde, and_(marca == desde, modelo.id > ultimo_id))
+
+
+def _paginar(filas: List[Any], limite: int, columna: str):
+    """Corta en `limite` filas; si sobraban devuelve la marca de tiempo de la última entregada"""
+    if len(filas) <= limite:
+        return filas, None
+    filas = filas[:limite]
+    return filas, _utc(getattr(filas[-1], columna))
+
+
+def _ultimo_id(filas: List[Any], columna: str, marca: datetime, previo: Optional[int]) -> Optional[int]:
+    """Mayor id entregado con la marca `marca` (las filas van ordenadas por marca e id)"""
+    ids = [fila.id for fila in filas if _utc(getattr(fila, columna)) == marca]
+    if previo is not None:
+        ids.append(previo)
+    return max(ids, default=None)
+
+
+def obtener_cambios(
+    db: Session,
+    vehiculo: VehiculoOperacion,
+    desde: Optional[datetime],
+    ultimos: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
+    """
+    Cambios del vehículo desde `desde` (o snapshot completo sin watermark o si es
+    más antiguo que la retención de tombstones). `ultimos` (del cursor) son los ids
+    ya entregados con marca igual a `desde` en cada lista.
+    """
+    ahora = datetime.now(timezone.utc)
+    limite = settings.sync_limite
+    desde = _utc(desde)
+    completo = desde is None or desde < ahora - timedelta(days=settings.sync_retencion_dias)
+    ultimos = {} if completo else dict(ultimos or {})
+
+    entregas_q = db.query(Entrega).filter(Entrega.vehiculo_operacion_id == vehiculo.id)
+    fotos_q = db.query(FotoEvidencia).join(Entrega, FotoEvidencia.entrega_id == Entrega.id).filter(
+        Entrega.vehiculo_operacion_id == vehiculo.id
+    )
+    if not completo:
+        entregas_q = entregas_q.filter(_despues_de(Entrega, "updated_at", desde, ultimos.get("e")))
+        fotos_q = fotos_q.filter(_despues_de(FotoEvidencia, "uploaded_at", desde, ultimos.get("f")))
+
+    entregas, corte_entregas = _paginar(
+        entregas_q.order_by(Entrega.updated_at, Entrega.id).limit(limite + 1).all(), limite, "updated_at"
+    )
+    fotos, corte_fotos = _paginar(
+        fotos_q.order_by(FotoEvidencia.uploaded_at, FotoEvidencia.id).limit(limite + 1).all(), limite, "uploaded_at"
+    )
+
+    eliminados, corte_eliminados = [], None
+    if not completo:
+        eliminados, corte_eliminados = _paginar(
+            db.query(EliminacionSync).filter(
+                EliminacionSync.vehiculo_operacion_id == vehiculo.id,
+                _despues_de(EliminacionSync, "eliminado_en", desde, ultimos.get("x"))
+            ).order_by(EliminacionSync.eliminado_en, EliminacionSync.id).limit(limite + 1).all(),
+            limite,
+            "eliminado_en"
+        )
+
+    cortes = [corte for corte in (corte_entregas, corte_fotos, corte_eliminados) if corte is not None]
+    watermark = min([ahora - timedelta(seconds=settings.sync_margen_segundos)] + cortes)
+    if desde is not None and watermark < desde:
+        watermark = desde
+
+    # Los ids del cursor anterior siguen valiendo si la marca no avanzó
+    mismo = watermark == desde
+    siguientes = {
+        lista: _ultimo_id(filas, LISTAS[lista], watermark, ultimos.get(lista) if mismo else None)
+        for lista, filas in (("e", entregas), ("f", fotos), ("x", eliminados))
+    }
+
+    incluir_vehiculo = completo or _utc(vehiculo.updated_at) is None or _utc(vehiculo.updated_at) >= desde
+    return {
+        "watermark": watermark,
+        "cursor": codificar_cursor(watermark, siguientes),
+        "completo": completo,
+        "hay_mas": bool(cortes),
+        "vehiculo": vehiculo if incluir_vehiculo else None,
+        "entregas": entregas,
+        "fotos": fotos,
+        "eliminados": [{"tabla": e.tabla, "id": e.registro_id} for e in eliminados],
+    }
+
+
+def aplicar_cambios(db: Session, cambios: List[CambioEntregaSync], usuario_id: int) -> Dict[str, Any]:
+    """
+    Aplica en una transacción los cambios offline. Un cambio cuya versión (updated_at)
+    es anterior a la del servidor se rechaza como conflicto y se devuelve la versión actual.
+    """
+    ids = list(dict.fromkeys(cambio.entrega_id for cambio in cambios))
+    entregas = {
+        entrega.id: entrega
+        for entrega in db.query(Entrega).options(joinedload(Entrega.vehiculo)).filter(Entrega.id.in_(ids))
+    }
+
+    resultados = []
+    modificadas = {}
+    for cambio in cambios:
+        entrega = entregas.get(cambio.entrega_id)
+        if entrega is None:
+            resultados.append({"entrega_id": cambio.entrega_id, "resultado": "no_encontrada"})
+            continue
+        if cambio.updated_at and entrega.updated_at and _utc(entrega.updated_at) > _utc(cambio.updated_at):
+            resultados.append({"entrega_id": cambio.entrega_id, "resultado": "conflicto"})
+            continue
+
+        update_data = cambio.model_dump(exclude_unset=True, include={"estado", "observacion"})
+        aplicar_reglas_estado(update_data, entrega.estado, usuario_id)
+        for campo, valor in update_data.items():
+            setattr(entrega, campo, valor)
+        if update_data:
+            modificadas[entrega.id] = entrega
+        resultados.append({"entrega_id": cambio.entrega_id, "resultado": "aplicado"})
+
+    publicar_eventos_entregas(
+        db,
+        "entrega_actualizada",
+        [(entrega, entrega.vehiculo.operacion_id) for entrega in modificadas.values()]
+    )
+    db.commit()
+    if modificadas:
+        invalidar_kpis()
+
+    # Una sola consulta para devolver la versión actual (updated_at nuevo) de todas
+    actuales = {entrega.id: entrega for entrega in db.query(Entrega).filter(Entrega.id.in_(ids))}
+    for resultado in resultados:
+        resultado["entrega"] = actuales.get(resultado["entrega_id"])
+
+    return {
+        "aplicados": sum(1 for r in resultados if r["resultado"] == "aplicado"),
+        "conflictos": sum(1 for r in resultados if r["resultado"] == "conflicto"),
+        "resultados": resultados,
+    }
@@ -0,0 +1,166 @@
+"""
+Tendencias de cumplimiento por periodo (GET /api/dashboard/tendencias)
+✅ PostgreSQL: una sola consulta con date_trunc + generate_series (periodos sin entregas en 0)
+✅ Zona horaria America/Bogota (igual que obtener_kpis)
+✅ dia / semana: por fecha_operacion; hora: por hora de cierre (fecha_cumplido), solo entregas cerradas
+✅ Otras bases (SQLite en pruebas): agregación y relleno de huecos en Python
+"""
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List
+
+import pytz
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.models.entrega import Entrega
+
+ZONA_HORARIA = "America/Bogota"
+ZONA = pytz.timezone(ZONA_HORARIA)
+
+GRANULARIDADES = {
+    # unidad de date_trunc, paso de generate_series, rango máximo en días
+    "hora": ("hour", "1 hour", 31),
+    "dia": ("day", "1 day", 366),
+    "semana": ("week", "1 week", 731),
+}
+
+_SQL_POR_FECHA_OPERACION = """
+WITH serie AS (
+    SELECT generate_series(
+        date_trunc(:unidad, CAST(:inicio AS timestamp)),
+        date_trunc(:unidad, CAST(:fin AS timestamp)),
+        CAST(:paso AS interval)
+    ) AS periodo
+),
+conteos AS (
+    SELECT date_trunc(:unidad, CAST(fecha_operacion AS timestamp)) AS periodo,
+           count(*) FILTER (WHERE estado = 'pendiente' OR estado IS NULL) AS pendientes,
+           count(*) FILTER (WHERE estado = 'cumplido') AS cumplidas,
+           count(*) FILTER (WHERE estado = 'no_cumplido') AS no_cumplidas
+    FROM entregas
+    WHERE fecha_operacion BETWEEN :inicio AND :fin
+    GROUP BY 1
+)
+SELECT serie.periodo,
+       COALESCE(conteos.pendientes, 0),
+       COALESCE(conteos.cumplidas, 0),
+       COALESCE(conteos.no_cumplidas, 0)
+FROM serie
+LEFT JOIN conteos ON conteos.periodo = serie.periodo
+ORDER BY serie.periodo
+"""
+
+_SQL_POR_HORA_CIERRE = """
+WITH serie AS (
+    SELECT generate_series(
+        CAST(:inicio AS timestamp),
+        CAST(:fin AS timestamp) + interval '23 hours',
+        interval '1 hour'
+    ) AS periodo
+),
+conteos AS (
+    SELECT date_trunc('hour', fecha_cumplido AT TIME ZONE :zona) AS periodo,
+           0 AS pendientes,
+           count(*) FILTER (WHERE estado = 'cumplido') AS cumplidas,
+           count(*) FILTER (WHERE estado = 'no_cumplido') AS no_cumplidas
+    FROM entregas
+    WHERE estado IN ('cumplido', 'no_cumplido')
+      AND fecha_cumplido >= (CAST(:inicio AS timestamp) AT TIME ZONE :zona)
+      AND fecha_cumplido < ((CAST(:fin AS timestamp) + interval '1 day') AT TIME ZONE :zona)
+    GROUP BY 1
+)
+SELECT serie.periodo,
+       COALESCE(conteos.pendientes, 0),
+       COALESCE(conteos.cumplidas, 0),
+       COALESCE(conteos.no_cumplidas, 0)
+FROM serie
+LEFT JOIN conteos ON conteos.periodo = serie.periodo
+ORDER BY serie.periodo
+"""
+
+
+def inicio_periodo(momento: datetime, granularidad: str) -> datetime:
+    """Equivalente a date_trunc (semanas ISO: empiezan el lunes)"""
+    if granularidad == "hora":
+        return momento.replace(minute=0, second=0, microsecond=0)
+    inicio = datetime.combine(momento.date(), time())
+    if granularidad == "semana":
+        inicio -= timedelta(days=inicio.weekday())
+    return inicio
+
+
+def _serie(inicio: date, fin: date, granularidad: str) -> List[datetime]:
+    if granularidad == "hora":
+        actual, ultimo, paso = datetime.combine(inicio, time()), datetime.combine(fin, time(23)), timedelta(hours=1)
+    else:
+        actual = inicio_periodo(datetime.combine(inicio, time()), granularidad)
+        ultimo = inicio_periodo(datetime.combine(fin, time()), granularidad)
+        paso = timedelta(weeks=1) if granularidad == "semana" else timedelta(days=1)
+    periodos = []
+    while actual <= ultimo:
+        periodos.append(actual)
+        actual += paso
+    return periodos
+
+
+def _conteos_python(db: Session, inicio: date, fin: date, granularidad: str) -> Dict[datetime, Counter]:
+    conteos: Dict[datetime, Counter] = {}
+    if granularidad == "hora":
+        filas = db.query(Entrega.fecha_cumplido, Entrega.estado).filter(
+            Entrega.estado.in_(("cumplido", "no_cumplido")),
+            # Margen de un día a cada lado por la diferencia de zona horaria
+            Entrega.fecha_cumplido >= datetime.combine(inicio - timedelta(days=1), time()),
+            Entrega.fecha_cumplido < datetime.combine(fin + timedelta(days=2), time())
+        ).all()
+        for fecha_cumplido, estado in filas:
+            # Sin zona (SQLite) la fecha se guardó con la hora de Colombia
+            local = fecha_cumplido.astimezone(ZONA).replace(tzinfo=None) if fecha_cumplido.tzinfo else fecha_cumplido
+            if inicio <= local.date() <= fin:
+                conteos.setdefault(inicio_periodo(local, granularidad), Counter())[estado] += 1
+        return conteos
+
+    filas = db.query(Entrega.fecha_operacion, Entrega.estado, func.count(Entrega.id)).filter(
+        Entrega.fecha_operacion.between(inicio, fin)
+    ).group_by(Entrega.fecha_operacion, Entrega.estado).all()
+    for fecha_operacion, estado, cantidad in filas:
+        periodo = inicio_periodo(datetime.combine(fecha_operacion, time()), granularidad)
+        conteos.setdefault(periodo, Counter())[estado or "pendiente"] += cantidad
+    return conteos
+
+
+def _punto(periodo: datetime, pendientes: int, cumplidas: int, no_cumplidas: int) -> Dict:
+    total = pendientes + cumplidas + no_cumplidas
+    return {
+        "periodo": ZONA.localize(periodo),
+        "total": total,
+        "pendientes": pendientes,
+        "cumplidas": cumplidas,
+        "no_cumplidas": no_cumplidas,
+        "porcentaje_cumplimiento": round(cumplidas / total * 100, 2) if total else 0.0,
+    }
+
+
+def calcular_tendencias(db: Session, inicio: date, fin: date, granularidad: str = "dia") -> List[Dict]:
+    """
+    Conteos por estado y porcentaje de cumplimiento (cumplidas / total) por periodo,
+    incluyendo los periodos sin entregas. Los periodos son horas locales de Colombia.
+    """
+    unidad, paso, _ = GRANULARIDADES[granularidad]
+
+    if db.get_bind().dialect.name == "postgresql":
+        if granularidad == "hora":
+            filas = db.execute(text(_SQL_POR_HORA_CIERRE), {"inicio": inicio, "fin": fin, "zona": ZONA_HORARIA})
+        else:
+            filas = db.execute(
+                text(_SQL_POR_FECHA_OPERACION),
+                {"unidad": unidad, "paso": paso, "inicio": inicio, "fin": fin}
+            )
+        return [_punto(periodo, pendientes, cumplidas, no_cumplidas) for periodo, pendientes, cumplidas, no_cumplidas in filas]
+
+    conteos = _conteos_python(db, inicio, fin, granularidad)
+    puntos = []
+    for periodo in _serie(inicio, fin, granularidad):
+        conteo = conteos.get(periodo, Counter())
+        puntos.append(_punto(periodo, conteo["pendiente"], conteo["cumplido"], conteo["no_cumplido"]))
+    return puntos
@@ -0,0 +1,195 @@
+"""
+Inicialización de la aplicación (lifespan de FastAPI)
+✅ Importar main.py no toca la base de datos ni el disco: todo ocurre al arrancar
+✅ Fases explícitas con tiempos: config, base de datos, esquema, almacenamiento, particiones, servicios
+✅ Las tablas faltantes se crean al arrancar (como antes); DB_CREATE_SCHEMA=false solo las reporta
+"""
+import logging
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Dict, Iterator
+
+from fastapi import FastAPI
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from app.config import Settings, get_settings
+from app.utils.log_sanitizer import install_log_sanitizer
+
+logger = logging.getLogger(__name__)
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Momento de inicio del proceso (primer import de este módulo), para medir cold start
+PROCESS_START = time.perf_counter()
+
+
+# Loggers del servidor con handlers propios y propagate=False: el filtro del root no los cubre.
+# Los de uvicorn usan formatters que leen record.args (se sanitizan sin formatear el mensaje).
+LOGGERS_SERVIDOR = {
+    "gunicorn.error": False,
+    "gunicorn.access": False,
+    "uvicorn": True,  # uvicorn.error propaga a este (LOGGING_CONFIG de uvicorn)
+    "uvicorn.error": True,
+    "uvicorn.access": True,
+}
+
+
+def configurar_logging(level: int = logging.INFO) -> None:
+    """Configura el logging del proceso una sola vez (idempotente)"""
+    root = logging.getLogger()
+    if not root.handlers:
+        logging.basicConfig(level=level, format=LOG_FORMAT)
+    install_log_sanitizer(root)
+    # Bajo gunicorn los loggers de uvicorn comparten los handlers de gunicorn (ya filtrados)
+    for nombre, conservar_args in LOGGERS_SERVIDOR.items():
+        install_log_sanitizer(logging.getLogger(nombre), conservar_args=conservar_args)
+
+
+def esperar_base_datos(engine: Engine, max_wait: float, espera_inicial: float = 0.5, espera_max: float = 5) -> int:
+    """
+    Espera a que la base de datos acepte conexiones (SELECT 1) con backoff exponencial
+
+    Returns:
+        Número de intentos realizados
+
+    Raises:
+        RuntimeError: Si no responde dentro de max_wait segundos
+    """
+    limite = time.monotonic() + max_wait
+    espera = espera_inicial
+    intentos = 0
+    while True:
+        intentos += 1
+        try:
+            with engine.connect() as conexion:
+                conexion.execute(text("SELECT 1"))
+            return intentos
+        except Exception as e:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                raise RuntimeError(
+                    f"La base de datos no respondió en {max_wait:.0f}s ({intentos} intentos): {str(e)}"
+                ) from e
+            logger.warning(f"⏳ Base de datos no disponible (intento {intentos}): {str(e)}. Reintentando en {espera:.1f}s")
+            time.sleep(min(espera, restante))
+            espera = min(espera * 2, espera_max)
+
+
+def verificar_esquema(engine: Engine, crear: bool = True) -> None:
+    """
+    Compara las tablas de los modelos con las existentes en la base de datos.
+    Con crear=True (DB_CREATE_SCHEMA, por defecto) crea las faltantes con create_all,
+    que nunca modifica tablas existentes. Con crear=False solo las reporta
+    (instalaciones que aplican database/ y migrations/ a mano).
+    """
+    from app.database import Base
+    import app.models  # noqa: F401 - registra todos los modelos en Base.metadata
+
+    existentes = set(inspect(engine).get_table_names())
+    faltantes = sorted(set(Base.metadata.tables) - existentes)
+    if not faltantes:
+        return
+    if crear:
+        logger.warning(f"🛠️  Creando tablas faltantes: {', '.join(faltantes)}")
+        try:
+            Base.metadata.create_all(bind=engine)
+        except Exception as e:
+            # Varios workers arrancando a la vez: otro pudo crearlas primero
+            faltantes = sorted(set(Base.metadata.tables) - set(inspect(engine).get_table_names()))
+            if faltantes:
+                raise RuntimeError(f"No se pudieron crear las tablas {', '.join(faltantes)}: {str(e)}") from e
+        return
+    logger.error(
+        f"❌ Faltan tablas en la base de datos: {', '.join(faltantes)}. "
+        f"Aplique las migraciones de backend/migrations o arranque con DB_CREATE_SCHEMA=true"
+    )
+
+
+def verificar_almacenamiento(settings: Settings) -> Path:
+    """Asegura que el directorio de uploads exista y sea escribible"""
+    upload_dir = Path(settings.upload_dir).resolve()
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    if not os.access(upload_dir, os.W_OK):
+        raise RuntimeError(f"El directorio de uploads no es escribible: {upload_dir}")
+    logger.info(f"📁 Upload directory: {upload_dir}")
+    return upload_dir
+
+
+@contextmanager
+def _fase(nombre: str, tiempos: Dict[str, float]) -> Iterator[None]:
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        tiempos[nombre] = round((time.perf_counter() - inicio) * 1000, 1)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Arranque por fases y apagado ordenado de los servicios en segundo plano"""
+    from app.database import engine
+    from app.middleware import log_startup_info
+    from app.services.jobs import JobRunner
+    from app.services.particiones import asegurar_particiones
+    from app.services.revocacion import lista_revocacion
+    from app.services.cache import cache_maestros
+    from app.middleware.worker_stats import worker_stats, remove_worker_stats
+
+    inicio = time.perf_counter()
+    tiempos: Dict[str, float] = {}
+
+    with _fase("config", tiempos):
+        configurar_logging()
+        log_startup_info()
+        settings = get_settings()
+
+    with _fase("database", tiempos):
+        intentos = esperar_base_datos(engine, settings.startup_db_max_wait)
+
+    with _fase("schema", tiempos):
+        verificar_esquema(engine, crear=settings.db_create_schema)
+
+    with _fase("storage", tiempos):
+        verificar_almacenamiento(settings)
+
+    with _fase("partitions", tiempos):
+        try:
+            asegurar_particiones(engine, settings.particiones_meses_adelante)
+        except Exception as e:
+            # Sin particiones nuevas las filas van a la partición DEFAULT: no impide arrancar
+            logger.error(f"❌ No se pudieron crear particiones futuras: {str(e)}")
+
+    with _fase("services", tiempos):
+        job_runner = JobRunner(
+            workers=settings.jobs_workers,
+            poll_interval=settings.jobs_poll_interval,
+            lock_timeout=settings.jobs_lock_timeout
+        )
+        if settings.jobs_enabled:
+            job_runner.start()
+        lista_revocacion.start()  # Carga los tokens revocados y los refresca en segundo plano
+        cache_maestros.iniciar()  # Invalidaciones de caché de los demás workers (LISTEN)
+        worker_stats.flush(force=True)  # el worker aparece en /api/sistema/workers desde el inicio
+
+    total_ms = round((time.perf_counter() - inicio) * 1000, 1)
+    cold_start_ms = round((time.perf_counter() - PROCESS_START) * 1000, 1)
+    app.state.startup = {
+        "phases_ms": tiempos,
+        "lifespan_ms": total_ms,
+        "cold_start_ms": cold_start_ms,
+        "db_attempts": intentos,
+    }
+    fases = ", ".join(f"{nombre} {ms}ms" for nombre, ms in tiempos.items())
+    logger.info(f"✅ Inicio completado en {total_ms}ms ({fases}); cold start {cold_start_ms}ms")
+
+    try:
+        yield
+    finally:
+        job_runner.stop()
+        lista_revocacion.stop()
+        cache_maestros.detener()
+        remove_worker_stats(os.getpid())
+        logger.info("👋 Aplicación detenida")
@@ -0,0 +1,15 @@
+"""
+Normalización de números de factura para búsqueda exacta y detección de duplicados
+✅ "fac-00123", "FAC 00123" y "FAC.00123" se normalizan igual: "FAC00123"
+✅ Misma regla que la función SQL normalizar_factura() (migrations/018_factura_normalizada_ascii.sql)
+✅ Solo A-Z y 0-9: con letras no ASCII (ß, ñ, tildes) upper() y [:alnum:] dependen del
+   idioma en Python y del locale en PostgreSQL, y los dos lados no coincidirían
+"""
+import re
+
+_NO_ALFANUMERICO = re.compile(r"[^A-Za-z0-9]")
+
+
+def normalizar_factura(numero: str) -> str:
+    """Mayúsculas y solo letras ASCII y dígitos"""
+    return _NO_ALFANUMERICO.sub("", numero or "").upper()
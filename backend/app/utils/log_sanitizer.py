@@ -1,8 +1,12 @@
 """
 ✅ SEGURIDAD: Utilidades para sanitizar datos sensibles en logs
+✅ Cada patrón solo se aplica si su pista literal aparece en el texto; clasificación de claves cacheada
+✅ SensitiveDataFilter: filtro de logging que sanitiza solo los registros que se emiten
 """
+import logging
 import re
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Any, Dict, Optional
 
 
 # Campos que contienen información sensible
@@ -34,8 +38,50 @@ SENSITIVE_PATTERNS = [
     (re.compile(r'\beyJ[A-Za-z0-9_-]+\.eyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\b'), 'jwt_token'),
 ]
 
+DEFAULT_MASK = "***REDACTED***"
+
+# Pista barata (búsqueda de substring en C) de cada patrón: si no aparece en el texto, el
+# patrón no puede coincidir y su pasada se omite. Las pasadas se aplican en el orden de
+# SENSITIVE_PATTERNS sobre el resultado de la anterior, así que la salida es la misma que
+# aplicar todos los patrones. _fold cubre las equivalencias de re.IGNORECASE (ej. 'ſ', 'ı').
+_CARD_HINT_RE = re.compile(r'\d{4}[- ]?\d{4}')
+_TEXT_HINTS = {
+    'password': 'password',
+    'token': 'token',
+    'secret': 'secret',
+    'api_key': 'api',
+    'jwt_token': 'eyj',
+}
+
+# Un campo es sensible si su nombre contiene alguno de SENSITIVE_FIELDS
+_SENSITIVE_KEY_RE = re.compile("|".join(
+    re.escape(field) for field in sorted(SENSITIVE_FIELDS, key=len, reverse=True)
+))
+
+
+@lru_cache(maxsize=4096)
+def is_sensitive_key(key: str) -> bool:
+    """Indica si un nombre de campo es sensible (resultado cacheado por clave)"""
+    return _SENSITIVE_KEY_RE.search(key.lower()) is not None
+
+
+def _fold(text: str) -> str:
+    # casefold() no lleva la 'ı' sin punto a 'i', pero re.IGNORECASE sí las iguala
+    return text.casefold().replace('ı', 'i')
+
+
+def _may_match(field_type: str, folded: str, text: str) -> bool:
+    if field_type == 'credit_card':
+        return _CARD_HINT_RE.search(text) is not None
+    return _TEXT_HINTS[field_type] in folded
+
+
+@lru_cache(maxsize=16)
+def _replacements(mask: str) -> Dict[str, str]:
+    return {field_type: f"{field_type}={mask}" for _, field_type in SENSITIVE_PATTERNS}
+
 
-def sanitize_dict(data: Dict[str, Any], mask: str = "***REDACTED***") -> Dict[str, Any]:
+def sanitize_dict(data: Dict[str, Any], mask: str = DEFAULT_MASK) -> Dict[str, Any]:
     """
     Sanitiza un diccionario reemplazando valores sensibles
 
@@ -51,10 +97,8 @@ def sanitize_dict(data: Dict[str, Any], mask: str = "***REDACTED***") -> Dict[st
 
     sanitized = {}
     for key, value in data.items():
-        key_lower = key.lower()
-
         # Verificar si el campo es sensible
-        if any(sensitive in key_lower for sensitive in SENSITIVE_FIELDS):
+        if isinstance(key, str) and is_sensitive_key(key):
             sanitized[key] = mask
         # Recursión para diccionarios anidados
         elif isinstance(value, dict):
@@ -71,7 +115,7 @@ def sanitize_dict(data: Dict[str, Any], mask: str = "***REDACTED***") -> Dict[st
     return sanitized
 
 
-def sanitize_string(text: str, mask: str = "***REDACTED***") -> str:
+def sanitize_string(text: str, mask: str = DEFAULT_MASK) -> str:
     """
     Sanitiza un string buscando patrones de información sensible
 
@@ -86,8 +130,12 @@ def sanitize_string(text: str, mask: str = "***REDACTED***") -> str:
         return text
 
     sanitized = text
+    folded = _fold(text)
+    replacements = _replacements(mask)
     for pattern, field_type in SENSITIVE_PATTERNS:
-        sanitized = pattern.sub(f'{field_type}={mask}', sanitized)
+        if _may_match(field_type, folded, sanitized):
+            sanitized = pattern.sub(replacements[field_type], sanitized)
+            folded = _fold(sanitized)
 
     return sanitized
 
@@ -112,6 +160,83 @@ def sanitize_log_message(message: Any) -> Any:
         return message
 
 
+class SensitiveDataFilter(logging.Filter):
+    """
+    Filtro de logging que sanitiza el mensaje final de cada registro
+
+    Se instala en los handlers (ver install_log_sanitizer): los registros descartados por
+    nivel nunca llegan al filtro, así que solo se paga el costo por lo que se emite.
+    El mensaje se formatea una sola vez: el resultado queda en record.msg sin args.
+    Con conservar_args=True se sanitizan msg y cada argumento por separado y se mantienen los
+    args (el AccessFormatter de uvicorn los desempaqueta: client_addr, method, full_path, ...).
+    """
+
+    def __init__(self, mask: str = DEFAULT_MASK, conservar_args: bool = False):
+        super().__init__()
+        self.mask = mask
+        self.conservar_args = conservar_args
+
+    def _sanitizar_arg(self, arg: Any) -> Any:
+        if isinstance(arg, dict):
+            return sanitize_dict(arg, self.mask)
+        if isinstance(arg, str):
+            return sanitize_string(arg, self.mask)
+        return arg
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "_sanitized", False):
+            return True
+        if self.conservar_args:
+            if isinstance(record.msg, str):
+                record.msg = sanitize_string(record.msg, self.mask)
+            if isinstance(record.args, tuple):
+                record.args = tuple(self._sanitizar_arg(arg) for arg in record.args)
+            elif isinstance(record.args, dict):
+                record.args = {clave: self._sanitizar_arg(valor) for clave, valor in sanitize_dict(record.args, self.mask).items()}
+            record._sanitized = True
+            return True
+        args = record.args
+        if args:
+            if isinstance(args, dict):
+                args = sanitize_dict(args, self.mask)
+            else:
+                args = tuple(sanitize_dict(arg, self.mask) if isinstance(arg, dict) else arg for arg in args)
+            record.args = args
+        try:
+            message = record.getMessage()
+        except Exception:
+            # Dejar que el handler reporte el error de formato como siempre
+            return True
+        record.msg = sanitize_string(message, self.mask)
+        record.args = None
+        record._sanitized = True
+        return True
+
+
+def install_log_sanitizer(
+    logger: Optional[logging.Logger] = None,
+    mask: str = DEFAULT_MASK,
+    conservar_args: bool = False
+) -> SensitiveDataFilter:
+    """
+    Instala SensitiveDataFilter en los handlers del logger (por defecto el root)
+
+    Los filtros de un logger no se aplican a los registros que se propagan desde loggers
+    hijos; los de sus handlers sí, por eso el filtro se agrega a cada handler.
+    Llamar después de configurar los handlers (basicConfig / dictConfig). Es idempotente:
+    si algún handler ya tiene el filtro, se reutiliza ese.
+    """
+    logger = logger or logging.getLogger()
+    log_filter = next(
+        (f for h in logger.handlers for f in h.filters if isinstance(f, SensitiveDataFilter)),
+        None
+    ) or SensitiveDataFilter(mask, conservar_args)
+    for handler in logger.handlers:
+        if log_filter not in handler.filters:
+            handler.addFilter(log_filter)
+    return log_filter
+
+
 def safe_log_user_data(user_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Prepara datos de usuario para logging seguro
@@ -0,0 +1,262 @@
+"""
+✅ RENDIMIENTO: Servido eficiente de /uploads (fotos de evidencia)
+✅ Cache-Control inmutable para nombres direccionados por contenido
+✅ Soporte de Range (206 / 416) y peticiones condicionales (304)
+✅ Delegación opcional del cuerpo al proxy (X-Accel-Redirect / X-Sendfile)
+✅ Respaldo opcional para archivos que ya no están en disco (fotos archivadas en zips)
+"""
+import mimetypes
+import os
+import re
+import zipfile
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+from starlette.staticfiles import NotModifiedResponse
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response, StreamingResponse
+from starlette.types import Scope
+
+# Longitud (hex) del digest sha256 que se incluye en el nombre de las fotos
+CONTENT_HASH_LENGTH = 20
+
+# Un nombre es "direccionado por contenido" si termina en _<digest>.<ext>
+CONTENT_ADDRESSED_RE = re.compile(rf"_[0-9a-f]{{{CONTENT_HASH_LENGTH},64}}\.[A-Za-z0-9]+$")
+
+# Tamaño de bloque al leer rangos del disco
+CHUNK_SIZE = 64 * 1024
+
+OFFLOAD_HEADERS = ("X-Accel-Redirect", "X-Sendfile")
+
+# nombre -> (zip, nombre dentro del zip), o None si no hay respaldo para ese archivo
+ZipFallback = Callable[[str], Optional[Tuple[Path, str]]]
+
+
+def is_content_addressed(filename: str) -> bool:
+    """Indica si el nombre del archivo contiene el hash de su contenido"""
+    return bool(CONTENT_ADDRESSED_RE.search(filename))
+
+
+def parse_range_header(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta un header Range de un solo rango en bytes
+
+    Args:
+        range_header: Valor del header (ej: "bytes=0-1023", "bytes=-500")
+        file_size: Tamaño total del archivo
+
+    Returns:
+        Tuple (inicio, fin) inclusivo, o None si el rango no es satisfacible
+
+    Raises:
+        ValueError: Si el header no tiene un formato soportado (se ignora)
+    """
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        # Múltiples rangos (multipart/byteranges) no soportados: servir completo
+        raise ValueError("Range no soportado")
+
+    start_str, sep, end_str = ranges.strip().partition("-")
+    if not sep:
+        raise ValueError("Range mal formado")
+
+    if start_str == "":
+        # Sufijo: los últimos N bytes
+        if not end_str.isdigit():
+            raise ValueError("Range mal formado")
+        length = int(end_str)
+        if length == 0 or file_size == 0:
+            return None
+        return max(0, file_size - length), file_size - 1
+
+    if not start_str.isdigit() or (end_str and not end_str.isdigit()):
+        raise ValueError("Range mal formado")
+
+    start = int(start_str)
+    end = int(end_str) if end_str else file_size - 1
+    if start >= file_size or start > end:
+        return None
+    return start, min(end, file_size - 1)
+
+
+class UploadsStaticFiles(StaticFiles):
+    """
+    StaticFiles para el directorio de uploads
+
+    Args:
+        immutable_max_age: max-age (segundos) para nombres direccionados por contenido
+        default_max_age: max-age (segundos) para el resto de archivos
+        offload_header: "X-Accel-Redirect" (nginx), "X-Sendfile" (IIS/Apache) o "" para servir desde Python
+        offload_prefix: Prefijo interno del proxy (solo para X-Accel-Redirect)
+        fallback: Si el archivo no existe, busca en qué zip está (se sirve desde el zip, sin Range)
+    """
+
+    def __init__(
+        self,
+        *args,
+        immutable_max_age: int = 31536000,
+        default_max_age: int = 3600,
+        offload_header: str = "",
+        offload_prefix: str = "/protected-uploads",
+        fallback: Optional[ZipFallback] = None,
+        **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        if offload_header and offload_header not in OFFLOAD_HEADERS:
+            raise ValueError(f"offload_header debe ser uno de {OFFLOAD_HEADERS}")
+        self.immutable_max_age = immutable_max_age
+        self.default_max_age = default_max_age
+        self.offload_header = offload_header
+        self.offload_prefix = offload_prefix.rstrip("/")
+        self.fallback = fallback
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as exc:
+            nombre = os.path.basename(path)
+            if exc.status_code != 404 or self.fallback is None or nombre != path:
+                raise
+            respuesta = await anyio.to_thread.run_sync(self.zip_response, nombre, scope)
+            if respuesta is None:
+                raise
+            return respuesta
+
+    def zip_response(self, nombre: str, scope: Scope) -> Optional[Response]:
+        """Respuesta con el archivo leído del zip que indica el respaldo (None si no está)"""
+        encontrado = self.fallback(nombre)
+        if encontrado is None:
+            return None
+        paquete, miembro = encontrado
+        try:
+            with zipfile.ZipFile(paquete) as zf:
+                info = zf.getinfo(miembro)
+        except (OSError, KeyError, zipfile.BadZipFile):
+            return None
+
+        headers = {
+            "Content-Type": mimetypes.guess_type(nombre)[0] or "application/octet-stream",
+            "Content-Length": str(info.file_size),
+            "Cache-Control": self.cache_control(nombre),
+            "ETag": f'"{info.CRC:08x}-{info.file_size}"',
+            "Accept-Ranges": "none",
+        }
+        if self.is_not_modified(Headers(headers), Headers(scope=scope)):
+            return NotModifiedResponse(Headers(headers))
+        if scope["method"] == "HEAD":
+            return Response(status_code=200, headers=headers)
+        return StreamingResponse(_iter_zip_member(paquete, miembro), headers=headers)
+
+    def cache_control(self, filename: str) -> str:
+        if is_content_addressed(filename):
+            return f"public, max-age={self.immutable_max_age}, immutable"
+        return f"public, max-age={self.default_max_age}"
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        method = scope["method"]
+        request_headers = Headers(scope=scope)
+        filename = os.path.basename(full_path)
+
+        response = FileResponse(
+            full_path, status_code=status_code, stat_result=stat_result, method=method
+        )
+        response.headers["Cache-Control"] = self.cache_control(filename)
+        response.headers["Accept-Ranges"] = "bytes"
+
+        # ✅ 304 si el cliente ya tiene la versión actual (If-None-Match / If-Modified-Since)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        # ✅ Delegar el envío de bytes al proxy: el worker solo responde headers
+        if self.offload_header:
+            return self.offload_response(full_path, response.headers)
+
+        range_header = request_headers.get("range")
+        if range_header and status_code == 200 and self.if_range_matches(response.headers, request_headers):
+            return self.range_response(full_path, stat_result, response, range_header, method)
+
+        return response
+
+    def if_range_matches(self, response_headers: Headers, request_headers: Headers) -> bool:
+        """If-Range: solo se respeta el Range si el validador coincide"""
+        if_range = request_headers.get("if-range")
+        if not if_range:
+            return True
+        return if_range in (response_headers.get("etag"), response_headers.get("last-modified"))
+
+    def offload_response(self, full_path, response_headers) -> Response:
+        headers = {
+            key: value for key, value in response_headers.items()
+            if key.lower() in ("cache-control", "etag", "last-modified", "content-type", "accept-ranges")
+        }
+        if self.offload_header == "X-Accel-Redirect":
+            relative = os.path.relpath(full_path, os.path.realpath(str(self.directory)))
+            headers["X-Accel-Redirect"] = f"{self.offload_prefix}/{quote(relative.replace(os.sep, '/'))}"
+        else:
+            headers["X-Sendfile"] = str(full_path)
+        return Response(status_code=200, headers=headers)
+
+    def range_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        full_response: FileResponse,
+        range_header: str,
+        method: str,
+    ) -> Response:
+        file_size = stat_result.st_size
+        try:
+            byte_range = parse_range_header(range_header, file_size)
+        except ValueError:
+            # Range inválido o no soportado: se ignora y se sirve completo (RFC 9110)
+            return full_response
+
+        headers = {
+            key: value for key, value in full_response.headers.items()
+            if key.lower() not in ("content-length", "content-range")
+        }
+        if byte_range is None:
+            headers["Content-Range"] = f"bytes */{file_size}"
+            return Response(status_code=416, headers=headers)
+
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+        headers["Content-Length"] = str(end - start + 1)
+
+        if method == "HEAD":
+            return Response(status_code=206, headers=headers)
+        return StreamingResponse(
+            _iter_file_range(full_path, start, end),
+            status_code=206,
+            headers=headers,
+        )
+
+
+async def _iter_file_range(full_path, start: int, end: int):
+    """Lee el rango [start, end] del archivo en bloques sin bloquear el event loop"""
+    async with await anyio.open_file(full_path, mode="rb") as file:
+        await file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _iter_zip_member(paquete: Path, miembro: str) -> Iterator[bytes]:
+    """Lee un archivo del zip en bloques (iterador síncrono: Starlette lo consume en un hilo)"""
+    with zipfile.ZipFile(paquete) as zf, zf.open(miembro) as origen:
+        while chunk := origen.read(CHUNK_SIZE):
+            yield chunk
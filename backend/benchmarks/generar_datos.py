@@ -0,0 +1,348 @@
+"""
+Generador de datos sintéticos de gran volumen para benchmarks
+
+Genera años de OperacionDiaria, VehiculoOperacion, Entrega y FotoEvidencia con
+distribuciones realistas:
+  - Vehículos por día según día de la semana (domingos casi sin operación),
+    temporada alta en diciembre y ruido diario
+  - Entregas por vehículo con distribución log-normal
+  - Placas y clientes con sesgo Zipf (pocas placas/clientes concentran el volumen)
+  - Estados: histórico mayormente cumplido, el día de hoy con pendientes
+  - Fotos de evidencia para la mayoría de entregas cumplidas
+
+En PostgreSQL carga con COPY (decenas de millones de filas en minutos);
+en otros motores (SQLite) usa INSERT por lotes. La semilla hace la corrida determinista.
+
+Uso:
+    python benchmarks/generar_datos.py --anios 3 --seed 7
+    python benchmarks/generar_datos.py --desde 2023-01-01 --hasta 2025-12-31 \\
+        --vehiculos-por-dia 40 --entregas-por-vehiculo 20 --database-url postgresql://...
+"""
+import argparse
+import bisect
+import csv
+import heapq
+import io
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from pathlib import Path
+from typing import Dict, List, Sequence
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+COLOMBIA_TZ = ZoneInfo("America/Bogota")
+
+# Factor de vehículos por día de la semana (lunes=0 ... domingo=6)
+FACTOR_DIA_SEMANA = [1.0, 1.0, 1.0, 1.0, 1.05, 0.6, 0.1]
+
+MOTIVOS_NO_CUMPLIDO = [
+    "Cliente ausente",
+    "Dirección incorrecta",
+    "Mercancía rechazada",
+    "Establecimiento cerrado",
+    "Reprogramada por el cliente",
+]
+
+COLUMNAS = {
+    "operaciones_diarias": [
+        "id", "fecha_operacion", "cantidad_vehiculos_solicitados", "observacion",
+        "usuario_id", "created_at", "updated_at",
+    ],
+    "vehiculos_operacion": [
+        "id", "operacion_id", "placa", "hora_inicio", "observacion", "activo",
+        "created_at", "updated_at",
+    ],
+    "entregas": [
+        "id", "vehiculo_operacion_id", "numero_factura", "cliente", "observacion", "estado",
+        "fecha_operacion", "fecha_cumplido", "usuario_cumplido_id", "created_at", "updated_at",
+    ],
+    "fotos_evidencia": [
+        "id", "entrega_id", "ruta_archivo", "nombre_archivo", "tipo_mime", "tamano_bytes",
+        "uploaded_at",
+    ],
+}
+
+# Orden de carga respetando llaves foráneas
+ORDEN_TABLAS = ["operaciones_diarias", "vehiculos_operacion", "entregas", "fotos_evidencia"]
+
+
+def pesos_zipf(n: int, s: float) -> List[float]:
+    return [1.0 / (rank ** s) for rank in range(1, n + 1)]
+
+
+def generar_placas(rng: random.Random, n: int) -> List[str]:
+    letras = "ABCDEFGHJKLMNPRSTUVWXYZ"
+    placas = set()
+    while len(placas) < n:
+        placas.add("".join(rng.choice(letras) for _ in range(3)) + f"{rng.randint(0, 999):03d}")
+    return sorted(placas, key=lambda _: rng.random())
+
+
+class Generador:
+    """Produce las filas de cada día y las acumula por tabla"""
+
+    def __init__(self, args, ids_iniciales: Dict[str, int], usuario_ids: List[int]):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.hoy = datetime.now(COLOMBIA_TZ).date()
+        self.usuario_ids = usuario_ids or [None]
+
+        self.placas = generar_placas(self.rng, args.placas)
+        self.pesos_placas = pesos_zipf(len(self.placas), args.sesgo)
+        self.clientes = [f"Cliente {i:05d}" for i in range(1, args.clientes + 1)]
+        self.pesos_clientes = pesos_zipf(len(self.clientes), args.sesgo)
+        self.cum_pesos_clientes = list(_acumular(self.pesos_clientes))
+
+        self.next_id = dict(ids_iniciales)
+        self.buffers: Dict[str, List[tuple]] = {tabla: [] for tabla in ORDEN_TABLAS}
+        self.totales: Dict[str, int] = {tabla: 0 for tabla in ORDEN_TABLAS}
+
+        # log-normal con media = entregas_por_vehiculo
+        self.sigma_entregas = 0.5
+        self.mu_entregas = math.log(args.entregas_por_vehiculo) - self.sigma_entregas ** 2 / 2
+
+    def _id(self, tabla: str) -> int:
+        valor = self.next_id[tabla]
+        self.next_id[tabla] += 1
+        return valor
+
+    def _vehiculos_del_dia(self, fecha: date) -> int:
+        factor = FACTOR_DIA_SEMANA[fecha.weekday()]
+        if fecha.month == 12:
+            factor *= 1.25
+        esperado = self.args.vehiculos_por_dia * factor
+        return max(0, int(round(self.rng.gauss(esperado, esperado * 0.15))))
+
+    def _elegir_placas(self, k: int) -> List[str]:
+        """Muestreo ponderado sin reemplazo (Efraimidis-Spirakis)"""
+        k = min(k, len(self.placas))
+        rng = self.rng
+        indices = heapq.nlargest(
+            k, range(len(self.placas)),
+            key=lambda i: rng.random() ** (1.0 / self.pesos_placas[i])
+        )
+        return [self.placas[i] for i in indices]
+
+    def _estado(self, fecha: date) -> str:
+        r = self.rng.random()
+        if fecha == self.hoy:
+            # El día en curso: buena parte aún pendiente
+            if r < 0.5:
+                return "pendiente"
+            r = (r - 0.5) * 2
+        elif r < self.args.ratio_pendiente:
+            return "pendiente"
+        return "cumplido" if r < self.args.ratio_cumplido + self.args.ratio_pendiente else "no_cumplido"
+
+    def generar_dia(self, fecha: date) -> None:
+        rng = self.rng
+        n_vehiculos = self._vehiculos_del_dia(fecha)
+        if n_vehiculos == 0:
+            return
+
+        inicio_dia = datetime.combine(fecha, dtime(5, 30), tzinfo=COLOMBIA_TZ)
+        operacion_id = self._id("operaciones_diarias")
+        self.buffers["operaciones_diarias"].append((
+            operacion_id, fecha, n_vehiculos + rng.randint(0, 3), None,
+            rng.choice(self.usuario_ids), inicio_dia, inicio_dia,
+        ))
+
+        for placa in self._elegir_placas(n_vehiculos):
+            vehiculo_id = self._id("vehiculos_operacion")
+            minutos_inicio = max(0, int(rng.gauss(60, 30)))
+            salida = inicio_dia + timedelta(minutes=minutos_inicio)
+            self.buffers["vehiculos_operacion"].append((
+                vehiculo_id, operacion_id, placa, salida.time().replace(microsecond=0, tzinfo=None),
+                None, True, salida, salida,
+            ))
+
+            n_entregas = max(1, int(rng.lognormvariate(self.mu_entregas, self.sigma_entregas)))
+            momento = salida
+            for _ in range(n_entregas):
+                self._generar_entrega(fecha, vehiculo_id, inicio_dia, momento)
+                momento += timedelta(seconds=int(rng.expovariate(1 / 1500)))
+
+    def _generar_entrega(self, fecha: date, vehiculo_id: int, creada: datetime, momento: datetime) -> None:
+        rng = self.rng
+        entrega_id = self._id("entregas")
+        estado = self._estado(fecha)
+        cliente = self.clientes[bisect.bisect_left(self.cum_pesos_clientes, rng.random() * self.cum_pesos_clientes[-1])]
+
+        fecha_cumplido = None
+        usuario_cumplido = None
+        observacion = None
+        actualizada = creada
+        if estado != "pendiente":
+            fecha_cumplido = momento + timedelta(seconds=rng.randint(0, 600))
+            usuario_cumplido = rng.choice(self.usuario_ids)
+            actualizada = fecha_cumplido
+            if estado == "no_cumplido":
+                observacion = rng.choice(MOTIVOS_NO_CUMPLIDO)
+
+        self.buffers["entregas"].append((
+            entrega_id, vehiculo_id, f"FV-{entrega_id:09d}", cliente, observacion, estado,
+            fecha, fecha_cumplido, usuario_cumplido, creada, actualizada,
+        ))
+
+        if estado == "cumplido" and rng.random() < self.args.ratio_fotos:
+            for n in range(1 if rng.random() < 0.8 else 2):
+                foto_id = self._id("fotos_evidencia")
+                nombre = f"entrega_{entrega_id}_{rng.getrandbits(80):020x}.jpg"
+                self.buffers["fotos_evidencia"].append((
+                    foto_id, entrega_id, f"{self.args.upload_dir}/{nombre}", nombre, "image/jpeg",
+                    rng.randint(80_000, 600_000), fecha_cumplido + timedelta(seconds=5 + n),
+                ))
+
+    def filas_pendientes(self) -> int:
+        return len(self.buffers["entregas"])
+
+
+def _acumular(valores: Sequence[float]):
+    total = 0.0
+    for valor in valores:
+        total += valor
+        yield total
+
+
+class Cargador:
+    """Escribe los buffers en la base: COPY en PostgreSQL, INSERT por lotes en el resto"""
+
+    def __init__(self, engine, tablas):
+        self.engine = engine
+        self.tablas = tablas
+        self.es_postgres = engine.dialect.name == "postgresql"
+
+    def cargar(self, buffers: Dict[str, List[tuple]]) -> None:
+        with self.engine.begin() as conn:
+            for tabla in ORDEN_TABLAS:
+                filas = buffers[tabla]
+                if not filas:
+                    continue
+                if self.es_postgres:
+                    self._copy(conn, tabla, filas)
+                else:
+                    columnas = COLUMNAS[tabla]
+                    conn.execute(
+                        self.tablas[tabla].insert(),
+                        [dict(zip(columnas, fila)) for fila in filas]
+                    )
+
+    def _copy(self, conn, tabla: str, filas: List[tuple]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(filas)  # None → campo vacío sin comillas = NULL en COPY CSV
+        buffer.seek(0)
+        cursor = conn.connection.cursor()
+        cursor.copy_expert(
+            f"COPY {tabla} ({', '.join(COLUMNAS[tabla])}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+
+    def ajustar_secuencias(self) -> None:
+        if not self.es_postgres:
+            return
+        from sqlalchemy import text
+        with self.engine.begin() as conn:
+            for tabla in ORDEN_TABLAS:
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{tabla}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {tabla}), 1))"
+                ))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos de operaciones y entregas")
+    parser.add_argument("--database-url", help="Base destino (por defecto DATABASE_URL del backend)")
+    parser.add_argument("--desde", type=date.fromisoformat, help="Primera fecha (YYYY-MM-DD)")
+    parser.add_argument("--hasta", type=date.fromisoformat, help="Última fecha (por defecto hoy)")
+    parser.add_argument("--anios", type=float, default=1.0, help="Años hacia atrás si no se da --desde")
+    parser.add_argument("--vehiculos-por-dia", type=float, default=30, help="Media de vehículos en un día hábil")
+    parser.add_argument("--entregas-por-vehiculo", type=float, default=18, help="Media de entregas por vehículo")
+    parser.add_argument("--placas", type=int, default=400, help="Tamaño de la flota de placas")
+    parser.add_argument("--clientes", type=int, default=5000, help="Número de clientes distintos")
+    parser.add_argument("--sesgo", type=float, default=1.1, help="Exponente Zipf para placas y clientes")
+    parser.add_argument("--ratio-cumplido", type=float, default=0.88)
+    parser.add_argument("--ratio-pendiente", type=float, default=0.02, help="Pendientes en días pasados")
+    parser.add_argument("--ratio-fotos", type=float, default=0.8, help="Entregas cumplidas con foto")
+    parser.add_argument("--upload-dir", default="/app/uploads", help="Prefijo de ruta_archivo de las fotos")
+    parser.add_argument("--lote", type=int, default=200_000, help="Entregas por lote de carga")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--crear-tablas", action="store_true", help="Crear el esquema si no existe")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from sqlalchemy import func
+    from app.database import Base, engine, SessionLocal
+    from app.models import OperacionDiaria, VehiculoOperacion, Entrega, FotoEvidencia, Usuario
+
+    modelos = {
+        "operaciones_diarias": OperacionDiaria,
+        "vehiculos_operacion": VehiculoOperacion,
+        "entregas": Entrega,
+        "fotos_evidencia": FotoEvidencia,
+    }
+    if args.crear_tablas:
+        Base.metadata.create_all(bind=engine)
+
+    hasta = args.hasta or datetime.now(COLOMBIA_TZ).date()
+    desde = args.desde or hasta - timedelta(days=int(args.anios * 365))
+
+    # Con entregas/fotos_evidencia particionadas (migrations/008) se crean antes los meses del rango
+    from app.services.particiones import asegurar_particiones
+    asegurar_particiones(engine, desde=desde, hasta=hasta + timedelta(days=1))
+
+    db = SessionLocal()
+    try:
+        ids_iniciales = {
+            tabla: (db.query(func.max(modelo.id)).scalar() or 0) + 1
+            for tabla, modelo in modelos.items()
+        }
+        usuario_ids = [u for (u,) in db.query(Usuario.id).all()]
+    finally:
+        db.close()
+
+    generador = Generador(args, ids_iniciales, usuario_ids)
+    cargador = Cargador(engine, {tabla: modelo.__table__ for tabla, modelo in modelos.items()})
+
+    print(f"🚀 Generando datos del {desde} al {hasta} (seed {args.seed}, motor {engine.dialect.name})")
+    inicio = time.perf_counter()
+
+    def vaciar():
+        cargador.cargar(generador.buffers)
+        for tabla in ORDEN_TABLAS:
+            generador.totales[tabla] += len(generador.buffers[tabla])
+            generador.buffers[tabla] = []
+        elapsed = time.perf_counter() - inicio
+        total = generador.totales["entregas"]
+        print(f"   {fecha}  entregas: {total:,}  ({total / elapsed:,.0f} filas/s)")
+
+    fecha = desde
+    while fecha <= hasta:
+        generador.generar_dia(fecha)
+        if generador.filas_pendientes() >= args.lote:
+            vaciar()
+        fecha += timedelta(days=1)
+    fecha = hasta
+    vaciar()
+    cargador.ajustar_secuencias()
+
+    elapsed = time.perf_counter() - inicio
+    print("\n" + "=" * 60)
+    print(f"✅ Carga completada en {elapsed:,.1f}s")
+    for tabla in ORDEN_TABLAS:
+        print(f"   {tabla:<22} {generador.totales[tabla]:>14,}")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
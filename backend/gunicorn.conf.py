@@ -0,0 +1,52 @@
+"""
+Configuración de gunicorn para producción (Linux)
+
+    gunicorn -c gunicorn.conf.py main:app      # o: python serve.py
+
+- Workers uvicorn dimensionados por CPU y conexiones de base de datos (app/server.py)
+- preload_app: la aplicación se importa una vez en el master y los workers comparten
+  memoria (copy-on-write). La conexión a la base se abre en el lifespan de cada worker.
+- Reciclaje de workers tras WEB_MAX_REQUESTS requests (con jitter)
+- Reinicio escalonado sin cortar requests: kill -HUP <pid master>
+  (con preload, para cargar código nuevo use USR2 + QUIT sobre el master anterior)
+"""
+import os
+import tempfile
+
+from app.config import get_settings
+from app.server import calcular_workers
+
+settings = get_settings()
+
+bind = settings.web_bind
+workers = calcular_workers(settings)
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+max_requests = settings.web_max_requests
+max_requests_jitter = settings.web_max_requests_jitter
+timeout = settings.web_timeout
+graceful_timeout = settings.web_graceful_timeout
+keepalive = 5
+accesslog = None  # LoggingMiddleware ya registra cada request
+errorlog = "-"
+
+
+def on_starting(server):
+    # Directorio compartido para las estadísticas por worker (/api/sistema/workers)
+    if not os.environ.get("WORKER_STATS_DIR"):
+        os.environ["WORKER_STATS_DIR"] = tempfile.mkdtemp(prefix="avery-workers-")
+    server.log.info(
+        f"🚀 {workers} workers (CPU: {os.cpu_count()}, DB_MAX_CONNECTIONS: {settings.db_max_connections}), "
+        f"reciclaje cada {max_requests}±{max_requests_jitter} requests"
+    )
+
+
+def post_fork(server, worker):
+    # Con preload el engine se creó en el master: no compartir conexiones del pool entre procesos
+    from app.database import engine
+    engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    from app.middleware.worker_stats import remove_worker_stats
+    remove_worker_stats(worker.pid)
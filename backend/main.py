@@ -1,40 +1,39 @@
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from pathlib import Path
 import logging
 import traceback
-from app.database import engine, Base
-from app.routes import auth, operaciones, entregas, dashboard, usuarios, rbac, vehiculos, tipos_vehiculo, permisos_rol, permisos_usuario
+from app.startup import lifespan
+from app.routes import auth, operaciones, entregas, dashboard, usuarios, rbac, vehiculos, tipos_vehiculo, permisos_rol, permisos_usuario, eventos, jobs, sistema, archivo, sync
 from app.config import get_settings
-from app.middleware import LoggingMiddleware, log_startup_info
+from app.middleware import LoggingMiddleware, WorkerStatsMiddleware, IdempotencyMiddleware
+from app.utils.static_files import UploadsStaticFiles
+from app.services.archivo import buscar_foto_archivada
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
-# Log startup info
-log_startup_info()
-
-# Create tables
-Base.metadata.create_all(bind=engine)
-
 settings = get_settings()
 
+# Logging, base de datos, esquema y uploads se inicializan en el lifespan (app/startup.py):
+# importar este módulo no tiene efectos secundarios
 app = FastAPI(
     title="Sistema de Gestión de Vehículos y Entregas",
     description="API para gestión de operaciones diarias de vehículos y entregas",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Idempotency-Key en POST/PATCH (el más interno: solo envuelve la escritura)
+app.add_middleware(IdempotencyMiddleware)
+
 # Add logging middleware (before CORS)
 app.add_middleware(LoggingMiddleware)
 
+# Estadísticas por worker (/api/sistema/workers)
+app.add_middleware(WorkerStatsMiddleware)
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -91,15 +90,23 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         }
     )
 
-# Ensure upload directory exists with absolute path
+# Mount static files for uploads (cache inmutable, Range y offload opcional al proxy;
+# las fotos archivadas se leen de su zip mensual)
+# El directorio se crea y verifica en el lifespan, por eso check_dir=False
 upload_dir = Path(settings.upload_dir).resolve()
-upload_dir.mkdir(parents=True, exist_ok=True)
-logger.info(f"📁 Upload directory: {upload_dir}")
-logger.info(f"📁 Directory exists: {upload_dir.exists()}")
-
-# Mount static files for uploads
-app.mount("/uploads", StaticFiles(directory=str(upload_dir)), name="uploads")
-logger.info(f"🌐 Static files mounted at: http://localhost:3035/uploads")
+app.mount(
+    "/uploads",
+    UploadsStaticFiles(
+        directory=str(upload_dir),
+        check_dir=False,
+        immutable_max_age=settings.uploads_immutable_max_age,
+        default_max_age=settings.uploads_default_max_age,
+        offload_header=settings.uploads_offload_header,
+        offload_prefix=settings.uploads_offload_prefix,
+        fallback=buscar_foto_archivada,
+    ),
+    name="uploads"
+)
 
 # Include routers
 app.include_router(auth.router)
@@ -112,6 +119,11 @@ app.include_router(permisos_usuario.router)
 app.include_router(operaciones.router)
 app.include_router(entregas.router)
 app.include_router(dashboard.router)
+app.include_router(eventos.router)
+app.include_router(jobs.router)
+app.include_router(sistema.router)
+app.include_router(archivo.router)
+app.include_router(sync.router)
 
 @app.get("/")
 async def root():
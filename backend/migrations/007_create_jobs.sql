@@ -0,0 +1,31 @@
+-- Cola persistente de trabajos en segundo plano (app/services/jobs.py)
+CREATE TABLE IF NOT EXISTS jobs (
+    id SERIAL PRIMARY KEY,
+    tipo VARCHAR(100) NOT NULL,
+    payload JSON NOT NULL DEFAULT '{}',
+    estado VARCHAR(20) NOT NULL DEFAULT 'pendiente'
+        CHECK (estado IN ('pendiente', 'en_proceso', 'completado', 'fallido')),
+    prioridad INTEGER NOT NULL DEFAULT 0,
+    intentos INTEGER NOT NULL DEFAULT 0,
+    max_intentos INTEGER NOT NULL DEFAULT 5,
+    ejecutar_despues TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    bloqueado_por VARCHAR(100),
+    bloqueado_en TIMESTAMP WITH TIME ZONE,
+    ultimo_error TEXT,
+    resultado JSON,
+    usuario_id INTEGER,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    finalizado_en TIMESTAMP WITH TIME ZONE
+);
+
+-- Índices
+CREATE INDEX IF NOT EXISTS ix_jobs_id ON jobs(id);
+CREATE INDEX IF NOT EXISTS ix_jobs_tipo ON jobs(tipo);
+CREATE INDEX IF NOT EXISTS ix_jobs_claim ON jobs(estado, prioridad, ejecutar_despues);
+
+-- Comentarios
+COMMENT ON TABLE jobs IS 'Trabajos en segundo plano; se reclaman con SELECT ... FOR UPDATE SKIP LOCKED';
+COMMENT ON COLUMN jobs.prioridad IS 'Mayor número = se ejecuta antes';
+COMMENT ON COLUMN jobs.ejecutar_despues IS 'No ejecutar antes de esta fecha (usado para el backoff de reintentos)';
+COMMENT ON COLUMN jobs.bloqueado_en IS 'Momento del reclamo; trabajos en_proceso vencidos se recuperan';
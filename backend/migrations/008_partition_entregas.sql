@@ -0,0 +1,214 @@
+-- Particionamiento mensual de entregas (por fecha_operacion) y fotos_evidencia (por uploaded_at)
+-- ✅ Las consultas con rango de fechas solo leen las particiones del rango (partition pruning)
+-- ✅ Los meses antiguos se pueden desacoplar (DETACH) sin reescribir la tabla
+-- ✅ Particiones futuras: crear_particiones_mensuales() (la API la ejecuta al arrancar, ver
+--    app/services/particiones.py; también puede programarse con pg_cron)
+--
+-- Requiere PostgreSQL 13+ (trigger BEFORE UPDATE en tabla particionada). Ejecutar en una
+-- ventana de mantenimiento: copia todas las filas.
+--
+-- Cambios respecto a las tablas anteriores:
+--   - La clave primaria incluye la columna de partición: (id, fecha_operacion) / (id, uploaded_at).
+--     La base ya no garantiza que id sea único por sí solo (un índice único en una tabla
+--     particionada debe incluir la columna de partición): la unicidad depende solo de que
+--     los ids salgan de la secuencia. El ORM lo sigue usando como PK.
+--   - fotos_evidencia.entrega_id ya no es FOREIGN KEY (PostgreSQL no permite referenciar
+--     una tabla particionada sin incluir su clave de partición). El borrado en cascada
+--     se mantiene con el trigger trg_entregas_borrar_fotos.
+--   - DROP TABLE entregas_anterior elimina el trigger update_entregas_updated_at
+--     (database/schema.sql); se vuelve a crear sobre la tabla particionada.
+
+BEGIN;
+
+-- ==================== FUNCIONES DE MANTENIMIENTO ====================
+
+-- Crea (si no existen) las particiones mensuales de `tabla` que cubren desde el mes de
+-- `desde` hasta el mes de `hasta` (inclusive). Nombre: <tabla>_yYYYYmMM.
+-- Si la partición DEFAULT tiene filas de ese mes, se mueven a la partición nueva con la
+-- DEFAULT desacoplada: así el DELETE no dispara los triggers de fila de la tabla (borrado de
+-- fotos en cascada, tombstones de sincronización) para filas que se vuelven a insertar.
+CREATE OR REPLACE FUNCTION crear_particiones_mensuales(tabla TEXT, desde DATE, hasta DATE)
+RETURNS INTEGER AS $$
+DECLARE
+    inicio DATE := date_trunc('month', desde)::date;
+    fin DATE;
+    nombre TEXT;
+    columna TEXT;
+    columnas TEXT;
+    particion_default TEXT := tabla || '_default';
+    creadas INTEGER := 0;
+BEGIN
+    SELECT a.attname INTO columna
+    FROM pg_partitioned_table pt
+    JOIN pg_attribute a ON a.attrelid = pt.partrelid AND a.attnum = pt.partattrs[0]
+    WHERE pt.partrelid = tabla::regclass;
+
+    -- Lista explícita sin columnas generadas (p. ej. entregas.busqueda de 012): no admiten INSERT
+    SELECT string_agg(quote_ident(a.attname), ', ' ORDER BY a.attnum) INTO columnas
+    FROM pg_attribute a
+    WHERE a.attrelid = tabla::regclass AND a.attnum > 0 AND NOT a.attisdropped AND a.attgenerated = '';
+
+    WHILE inicio <= hasta LOOP
+        fin := (inicio + INTERVAL '1 month')::date;
+        nombre := format('%s_y%sm%s', tabla, to_char(inicio, 'YYYY'), to_char(inicio, 'MM'));
+        IF to_regclass(nombre) IS NULL THEN
+            IF to_regclass(particion_default) IS NOT NULL THEN
+                EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', tabla, particion_default);
+            END IF;
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                nombre, tabla, inicio, fin
+            );
+            IF to_regclass(particion_default) IS NOT NULL THEN
+                EXECUTE format(
+                    'INSERT INTO %I (%s) SELECT %s FROM %I WHERE %I >= %L AND %I < %L',
+                    tabla, columnas, columnas, particion_default, columna, inicio, columna, fin
+                );
+                EXECUTE format(
+                    'DELETE FROM %I WHERE %I >= %L AND %I < %L',
+                    particion_default, columna, inicio, columna, fin
+                );
+                EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I DEFAULT', tabla, particion_default);
+            END IF;
+            creadas := creadas + 1;
+        END IF;
+        inicio := fin;
+    END LOOP;
+    RETURN creadas;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Desacopla las particiones mensuales de `tabla` que terminan antes de `antes_de`.
+-- Quedan como tablas independientes (archivar con pg_dump y luego DROP TABLE).
+CREATE OR REPLACE FUNCTION desacoplar_particiones_antiguas(tabla TEXT, antes_de DATE)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    particion RECORD;
+BEGIN
+    FOR particion IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = tabla
+          AND c.relname ~ ('^' || tabla || '_y[0-9]{4}m[0-9]{2}$')
+          AND (to_date(right(c.relname, 7), 'YYYY"m"MM') + INTERVAL '1 month')::date <= antes_de
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', tabla, particion.relname);
+        RETURN NEXT particion.relname;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ==================== ENTREGAS ====================
+
+-- Las tablas anteriores se renombran (con su clave primaria, cuyo nombre de índice es global)
+ALTER TABLE fotos_evidencia RENAME TO fotos_evidencia_anterior;
+ALTER INDEX IF EXISTS fotos_evidencia_pkey RENAME TO fotos_evidencia_anterior_pkey;
+ALTER TABLE entregas RENAME TO entregas_anterior;
+ALTER INDEX IF EXISTS entregas_pkey RENAME TO entregas_anterior_pkey;
+
+CREATE TABLE entregas (
+    id INTEGER NOT NULL DEFAULT nextval('entregas_id_seq'),
+    vehiculo_operacion_id INTEGER NOT NULL REFERENCES vehiculos_operacion(id) ON DELETE CASCADE,
+    numero_factura VARCHAR(50) NOT NULL,
+    cliente VARCHAR(200),
+    observacion TEXT,
+    estado VARCHAR(20) DEFAULT 'pendiente'
+        CHECK (estado IN ('pendiente', 'cumplido', 'no_cumplido')),
+    fecha_operacion DATE NOT NULL,
+    fecha_cumplido TIMESTAMP WITH TIME ZONE,
+    usuario_cumplido_id INTEGER REFERENCES usuarios(id),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, fecha_operacion)
+) PARTITION BY RANGE (fecha_operacion);
+
+ALTER SEQUENCE entregas_id_seq OWNED BY entregas.id;
+
+-- Filas fuera de las particiones mensuales (no debería recibir datos si las particiones futuras se crean a tiempo)
+CREATE TABLE entregas_default PARTITION OF entregas DEFAULT;
+
+-- ==================== FOTOS DE EVIDENCIA ====================
+
+CREATE TABLE fotos_evidencia (
+    id INTEGER NOT NULL DEFAULT nextval('fotos_evidencia_id_seq'),
+    entrega_id INTEGER NOT NULL,
+    ruta_archivo VARCHAR(500) NOT NULL,
+    nombre_archivo VARCHAR(200),
+    tipo_mime VARCHAR(100),
+    tamano_bytes INTEGER,
+    uploaded_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, uploaded_at)
+) PARTITION BY RANGE (uploaded_at);
+
+ALTER SEQUENCE fotos_evidencia_id_seq OWNED BY fotos_evidencia.id;
+
+CREATE TABLE fotos_evidencia_default PARTITION OF fotos_evidencia DEFAULT;
+
+-- Borrado en cascada de fotos (reemplaza la FOREIGN KEY ... ON DELETE CASCADE)
+CREATE OR REPLACE FUNCTION entregas_borrar_fotos() RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM fotos_evidencia WHERE entrega_id = OLD.id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_entregas_borrar_fotos
+    AFTER DELETE ON entregas
+    FOR EACH ROW EXECUTE FUNCTION entregas_borrar_fotos();
+
+-- ==================== PARTICIONES Y COPIA DE DATOS ====================
+
+-- Desde el mes más antiguo con datos hasta 3 meses en el futuro
+SELECT crear_particiones_mensuales(
+    'entregas',
+    COALESCE((SELECT MIN(fecha_operacion) FROM entregas_anterior), CURRENT_DATE),
+    (CURRENT_DATE + INTERVAL '3 months')::date
+);
+
+SELECT crear_particiones_mensuales(
+    'fotos_evidencia',
+    COALESCE((SELECT MIN(uploaded_at)::date FROM fotos_evidencia_anterior), CURRENT_DATE),
+    (CURRENT_DATE + INTERVAL '3 months')::date
+);
+
+INSERT INTO entregas (
+    id, vehiculo_operacion_id, numero_factura, cliente, observacion, estado,
+    fecha_operacion, fecha_cumplido, usuario_cumplido_id, created_at, updated_at
+)
+SELECT
+    id, vehiculo_operacion_id, numero_factura, cliente, observacion, estado,
+    fecha_operacion, fecha_cumplido, usuario_cumplido_id, created_at, updated_at
+FROM entregas_anterior;
+
+INSERT INTO fotos_evidencia (
+    id, entrega_id, ruta_archivo, nombre_archivo, tipo_mime, tamano_bytes, uploaded_at
+)
+SELECT
+    id, entrega_id, ruta_archivo, nombre_archivo, tipo_mime, tamano_bytes,
+    COALESCE(uploaded_at, CURRENT_TIMESTAMP)
+FROM fotos_evidencia_anterior;
+
+DROP TABLE fotos_evidencia_anterior;
+DROP TABLE entregas_anterior;
+
+-- updated_at también se actualiza en UPDATEs fuera del ORM (scripts SQL, psql): lo usa /api/sync
+CREATE TRIGGER update_entregas_updated_at BEFORE UPDATE ON entregas
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Índices (después de la copia; se propagan a todas las particiones)
+CREATE INDEX IF NOT EXISTS ix_entregas_id ON entregas(id);
+CREATE INDEX IF NOT EXISTS ix_entregas_fecha_operacion ON entregas(fecha_operacion);
+CREATE INDEX IF NOT EXISTS ix_entregas_estado ON entregas(estado);
+CREATE INDEX IF NOT EXISTS ix_entregas_fecha_cumplido ON entregas(fecha_cumplido);
+CREATE INDEX IF NOT EXISTS ix_entregas_vehiculo_operacion_id ON entregas(vehiculo_operacion_id);
+CREATE INDEX IF NOT EXISTS ix_fotos_evidencia_id ON fotos_evidencia(id);
+CREATE INDEX IF NOT EXISTS ix_fotos_evidencia_entrega_id ON fotos_evidencia(entrega_id);
+
+-- Comentarios
+COMMENT ON TABLE entregas IS 'Particionada por mes de fecha_operacion (crear_particiones_mensuales)';
+COMMENT ON TABLE fotos_evidencia IS 'Particionada por mes de uploaded_at; entrega_id sin FK (trigger trg_entregas_borrar_fotos)';
+
+COMMIT;
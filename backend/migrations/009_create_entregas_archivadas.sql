@@ -0,0 +1,21 @@
+-- Archivo de entregas antiguas (ver app/services/archivo.py)
+-- ✅ La entrega y la metadata de sus fotos se guardan como JSON comprimido (zlib) en `datos`
+-- ✅ Los archivos de las fotos quedan en zips mensuales bajo ARCHIVO_DIR (paquete_fotos)
+-- ✅ id = id de la entrega original (GET /api/entregas/{id} sigue funcionando)
+
+CREATE TABLE IF NOT EXISTS entregas_archivadas (
+    id INTEGER PRIMARY KEY,
+    vehiculo_operacion_id INTEGER NOT NULL,
+    numero_factura VARCHAR(50) NOT NULL,
+    fecha_operacion DATE NOT NULL,
+    datos BYTEA NOT NULL,
+    paquete_fotos VARCHAR(200),
+    total_fotos INTEGER NOT NULL DEFAULT 0,
+    archivado_en TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_entregas_archivadas_vehiculo_operacion_id ON entregas_archivadas(vehiculo_operacion_id);
+CREATE INDEX IF NOT EXISTS ix_entregas_archivadas_numero_factura ON entregas_archivadas(numero_factura);
+CREATE INDEX IF NOT EXISTS ix_entregas_archivadas_fecha_operacion ON entregas_archivadas(fecha_operacion);
+
+COMMENT ON TABLE entregas_archivadas IS 'Entregas archivadas por antigüedad (job archivo.archivar_entregas)';
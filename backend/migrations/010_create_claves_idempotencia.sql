@@ -0,0 +1,22 @@
+-- Idempotency-Key de POST/PATCH (app/middleware/idempotency.py)
+-- ✅ Una fila por (usuario, clave); la respuesta 2xx se guarda para los reintentos
+-- ✅ Las filas vencidas (expira_en) las purga la API
+CREATE TABLE IF NOT EXISTS claves_idempotencia (
+    id SERIAL PRIMARY KEY,
+    clave VARCHAR(100) NOT NULL,
+    sujeto VARCHAR(100) NOT NULL,
+    metodo VARCHAR(10) NOT NULL,
+    ruta VARCHAR(300) NOT NULL,
+    estado VARCHAR(20) NOT NULL DEFAULT 'en_proceso'
+        CHECK (estado IN ('en_proceso', 'completado')),
+    status_code INTEGER,
+    content_type VARCHAR(100),
+    respuesta BYTEA,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expira_en TIMESTAMP WITH TIME ZONE NOT NULL,
+    CONSTRAINT uq_claves_idempotencia_sujeto_clave UNIQUE (sujeto, clave)
+);
+
+CREATE INDEX IF NOT EXISTS ix_claves_idempotencia_expira_en ON claves_idempotencia(expira_en);
+
+COMMENT ON TABLE claves_idempotencia IS 'Idempotency-Key recientes con la respuesta original (reintentos de la app móvil)';
@@ -0,0 +1,55 @@
+-- Tombstones para la sincronización incremental (GET /api/sync, app/services/sync.py)
+-- ✅ Un trigger AFTER DELETE en entregas, fotos_evidencia y vehiculos_operacion registra el id borrado
+-- ✅ Cubre también los borrados en cascada y el archivado de entregas antiguas
+-- ✅ La API purga los tombstones con más de SYNC_RETENCION_DIAS días
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS sync_eliminaciones (
+    id SERIAL PRIMARY KEY,
+    tabla VARCHAR(50) NOT NULL,
+    registro_id INTEGER NOT NULL,
+    vehiculo_operacion_id INTEGER,
+    eliminado_en TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_sync_eliminaciones_vehiculo_eliminado ON sync_eliminaciones(vehiculo_operacion_id, eliminado_en);
+CREATE INDEX IF NOT EXISTS ix_sync_eliminaciones_eliminado_en ON sync_eliminaciones(eliminado_en);
+
+-- TG_ARGV[0] es el nombre lógico de la tabla (en tablas particionadas TG_TABLE_NAME es la partición)
+CREATE OR REPLACE FUNCTION registrar_eliminacion_sync() RETURNS TRIGGER AS $$
+DECLARE
+    vehiculo INTEGER;
+BEGIN
+    IF TG_ARGV[0] = 'entregas' THEN
+        vehiculo := OLD.vehiculo_operacion_id;
+    ELSIF TG_ARGV[0] = 'vehiculos_operacion' THEN
+        vehiculo := OLD.id;
+    ELSE
+        SELECT vehiculo_operacion_id INTO vehiculo FROM entregas WHERE id = OLD.entrega_id;
+    END IF;
+    INSERT INTO sync_eliminaciones (tabla, registro_id, vehiculo_operacion_id)
+    VALUES (TG_ARGV[0], OLD.id, vehiculo);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_entregas_sync_eliminacion ON entregas;
+CREATE TRIGGER trg_entregas_sync_eliminacion
+    AFTER DELETE ON entregas
+    FOR EACH ROW EXECUTE FUNCTION registrar_eliminacion_sync('entregas');
+
+DROP TRIGGER IF EXISTS trg_fotos_evidencia_sync_eliminacion ON fotos_evidencia;
+CREATE TRIGGER trg_fotos_evidencia_sync_eliminacion
+    AFTER DELETE ON fotos_evidencia
+    FOR EACH ROW EXECUTE FUNCTION registrar_eliminacion_sync('fotos_evidencia');
+
+DROP TRIGGER IF EXISTS trg_vehiculos_operacion_sync_eliminacion ON vehiculos_operacion;
+CREATE TRIGGER trg_vehiculos_operacion_sync_eliminacion
+    AFTER DELETE ON vehiculos_operacion
+    FOR EACH ROW EXECUTE FUNCTION registrar_eliminacion_sync('vehiculos_operacion');
+
+-- Sincronización por vehículo: entregas cambiadas desde el watermark
+CREATE INDEX IF NOT EXISTS ix_entregas_vehiculo_updated_at ON entregas(vehiculo_operacion_id, updated_at);
+
+COMMIT;
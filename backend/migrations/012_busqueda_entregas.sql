@@ -0,0 +1,28 @@
+-- Búsqueda de texto en entregas (GET /api/dashboard/entregas/busqueda, app/services/busqueda.py)
+-- ✅ Columna generada busqueda: tsvector 'spanish' sin tildes de numero_factura (peso A),
+--    cliente (B) y observacion (C)
+-- ✅ Índice GIN (se propaga a todas las particiones)
+--
+-- Requiere PostgreSQL 12+ y la extensión unaccent (incluida en contrib).
+-- Agregar la columna reescribe la tabla: ejecutar en una ventana de mantenimiento.
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- unaccent() es STABLE (depende del diccionario); las columnas generadas requieren IMMUTABLE.
+-- Con el diccionario fijado explícitamente el resultado no cambia.
+CREATE OR REPLACE FUNCTION f_unaccent(texto TEXT) RETURNS TEXT AS $$
+    SELECT public.unaccent('public.unaccent'::regdictionary, texto)
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+
+ALTER TABLE entregas ADD COLUMN IF NOT EXISTS busqueda tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('spanish'::regconfig, f_unaccent(coalesce(numero_factura, ''))), 'A') ||
+        setweight(to_tsvector('spanish'::regconfig, f_unaccent(coalesce(cliente, ''))), 'B') ||
+        setweight(to_tsvector('spanish'::regconfig, f_unaccent(coalesce(observacion, ''))), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_entregas_busqueda ON entregas USING GIN (busqueda);
+
+COMMIT;
@@ -0,0 +1,35 @@
+-- Búsqueda exacta por número de factura (GET /api/entregas/factura/{numero})
+-- ✅ Columna factura_normalizada (mayúsculas, solo alfanuméricos) con índice B-tree
+-- ✅ Un trigger la mantiene en cualquier INSERT/UPDATE (incluye COPY y scripts SQL)
+-- ✅ La misma regla que app/utils/facturas.py:normalizar_factura (la reemplaza 018: solo A-Z y 0-9)
+--
+-- Requiere PostgreSQL 13+ (trigger BEFORE en tabla particionada). El UPDATE recorre toda la
+-- tabla: ejecutar en una ventana de mantenimiento.
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION normalizar_factura(texto TEXT) RETURNS TEXT AS $$
+    SELECT upper(regexp_replace(texto, '[^[:alnum:]]', '', 'g'))
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+
+ALTER TABLE entregas ADD COLUMN IF NOT EXISTS factura_normalizada VARCHAR(50);
+
+UPDATE entregas
+SET factura_normalizada = normalizar_factura(numero_factura)
+WHERE factura_normalizada IS DISTINCT FROM normalizar_factura(numero_factura);
+
+CREATE OR REPLACE FUNCTION entregas_normalizar_factura() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.factura_normalizada := normalizar_factura(NEW.numero_factura);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_entregas_normalizar_factura ON entregas;
+CREATE TRIGGER trg_entregas_normalizar_factura
+    BEFORE INSERT OR UPDATE OF numero_factura ON entregas
+    FOR EACH ROW EXECUTE FUNCTION entregas_normalizar_factura();
+
+CREATE INDEX IF NOT EXISTS ix_entregas_factura_normalizada ON entregas(factura_normalizada);
+
+COMMIT;
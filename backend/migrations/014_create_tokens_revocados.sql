@@ -0,0 +1,17 @@
+-- Revocación de tokens JWT por jti (logout), ver app/services/revocacion.py
+-- ✅ Cada worker carga las filas vigentes en memoria (filtro de Bloom + conjunto exacto)
+--    y trae solo las nuevas (revocado_en) cada REVOCACION_REFRESCO_SEGUNDOS
+-- ✅ Las filas con expira_en vencido las purga la API
+CREATE TABLE IF NOT EXISTS tokens_revocados (
+    id SERIAL PRIMARY KEY,
+    jti VARCHAR(64) NOT NULL,
+    usuario_id INTEGER REFERENCES usuarios(id) ON DELETE CASCADE,
+    revocado_en TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expira_en TIMESTAMP WITH TIME ZONE NOT NULL,
+    CONSTRAINT tokens_revocados_jti_key UNIQUE (jti)
+);
+
+CREATE INDEX IF NOT EXISTS ix_tokens_revocados_revocado_en ON tokens_revocados(revocado_en);
+CREATE INDEX IF NOT EXISTS ix_tokens_revocados_expira_en ON tokens_revocados(expira_en);
+
+COMMENT ON TABLE tokens_revocados IS 'Tokens JWT revocados (logout) hasta su vencimiento';
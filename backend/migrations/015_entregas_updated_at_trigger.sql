@@ -0,0 +1,22 @@
+-- Restaura el trigger update_entregas_updated_at en la tabla particionada entregas
+-- ✅ 008_partition_entregas.sql lo perdía al borrar entregas_anterior: los UPDATE hechos
+--    fuera del ORM (scripts SQL, psql) no actualizaban updated_at y /api/sync no los veía
+-- ✅ Idempotente: también se puede ejecutar en bases donde 008 ya lo crea
+--
+-- Requiere PostgreSQL 13+ (trigger BEFORE en tabla particionada).
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_entregas_updated_at ON entregas;
+CREATE TRIGGER update_entregas_updated_at BEFORE UPDATE ON entregas
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+COMMIT;
@@ -0,0 +1,48 @@
+-- Tombstones de fotos borradas en cascada con su entrega (GET /api/sync)
+-- ✅ 011_create_sync_eliminaciones.sql resolvía el vehículo de la foto en un trigger AFTER DELETE,
+--    pero en la cascada la entrega ya no existe: el tombstone quedaba con vehiculo_operacion_id
+--    NULL y ningún dispositivo lo recibía
+-- ✅ Un trigger BEFORE DELETE en entregas registra las fotos de la entrega con su vehículo
+--    antes de la cascada (FOREIGN KEY o trg_entregas_borrar_fotos de 008)
+-- ✅ El trigger de fotos_evidencia ya no registra las fotos sin entrega (ya registradas)
+-- ✅ Los tombstones NULL existentes no se pueden resolver; los dispositivos igual borran
+--    las fotos de la entrega al recibir el tombstone de la entrega
+--
+-- Requiere PostgreSQL 13+ si entregas está particionada (trigger BEFORE en tabla particionada).
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION registrar_eliminacion_sync() RETURNS TRIGGER AS $$
+DECLARE
+    vehiculo INTEGER;
+BEGIN
+    IF TG_ARGV[0] = 'entregas' THEN
+        vehiculo := OLD.vehiculo_operacion_id;
+    ELSIF TG_ARGV[0] = 'vehiculos_operacion' THEN
+        vehiculo := OLD.id;
+    ELSE
+        SELECT vehiculo_operacion_id INTO vehiculo FROM entregas WHERE id = OLD.entrega_id;
+        IF vehiculo IS NULL THEN
+            RETURN OLD;  -- Borrada en cascada: la registró registrar_eliminacion_fotos_sync
+        END IF;
+    END IF;
+    INSERT INTO sync_eliminaciones (tabla, registro_id, vehiculo_operacion_id)
+    VALUES (TG_ARGV[0], OLD.id, vehiculo);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION registrar_eliminacion_fotos_sync() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO sync_eliminaciones (tabla, registro_id, vehiculo_operacion_id)
+    SELECT 'fotos_evidencia', id, OLD.vehiculo_operacion_id FROM fotos_evidencia WHERE entrega_id = OLD.id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_entregas_sync_eliminacion_fotos ON entregas;
+CREATE TRIGGER trg_entregas_sync_eliminacion_fotos
+    BEFORE DELETE ON entregas
+    FOR EACH ROW EXECUTE FUNCTION registrar_eliminacion_fotos_sync();
+
+COMMIT;
@@ -0,0 +1,63 @@
+-- Reemplaza crear_particiones_mensuales() de 008_partition_entregas.sql
+-- ✅ 012_busqueda_entregas.sql agrega la columna generada entregas.busqueda y el
+--    INSERT INTO entregas SELECT * FROM _filas_a_mover fallaba al mover filas de la
+--    partición DEFAULT ("cannot insert a non-DEFAULT value into column busqueda")
+-- ✅ Ahora copia con una lista explícita de columnas sin las generadas (attgenerated)
+--
+-- Requiere PostgreSQL 12+ (pg_attribute.attgenerated).
+
+BEGIN;
+
+-- Crea (si no existen) las particiones mensuales de `tabla` que cubren desde el mes de
+-- `desde` hasta el mes de `hasta` (inclusive). Nombre: <tabla>_yYYYYmMM.
+-- Si la partición DEFAULT tiene filas de ese mes, se mueven a la partición nueva.
+CREATE OR REPLACE FUNCTION crear_particiones_mensuales(tabla TEXT, desde DATE, hasta DATE)
+RETURNS INTEGER AS $$
+DECLARE
+    inicio DATE := date_trunc('month', desde)::date;
+    fin DATE;
+    nombre TEXT;
+    columna TEXT;
+    columnas TEXT;
+    particion_default TEXT := tabla || '_default';
+    creadas INTEGER := 0;
+BEGIN
+    SELECT a.attname INTO columna
+    FROM pg_partitioned_table pt
+    JOIN pg_attribute a ON a.attrelid = pt.partrelid AND a.attnum = pt.partattrs[0]
+    WHERE pt.partrelid = tabla::regclass;
+
+    -- Lista explícita sin columnas generadas (p. ej. entregas.busqueda de 012): no admiten INSERT
+    SELECT string_agg(quote_ident(a.attname), ', ' ORDER BY a.attnum) INTO columnas
+    FROM pg_attribute a
+    WHERE a.attrelid = tabla::regclass AND a.attnum > 0 AND NOT a.attisdropped AND a.attgenerated = '';
+
+    WHILE inicio <= hasta LOOP
+        fin := (inicio + INTERVAL '1 month')::date;
+        nombre := format('%s_y%sm%s', tabla, to_char(inicio, 'YYYY'), to_char(inicio, 'MM'));
+        IF to_regclass(nombre) IS NULL THEN
+            IF to_regclass(particion_default) IS NOT NULL THEN
+                EXECUTE format(
+                    'CREATE TEMP TABLE _filas_a_mover ON COMMIT DROP AS '
+                    'WITH movidas AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) '
+                    'SELECT * FROM movidas',
+                    particion_default, columna, inicio, columna, fin
+                );
+            END IF;
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                nombre, tabla, inicio, fin
+            );
+            IF to_regclass(particion_default) IS NOT NULL THEN
+                EXECUTE format('INSERT INTO %I (%s) SELECT %s FROM _filas_a_mover', tabla, columnas, columnas);
+                DROP TABLE _filas_a_mover;
+            END IF;
+            creadas := creadas + 1;
+        END IF;
+        inicio := fin;
+    END LOOP;
+    RETURN creadas;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMIT;
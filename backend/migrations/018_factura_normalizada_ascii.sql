@@ -0,0 +1,32 @@
+-- Normalización de facturas solo con A-Z y 0-9, y facturas de entregas archivadas
+-- ✅ normalizar_factura() usaba upper() y [:alnum:], que dependen del locale: con letras no
+--    ASCII (ß, ñ, tildes) no coincidía con app/utils/facturas.py. Ahora solo quedan A-Z y 0-9
+--    (upper con COLLATE "C" solo cambia letras ASCII)
+-- ✅ Recalcula factura_normalizada de las entregas cuya normalización cambia
+-- ✅ entregas_archivadas.factura_normalizada (índice) y estado: POST /api/entregas detecta
+--    también duplicados archivados y GET /api/entregas/factura/{numero} los devuelve
+-- ✅ Las entregas archivadas antes de esta migración quedan con estado NULL: cuentan como
+--    duplicado (aunque fueran no_cumplido); ?permitir_duplicado=true las registra igual
+--
+-- El UPDATE de entregas recorre toda la tabla: ejecutar en una ventana de mantenimiento.
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION normalizar_factura(texto TEXT) RETURNS TEXT AS $$
+    SELECT upper(regexp_replace(texto, '[^A-Za-z0-9]', '', 'g') COLLATE "C")
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+
+UPDATE entregas
+SET factura_normalizada = normalizar_factura(numero_factura)
+WHERE factura_normalizada IS DISTINCT FROM normalizar_factura(numero_factura);
+
+ALTER TABLE entregas_archivadas ADD COLUMN IF NOT EXISTS factura_normalizada VARCHAR(50);
+ALTER TABLE entregas_archivadas ADD COLUMN IF NOT EXISTS estado VARCHAR(20);
+
+UPDATE entregas_archivadas
+SET factura_normalizada = normalizar_factura(numero_factura)
+WHERE factura_normalizada IS DISTINCT FROM normalizar_factura(numero_factura);
+
+CREATE INDEX IF NOT EXISTS ix_entregas_archivadas_factura_normalizada ON entregas_archivadas(factura_normalizada);
+
+COMMIT;
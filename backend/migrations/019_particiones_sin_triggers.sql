@@ -0,0 +1,71 @@
+-- Reemplaza crear_particiones_mensuales() (008_partition_entregas.sql, 017_particiones_columnas_generadas.sql)
+-- ✅ Las filas de la partición DEFAULT se movían con DELETE ... RETURNING sobre la partición,
+--    que dispara los triggers de fila clonados de la tabla particionada:
+--    trg_entregas_borrar_fotos borraba las fotos de cada entrega movida y los triggers de
+--    011/016 registraban tombstones de filas que se volvían a insertar con el mismo
+--    updated_at (los dispositivos las borraban y no las volvían a recibir)
+-- ✅ Ahora la DEFAULT se desacopla (pierde los triggers clonados), se crea la partición, se
+--    copian y borran las filas del mes y se vuelve a acoplar
+-- ✅ No requiere superusuario (session_replication_role sí): la API la ejecuta al arrancar
+--
+-- Requiere PostgreSQL 12+ (pg_attribute.attgenerated).
+
+BEGIN;
+
+-- Crea (si no existen) las particiones mensuales de `tabla` que cubren desde el mes de
+-- `desde` hasta el mes de `hasta` (inclusive). Nombre: <tabla>_yYYYYmMM.
+-- Si la partición DEFAULT tiene filas de ese mes, se mueven a la partición nueva con la
+-- DEFAULT desacoplada: así el DELETE no dispara los triggers de fila de la tabla (borrado de
+-- fotos en cascada, tombstones de sincronización) para filas que se vuelven a insertar.
+CREATE OR REPLACE FUNCTION crear_particiones_mensuales(tabla TEXT, desde DATE, hasta DATE)
+RETURNS INTEGER AS $$
+DECLARE
+    inicio DATE := date_trunc('month', desde)::date;
+    fin DATE;
+    nombre TEXT;
+    columna TEXT;
+    columnas TEXT;
+    particion_default TEXT := tabla || '_default';
+    creadas INTEGER := 0;
+BEGIN
+    SELECT a.attname INTO columna
+    FROM pg_partitioned_table pt
+    JOIN pg_attribute a ON a.attrelid = pt.partrelid AND a.attnum = pt.partattrs[0]
+    WHERE pt.partrelid = tabla::regclass;
+
+    -- Lista explícita sin columnas generadas (p. ej. entregas.busqueda de 012): no admiten INSERT
+    SELECT string_agg(quote_ident(a.attname), ', ' ORDER BY a.attnum) INTO columnas
+    FROM pg_attribute a
+    WHERE a.attrelid = tabla::regclass AND a.attnum > 0 AND NOT a.attisdropped AND a.attgenerated = '';
+
+    WHILE inicio <= hasta LOOP
+        fin := (inicio + INTERVAL '1 month')::date;
+        nombre := format('%s_y%sm%s', tabla, to_char(inicio, 'YYYY'), to_char(inicio, 'MM'));
+        IF to_regclass(nombre) IS NULL THEN
+            IF to_regclass(particion_default) IS NOT NULL THEN
+                EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', tabla, particion_default);
+            END IF;
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                nombre, tabla, inicio, fin
+            );
+            IF to_regclass(particion_default) IS NOT NULL THEN
+                EXECUTE format(
+                    'INSERT INTO %I (%s) SELECT %s FROM %I WHERE %I >= %L AND %I < %L',
+                    tabla, columnas, columnas, particion_default, columna, inicio, columna, fin
+                );
+                EXECUTE format(
+                    'DELETE FROM %I WHERE %I >= %L AND %I < %L',
+                    particion_default, columna, inicio, columna, fin
+                );
+                EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I DEFAULT', tabla, particion_default);
+            END IF;
+            creadas := creadas + 1;
+        END IF;
+        inicio := fin;
+    END LOOP;
+    RETURN creadas;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMIT;
@@ -0,0 +1,6 @@
+-- SHA-256 del cuerpo en claves_idempotencia (app/middleware/idempotency.py)
+-- ✅ Un reintento con la misma Idempotency-Key pero otro cuerpo responde 422 en lugar de
+--    devolver la respuesta de la petición original
+-- ✅ Las claves guardadas antes de esta migración (hash NULL) no se verifican; vencen
+--    en IDEMPOTENCIA_TTL_HORAS
+ALTER TABLE claves_idempotencia ADD COLUMN IF NOT EXISTS hash_cuerpo CHAR(64);
@@ -0,0 +1,44 @@
+"""
+Punto de entrada de producción
+
+    python serve.py
+
+Linux: gunicorn con workers uvicorn (gunicorn.conf.py): preload, reciclaje de workers
+y reinicios escalonados con HUP. Windows (sin gunicorn): uvicorn con varios workers, sin
+reciclaje: el supervisor de uvicorn no vuelve a levantar un worker que termina, así que
+WEB_MAX_REQUESTS no aplica. Para desarrollo siga usando `python main.py` (--reload).
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+
+
+def main() -> None:
+    os.chdir(BACKEND_DIR)
+    if not os.environ.get("WORKER_STATS_DIR"):
+        os.environ["WORKER_STATS_DIR"] = tempfile.mkdtemp(prefix="avery-workers-")
+
+    if os.name != "nt":
+        os.execv(sys.executable, [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"])
+
+    import uvicorn
+    from app.config import get_settings
+    from app.server import calcular_workers
+
+    settings = get_settings()
+    host, _, port = settings.web_bind.rpartition(":")
+    uvicorn.run(
+        "main:app",
+        host=host or "0.0.0.0",
+        port=int(port),
+        workers=calcular_workers(settings),
+        timeout_graceful_shutdown=settings.web_graceful_timeout,
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@ import { useRouter } from 'next/navigation';
 import { useAuth } from '@/contexts/AuthContext';
 import DashboardLayout from '@/components/layout/DashboardLayout';
 import Card from '@/components/ui/Card';
-import { dashboardApi, entregasApi } from '@/lib/api';
+import { dashboardApi, entregasApi, eventosApi } from '@/lib/api';
 import type { DashboardKPIs, Entrega } from '@/types';
 import { FiTruck, FiPackage, FiCheckCircle, FiClock, FiSearch, FiDownload } from 'react-icons/fi';
 import * as XLSX from 'xlsx';
@@ -27,6 +27,21 @@ export default function DashboardPage() {
     }
   }, [user, authLoading, router]);
 
+  // ✅ Refrescar con eventos SSE en lugar de polling
+  useEffect(() => {
+    if (!user) return;
+    let timeout: ReturnType<typeof setTimeout> | null = null;
+    const unsubscribe = eventosApi.suscribirEntregas(() => {
+      // Agrupar ráfagas de eventos en una sola recarga
+      if (timeout) clearTimeout(timeout);
+      timeout = setTimeout(loadDashboardData, 1000);
+    });
+    return () => {
+      if (timeout) clearTimeout(timeout);
+      unsubscribe();
+    };
+  }, [user]);
+
   const loadDashboardData = async () => {
     try {
       const [kpisData, entregasData] = await Promise.all([
@@ -451,6 +451,53 @@ export const dashboardApi = {
   },
 };
 
+// Eventos en tiempo real (SSE)
+export const eventosApi = {
+  // EventSource no permite headers y el token de acceso no debe ir en la URL (queda en los
+  // logs de acceso): se pide un ticket de un solo uso y se envía en ?ticket=.
+  // El ticket no sirve para reconectar: ante un error se cierra y se abre con uno nuevo.
+  suscribirEntregas: (
+    onEvento: (evento: { tipo: string; entrega_id: number; operacion_id: number; estado: string }) => void,
+    params?: { operacion_id?: number; fecha?: string }
+  ): (() => void) => {
+    if (typeof window === 'undefined') return () => {};
+    if (!localStorage.getItem('token')) return () => {};
+
+    let source: EventSource | null = null;
+    let reintento: ReturnType<typeof setTimeout> | null = null;
+    let cerrado = false;
+    const handler = (e: MessageEvent) => onEvento(JSON.parse(e.data));
+
+    const conectar = async () => {
+      try {
+        const { data } = await api.post<{ ticket: string; expira_en: string }>('/api/eventos/ticket');
+        if (cerrado) return;
+        const query = new URLSearchParams({ ticket: data.ticket });
+        if (params?.operacion_id) query.set('operacion_id', String(params.operacion_id));
+        if (params?.fecha) query.set('fecha', params.fecha);
+
+        source = new EventSource(`${API_URL}/api/eventos/entregas?${query.toString()}`);
+        source.addEventListener('entrega_creada', handler);
+        source.addEventListener('entrega_actualizada', handler);
+        source.onerror = () => {
+          source?.close();
+          source = null;
+          if (!cerrado) reintento = setTimeout(conectar, 3000);
+        };
+      } catch {
+        if (!cerrado) reintento = setTimeout(conectar, 10000);
+      }
+    };
+    conectar();
+
+    return () => {
+      cerrado = true;
+      if (reintento) clearTimeout(reintento);
+      source?.close();
+    };
+  },
+};
+
 // Permisos Usuario APIs (nuevo)
 export const permisosUsuarioApi = {
   // Obtener permisos de un usuario específico